@@ -0,0 +1,82 @@
+# bead_model.py
+# description of beads built from residues, shared by all scattering curve functions
+
+import numpy as np
+import saxs_single_bead.form_factors
+import saxs_single_bead.debye_kernel
+
+
+class BeadModel:
+    """
+    Beads of a chain of residues: their codes, form factor types and layout of locations.
+
+    Single bead and blend models have one bead per residue. The two bead model has a backbone bead ("BB")
+    followed by the side chain bead of each residue, so that locations with shape `M` by `N` by `2` by `3`
+    are viewed as `M` by `2 N` by `3` bead locations without copying.
+
+    Parameters
+    ----------
+    residue_codes: list(string)
+        List of residues of length `N`. Can be 3 letter codes (such as "GLY") or single letter codes (such as "G") or "BB"
+        for two bead backbone locations (blend model only).
+    model: int or list(int), optional
+        `1` for single bead, `2` for two bead or a list of length `N` with model type of each residue, default `1`.
+    """
+
+    def __init__(self, residue_codes, model=1):
+        self.residue_codes = list(residue_codes)
+        self.model = model
+        self.n_residues = len(residue_codes)
+        self.two_bead = np.ndim(model) == 0 and model == 2
+        self.residue_shape = (2, 3) if self.two_bead else (3,)
+
+        self.codes = saxs_single_bead.debye_kernel.bead_codes(residue_codes, model)
+        self.type_indices = saxs_single_bead.form_factors.residue_type_indices(
+            self.codes, model
+        )
+        self.n_beads = len(self.codes)
+
+    def form_factor_matrix(self, q_values):
+        """
+        Returns array with shape `B` by `Q` of form factors of beads.
+        """
+        types, inverse = np.unique(self.type_indices, return_inverse=True)
+        return saxs_single_bead.form_factors._interpolate_table(types, q_values)[
+            inverse
+        ]
+
+    def locations(self, residue_locations):
+        """
+        Returns bead locations with shape `B` by `3` or `M` by `B` by `3`, a view of `residue_locations`
+        if they are a contiguous `float64` array.
+
+        Parameters
+        ----------
+        residue_locations: np.array(float)
+            Array with shape `N` by `3` (`N` by `2` by `3` for the two bead model) of locations,
+            with an optional leading axis of length `M` for ensembles.
+        """
+        residue_locations = np.asarray(residue_locations, dtype=float)
+        residue_axes = 1 + len(self.residue_shape)
+        expected = (self.n_residues,) + self.residue_shape
+        if (
+            residue_locations.ndim not in (residue_axes, residue_axes + 1)
+            or residue_locations.shape[-residue_axes:] != expected
+        ):
+            raise ValueError(
+                f"Locations of shape {expected} or (M,) + {expected} expected, got array of shape {residue_locations.shape}"
+            )
+        return saxs_single_bead.debye_kernel.bead_locations(
+            residue_locations, self.model
+        )
+
+    def bead_indices(self, residue_indices):
+        """
+        Returns indices of beads of residues `residue_indices`.
+        """
+        residue_indices = np.asarray(residue_indices, dtype=int)
+        if self.two_bead:
+            return np.stack(
+                [2 * residue_indices, 2 * residue_indices + 1], axis=-1
+            ).ravel()
+        return residue_indices
@@ -0,0 +1,617 @@
+# cli.py
+# command line entry point computing scattering curves of directories of PDB files and ensembles
+
+import argparse
+import collections
+import concurrent.futures
+import csv
+import glob
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import saxs_single_bead.debye_kernel
+import saxs_single_bead.ensemble
+import saxs_single_bead.moments
+import saxs_single_bead.read_pdb
+import saxs_single_bead.scattering_curve
+
+_input_suffixes = (".pdb", ".npy")
+
+_output_suffix = ".dat"
+
+_summary_name = "summary.tsv"
+
+_summary_columns = (
+    "name",
+    "input",
+    "status",
+    "residues",
+    "conformers",
+    "I0",
+    "Rg",
+    "seconds",
+    "message",
+)
+
+"""
+Memory of a worker process before it loads a structure (interpreter and numpy), units: bytes.
+"""
+_process_memory = 100 * 2**20
+
+"""
+Default bound on memory used by temporary arrays of the Debye kernel of each job, units: bytes.
+"""
+_default_job_memory = 2**28
+
+Job = collections.namedtuple("Job", ["name", "path", "output", "memory"])
+Job.__doc__ = """
+One input file and the curve computed from it.
+
+Attributes
+----------
+name: string
+    Name of the input file without suffix, also the name of its output file.
+path: string
+    Path of a `.pdb` file or of a `.npy` stack of conformers.
+output: string
+    Path of the output file.
+memory: int
+    Estimated peak memory of the job, units: bytes
+"""
+
+JobOptions = collections.namedtuple(
+    "JobOptions",
+    ["model", "q_values", "sequence", "engine", "max_memory", "dtype", "backend"],
+)
+JobOptions.__doc__ = """
+Settings shared by all jobs of one run, see `main` for their meaning.
+"""
+
+
+def find_inputs(patterns):
+    """
+    Returns sorted paths of `.pdb` and `.npy` files matching `patterns`.
+
+    Parameters
+    ----------
+    patterns: list(string)
+        Paths of files, directories (searched recursively) or glob patterns (`**` matches directories).
+
+    Returns
+    -------
+    list(string)
+        List of paths without duplicates.
+    """
+    paths = list()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, "**", "*"), recursive=True)
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        paths.extend(
+            path
+            for path in matches
+            if os.path.isfile(path) and path.lower().endswith(_input_suffixes)
+        )
+    return sorted(set(paths))
+
+
+def estimate_memory(n_beads, n_conformers, max_memory=None):
+    """
+    Returns estimated peak memory of a job with `n_conformers` conformers of `n_beads` beads.
+
+    Temporaries of the Debye kernel are bounded by `max_memory` through its block size, locations are
+    held twice (as read and as bead locations in compute precision).
+
+    Parameters
+    ----------
+    n_beads: int
+        Number of beads of each conformer.
+    n_conformers: int
+        Number of conformers.
+    max_memory: int, optional
+        Bound on memory used by temporary arrays of the Debye kernel, default `2 ** 30`, units: bytes
+
+    Returns
+    -------
+    int
+        Estimated memory, units: bytes
+    """
+    block_size = saxs_single_bead.debye_kernel.choose_block_size(
+        n_beads, None, max_memory
+    )
+    chunk = min(
+        n_conformers,
+        saxs_single_bead.debye_kernel.conformers_per_chunk(
+            n_beads, block_size, max_memory
+        ),
+    )
+    temporaries = (
+        np.dtype(np.float64).itemsize
+        * saxs_single_bead.debye_kernel._temporaries_per_pair
+        * block_size**2
+        * chunk
+    )
+    locations = 2 * np.dtype(np.float64).itemsize * 3 * n_beads * n_conformers
+    return int(_process_memory + temporaries + locations)
+
+
+def _count_beads(path, model):
+    """
+    Returns number of beads per conformer and number of conformers of an input without computing anything.
+    """
+    if path.lower().endswith(".npy"):
+        shape = np.load(path, mmap_mode="r").shape
+        return (int(np.prod(shape[1:-1])), shape[0])
+
+    # residues are identified as in `run_job`, alternate locations and chains are counted alike
+    residues = len(saxs_single_bead.read_pdb.read_sequence_pdb(path))
+    return (model * residues, 1)
+
+
+def make_jobs(paths, output_dir, model=1, max_memory=None):
+    """
+    Returns list of `Job` for `paths`, one output file `<name>.dat` per input in `output_dir`.
+    """
+    jobs = list()
+    names = dict()
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name in names:
+            raise ValueError(
+                f"Inputs {names[name]} and {path} would write the same output {name}{_output_suffix}"
+            )
+        names[name] = path
+
+        n_beads, n_conformers = _count_beads(path, model)
+        jobs.append(
+            Job(
+                name,
+                path,
+                os.path.join(output_dir, name + _output_suffix),
+                estimate_memory(n_beads, n_conformers, max_memory),
+            )
+        )
+    return jobs
+
+
+def _load_input(path, options):
+    """
+    Returns residue codes and locations with a leading conformer axis of an input file.
+    """
+    if path.lower().endswith(".npy"):
+        locations = np.load(path)
+        expected = 3 if options.model == 1 else 4
+        if locations.ndim != expected:
+            raise ValueError(
+                f"Stack of conformers with {expected} axes expected for model {options.model}, got array of shape {locations.shape}"
+            )
+        if options.sequence is None:
+            raise ValueError("Ensembles stored as .npy require --sequence")
+        return (list(options.sequence), locations)
+
+    sequence = saxs_single_bead.read_pdb.read_sequence_pdb(path)
+    if options.model == 1:
+        locations = saxs_single_bead.read_pdb.read_c_alpha_pdb(path)
+    else:
+        locations = saxs_single_bead.read_pdb.read_backbone_and_coe_pdb(path)
+    if len(sequence) != len(locations):
+        raise ValueError(
+            f"Found {len(sequence)} residue names and {len(locations)} residue locations"
+        )
+    return (sequence, locations[np.newaxis])
+
+
+def _write_atomic(path, write):
+    """
+    Calls `write(file)` on a temporary file next to `path` and renames it to `path`,
+    so that `path` either does not exist or is complete.
+    """
+    directory, name = os.path.split(path)
+    handle, temporary = tempfile.mkstemp(
+        prefix="." + name + ".", suffix=".tmp", dir=directory or "."
+    )
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as f:
+            write(f)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def run_job(job, options):
+    """
+    Computes the curve of one input and writes it to `job.output`.
+
+    The output file has a header of `key: value` lines (the columns of the summary table, the settings
+    of `options` and a description of the `q` grid) followed by columns of `q` and `I(q)` values.
+
+    Parameters
+    ----------
+    job: Job
+        Input and output of the job.
+    options: JobOptions
+        Settings of the run.
+
+    Returns
+    -------
+    dict
+        Row of the summary table.
+    """
+    start = time.perf_counter()
+    sequence, locations = _load_input(job.path, options)
+    if options.model == 1:
+        curve = saxs_single_bead.scattering_curve.scattering_curve_ensemble
+    else:
+        curve = saxs_single_bead.scattering_curve.scattering_curve_two_bead_ensemble
+    q_values, I_values = curve(
+        sequence,
+        locations,
+        q_values=options.q_values,
+        engine=options.engine,
+        max_memory=options.max_memory,
+        dtype=options.dtype,
+        backend=options.backend,
+    )
+    I_0, R_g = saxs_single_bead.moments.guinier_parameters(
+        sequence, locations, model=options.model
+    )
+
+    row = {
+        "name": job.name,
+        "input": job.path,
+        "status": "done",
+        "residues": len(sequence),
+        "conformers": len(locations),
+        "I0": f"{I_0:.8g}",
+        "Rg": f"{R_g:.8g}",
+        "seconds": f"{time.perf_counter() - start:.3f}",
+        "message": "",
+    }
+    entries = dict(row)
+    entries.pop("message")
+    entries.update(_settings(options))
+    entries["q_grid"] = (
+        f"{len(q_values)} values from {q_values[0]:.8g} to {q_values[-1]:.8g}"
+    )
+    header = "\n".join(f"{key}: {value}" for key, value in entries.items())
+    _write_atomic(
+        job.output,
+        lambda f: np.savetxt(
+            f, np.stack([q_values, I_values], axis=1), header=header + "\nq I"
+        ),
+    )
+    return row
+
+
+def _settings(options):
+    """
+    Returns the settings of `options` stored in headers of outputs.
+    """
+    return {
+        "model": str(options.model),
+        "engine": options.engine,
+        "dtype": str(np.dtype(options.dtype)),
+        "backend": options.backend,
+    }
+
+
+def read_output_header(path):
+    """
+    Returns the `key: value` entries of the header of an output file, with all columns
+    of the summary table.
+    """
+    row = dict.fromkeys(_summary_columns, "")
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.startswith("#"):
+                break
+            key, separator, value = line[1:].strip().partition(": ")
+            if separator:
+                row[key] = value
+    return row
+
+
+def changed_settings(path, options):
+    """
+    Returns descriptions of settings of `options` which differ from those of the output at `path`,
+    an empty list if the output can be reused.
+    """
+    header = read_output_header(path)
+    changed = [
+        f"{key} {header.get(key, 'unknown')} instead of {value}"
+        for key, value in _settings(options).items()
+        if header.get(key) != value
+    ]
+    q_values = np.loadtxt(path, ndmin=2)[:, 0]
+    if not np.array_equal(q_values, options.q_values):
+        changed.append(f"q grid of {header.get('q_grid', 'unknown')}")
+    return changed
+
+
+def run_jobs(jobs, options, n_workers=1, memory_budget=None, report=None):
+    """
+    Runs `jobs` in a pool of `n_workers` processes, started in order as long as the memory estimates
+    of running jobs fit into `memory_budget`. A job larger than the budget runs alone.
+
+    Parameters
+    ----------
+    jobs: list(Job)
+        Jobs to run.
+    options: JobOptions
+        Settings of the run.
+    n_workers: int, optional
+        Number of worker processes, `1` runs jobs in this process, default `1`
+    memory_budget: int, optional
+        Bound on the sum of memory estimates of running jobs, by default unbounded, units: bytes
+    report: callable, optional
+        Called with each summary row as soon as its job finishes.
+
+    Returns
+    -------
+    dict
+        Summary rows keyed by job name, failed jobs have status `"failed"` and the error in `"message"`.
+    """
+    rows = dict()
+
+    def finish(job, run):
+        try:
+            row = run()
+        except Exception as error:
+            row = dict.fromkeys(_summary_columns, "")
+            row.update(
+                name=job.name, input=job.path, status="failed", message=repr(error)
+            )
+        rows[job.name] = row
+        if report is not None:
+            report(row)
+
+    if n_workers == 1:
+        for job in jobs:
+            finish(job, lambda: run_job(job, options))
+        return rows
+
+    pending = collections.deque(jobs)
+    running = dict()
+    in_use = 0
+    with saxs_single_bead.ensemble.process_pool(n_workers) as executor:
+        try:
+            while pending or running:
+                while (
+                    pending
+                    and len(running) < n_workers
+                    and (
+                        not running
+                        or memory_budget is None
+                        or in_use + pending[0].memory <= memory_budget
+                    )
+                ):
+                    job = pending.popleft()
+                    running[executor.submit(run_job, job, options)] = job
+                    in_use += job.memory
+
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    job = running.pop(future)
+                    in_use -= job.memory
+                    finish(job, future.result)
+        except BaseException:
+            for future in running:
+                future.cancel()
+            raise
+    return rows
+
+
+def write_summary(jobs, rows, path, options):
+    """
+    Writes a tab separated summary table with one row per job to `path`.
+
+    Rows come from `rows`, from headers of existing outputs computed with `options` of jobs skipped
+    in this run or have status `"pending"` for jobs which did not run.
+    """
+    lines = [_summary_columns]
+    for job in jobs:
+        if job.name in rows:
+            row = rows[job.name]
+        elif os.path.exists(job.output) and not changed_settings(job.output, options):
+            row = read_output_header(job.output)
+        else:
+            row = dict.fromkeys(_summary_columns, "")
+            row.update(name=job.name, input=job.path, status="pending")
+        lines.append([str(row[key]) for key in _summary_columns])
+    # fields containing tabs or line breaks (such as error messages) are quoted
+    _write_atomic(
+        path,
+        lambda f: csv.writer(f, delimiter="\t", lineterminator="\n").writerows(lines),
+    )
+
+
+def _default_memory_budget():
+    """
+    Returns half of the physical memory, or `4` GiB where it cannot be determined.
+    """
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2
+    except (AttributeError, ValueError, OSError):
+        return 4 * 2**30
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog="saxs-single-bead",
+        description="Computes SAXS curves of PDB files and ensembles of conformers stored as .npy stacks "
+        "(M by N by 3, or M by N by 2 by 3 for the two bead model). Writes <name>.dat per input and "
+        f"{_summary_name} to the output directory, inputs with outputs computed with the same settings are skipped.",
+    )
+    parser.add_argument(
+        "inputs", nargs="+", help="files, directories or glob patterns of inputs"
+    )
+    parser.add_argument(
+        "-o", "--output-dir", default=".", help="output directory, default: ."
+    )
+    parser.add_argument(
+        "--model",
+        type=int,
+        choices=(1, 2),
+        default=1,
+        help="1 for single bead, 2 for two bead, default: 1",
+    )
+    parser.add_argument("--minimal-q", type=float, default=0.0)
+    parser.add_argument("--maximal-q", type=float, default=0.5)
+    parser.add_argument("--points", type=int, default=20)
+    parser.add_argument(
+        "--q-values",
+        help="text file with q values in its first column, replaces the equally spaced grid",
+    )
+    parser.add_argument(
+        "--sequence",
+        help="one letter sequence of .npy ensembles, or a file containing it",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=saxs_single_bead.scattering_curve._engines,
+        default="debye",
+    )
+    parser.add_argument(
+        "--backend", choices=saxs_single_bead.debye_kernel._backends, default="numpy"
+    )
+    parser.add_argument("--dtype", choices=("float64", "float32"), default="float64")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes, default: number of cores",
+    )
+    parser.add_argument(
+        "--memory",
+        type=float,
+        help="bound on estimated memory of running jobs, units: GiB, default: half of physical memory",
+    )
+    parser.add_argument(
+        "--job-memory",
+        type=float,
+        default=_default_job_memory / 2**30,
+        help="bound on temporary arrays of each job, units: GiB, default: 0.25",
+    )
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="recompute inputs with existing outputs",
+    )
+    return parser
+
+
+def main(argv=None):
+    """
+    Runs the `saxs-single-bead` command, see `saxs-single-bead --help`.
+
+    Interrupted runs are resumed by running the same command again: outputs are written atomically,
+    so inputs with an output file are complete and skipped. Outputs computed with another model, engine,
+    precision, backend or `q` grid stop the run with an error unless `--overwrite` is given.
+
+    Parameters
+    ----------
+    argv: list(string), optional
+        Command line arguments, by default `sys.argv[1:]`
+
+    Returns
+    -------
+    int
+        Exit status, `0` if all jobs succeeded, `1` if some failed and `130` if interrupted.
+    """
+    parser = _parser()
+    arguments = parser.parse_args(argv)
+    if arguments.workers < 1:
+        parser.error("--workers has to be at least 1")
+
+    sequence = arguments.sequence
+    if sequence is not None and os.path.isfile(sequence):
+        with open(sequence, encoding="utf-8") as f:
+            sequence = "".join(line.strip() for line in f if not line.startswith(">"))
+    q_values = None
+    if arguments.q_values is not None:
+        q_values = np.loadtxt(arguments.q_values, ndmin=2)[:, 0]
+    q_values, _ = saxs_single_bead.scattering_curve._q_grid(
+        arguments.minimal_q, arguments.maximal_q, arguments.points, q_values
+    )
+
+    max_memory = int(arguments.job_memory * 2**30)
+    options = JobOptions(
+        arguments.model,
+        q_values,
+        sequence,
+        arguments.engine,
+        max_memory,
+        arguments.dtype,
+        arguments.backend,
+    )
+    memory_budget = (
+        _default_memory_budget()
+        if arguments.memory is None
+        else int(arguments.memory * 2**30)
+    )
+
+    paths = find_inputs(arguments.inputs)
+    if not paths:
+        parser.error("no .pdb or .npy inputs found")
+    os.makedirs(arguments.output_dir, exist_ok=True)
+    try:
+        jobs = make_jobs(paths, arguments.output_dir, arguments.model, max_memory)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+    remaining = list()
+    for job in jobs:
+        if arguments.overwrite or not os.path.exists(job.output):
+            remaining.append(job)
+            continue
+        changed = changed_settings(job.output, options)
+        if changed:
+            parser.error(
+                f"{job.output} was computed with {', '.join(changed)}, "
+                "use --overwrite to recompute outputs with the current settings"
+            )
+    print(
+        f"{len(jobs)} inputs, {len(jobs) - len(remaining)} already done",
+        file=sys.stderr,
+    )
+
+    finished = list()
+
+    def report(row):
+        finished.append(row)
+        print(
+            f"[{len(finished)}/{len(remaining)}] {row['name']} {row['status']} {row['message']}".rstrip(),
+            file=sys.stderr,
+        )
+
+    try:
+        rows = run_jobs(
+            remaining, options, arguments.workers, memory_budget, report=report
+        )
+    except KeyboardInterrupt:
+        # rows of finished jobs, outputs of interrupted jobs were never renamed into place
+        write_summary(
+            jobs,
+            {row["name"]: row for row in finished},
+            os.path.join(arguments.output_dir, _summary_name),
+            options,
+        )
+        return 130
+    write_summary(
+        jobs, rows, os.path.join(arguments.output_dir, _summary_name), options
+    )
+
+    if any(row["status"] == "failed" for row in rows.values()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
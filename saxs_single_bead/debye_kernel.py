@@ -0,0 +1,309 @@
+# debye_kernel.py
+# memory bounded evaluation of the Debye double sum shared by all scattering curves
+
+import warnings
+import numpy as np
+import saxs_single_bead.numba_kernel
+
+"""
+Default bound on memory used by temporary arrays of the Debye kernel, units: bytes.
+"""
+_default_max_memory = 2**30
+
+"""
+Number of `float64` temporaries with the size of one block of pairs allocated by the Debye kernel.
+"""
+_temporaries_per_pair = 12
+
+"""
+Largest number of conformers processed at once. Chunks do not depend on the number of workers,
+which keeps parallel and serial results identical.
+"""
+_max_conformers_per_chunk = 32
+
+_dtypes = (np.float32, np.float64)
+
+_backends = ("numpy", "numba", "blas")
+
+"""
+Beads per tile and `q` values per batch of the `"blas"` backend. Small tiles keep the sinc
+kernel in cache and waste little work on the full (not triangular) diagonal tiles.
+"""
+_blas_tile = 128
+_blas_q_batch = 4
+
+
+def check_dtype(dtype):
+    """
+    Returns `dtype` as `np.dtype` if it is a supported compute precision.
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in _dtypes:
+        raise ValueError(
+            f"{dtype} is not a valid compute precision. 'float32' or 'float64' are allowed."
+        )
+    return dtype
+
+
+def check_backend(backend):
+    """
+    Returns the backend used for `backend`, `"numba"` falls back to `"numpy"` with a warning
+    if numba is not installed.
+    """
+    if backend not in _backends:
+        raise ValueError(
+            f"{backend} is not a valid backend. One of {', '.join(_backends)} is allowed."
+        )
+    if backend == "numba" and not saxs_single_bead.numba_kernel.available:
+        warnings.warn(
+            "numba is not installed, falling back to the numpy backend", RuntimeWarning
+        )
+        return "numpy"
+    return backend
+
+
+def bead_codes(residue_codes, model=1):
+    """
+    Returns list of bead codes of a bead model built from `residue_codes`.
+
+    For the two bead model (`model=2`) the backbone bead ("BB") of each residue is followed
+    by its side chain bead. Single bead and blend models have one bead per code.
+    """
+    if np.ndim(model) == 0 and model == 2:
+        return [code for residue in residue_codes for code in ("BB", residue)]
+    return list(residue_codes)
+
+
+def bead_locations(residue_locations, model=1):
+    """
+    Returns bead locations of shape `(M, B, 3)` or `(B, 3)` matching the order of `bead_codes`.
+
+    For the two bead model `residue_locations` has shape `(M, N, 2, 3)` or `(N, 2, 3)`,
+    merging the last two residue axes keeps contiguous arrays as views.
+    """
+    residue_locations = np.asarray(residue_locations, dtype=float)
+    if np.ndim(model) == 0 and model == 2:
+        shape = residue_locations.shape
+        return residue_locations.reshape(shape[:-3] + (2 * shape[-3], 3))
+    return residue_locations
+
+
+def choose_block_size(n_beads, block_size=None, max_memory=None, dtype=np.float64):
+    """
+    Returns the number of beads per block such that temporaries fit into `max_memory` bytes.
+    """
+    if block_size is None:
+        if max_memory is None:
+            max_memory = _default_max_memory
+        block_size = int(
+            np.sqrt(max_memory / (np.dtype(dtype).itemsize * _temporaries_per_pair))
+        )
+    if block_size < 1:
+        raise ValueError(
+            "`block_size` and `max_memory` have to allow at least one bead"
+        )
+    return min(block_size, max(n_beads, 1))
+
+
+def conformers_per_chunk(n_beads, block_size, max_memory=None, dtype=np.float64):
+    """
+    Returns how many conformers can be processed at once with blocks of `block_size` beads.
+    """
+    if max_memory is None:
+        max_memory = _default_max_memory
+    if block_size < n_beads:
+        return 1
+    pair_bytes = np.dtype(dtype).itemsize * _temporaries_per_pair
+    return min(
+        _max_conformers_per_chunk,
+        max(1, int(max_memory // (pair_bytes * block_size**2))),
+    )
+
+
+def _pair_distances(locations, block_a, block_b):
+    """
+    Returns distances between pairs of beads of two blocks, for `block_a == block_b` only pairs
+    above the diagonal are returned in condensed form together with their bead indices.
+    """
+    if block_a == block_b:
+        first, second = np.triu_indices(block_a.stop - block_a.start, k=1)
+        first = first + block_a.start
+        second = second + block_a.start
+        distances = np.sqrt(
+            np.sum((locations[:, second, :] - locations[:, first, :]) ** 2, axis=-1)
+        )
+        return (distances, first, second)
+
+    distances = np.sqrt(
+        np.sum(
+            (
+                locations[:, np.newaxis, block_b, :]
+                - locations[:, block_a, np.newaxis, :]
+            )
+            ** 2,
+            axis=-1,
+        )
+    )
+    return (distances, block_a, block_b)
+
+
+def _gram_distances(locations, block_a, block_b):
+    """
+    Returns distances between all beads of two blocks from `|x| ** 2 + |y| ** 2 - 2 x . y`,
+    the products `x . y` are one (batched) matrix product.
+    """
+    first = locations[:, block_a]
+    second = locations[:, block_b]
+    squared = (
+        np.sum(first**2, axis=-1)[:, :, np.newaxis]
+        + np.sum(second**2, axis=-1)[:, np.newaxis, :]
+        - 2.0 * (first @ np.swapaxes(second, 1, 2))
+    )
+    np.maximum(
+        squared, 0.0, out=squared
+    )  # rounding can make distances of a bead to itself negative
+    return np.sqrt(squared, out=squared)
+
+
+def _blas_intensity(locations, form_factor_matrix, q_values, block_size, dtype):
+    """
+    Evaluates the Debye double sum as `sum_ab f_a(q) . (S_ab(q) f_b(q))` over tiles `a <= b` of beads.
+
+    For a batch of `q` values the sinc kernels `S_ab(q)` of a tile pair are built at once and contracted with
+    form factors by batched matrix vector products, so that the sums over pairs run in BLAS.
+    Diagonal tiles are full, their diagonal (`sinc(0) = 1`) gives `sum_i f_i(q) ** 2`.
+    """
+    # distances do not change, centering reduces cancellation of the Gram formula
+    locations = locations - np.mean(locations, axis=1, keepdims=True)
+    locations = locations.astype(dtype, copy=False)
+    form_factors = np.ascontiguousarray(form_factor_matrix.T, dtype=dtype)
+    q_values = np.asarray(q_values, dtype=dtype)
+    tiny = np.finfo(dtype).tiny
+
+    n_conformers, n_beads, _ = locations.shape
+    tile = min(block_size, _blas_tile)
+    I_values = np.zeros((n_conformers, len(q_values)))
+
+    for start_a in range(0, n_beads, tile):
+        block_a = slice(start_a, min(start_a + tile, n_beads))
+        for start_b in range(start_a, n_beads, tile):
+            block_b = slice(start_b, min(start_b + tile, n_beads))
+            distances = _gram_distances(locations, block_a, block_b)
+            weight = 1.0 if start_a == start_b else 2.0
+
+            for start_q in range(0, len(q_values), _blas_q_batch):
+                batch = slice(start_q, start_q + _blas_q_batch)
+                arguments = (
+                    distances[:, np.newaxis] * q_values[batch, np.newaxis, np.newaxis]
+                )
+                arguments[arguments == 0.0] = tiny  # sin(x) / x is exactly one
+                sinc = np.sin(arguments)
+                sinc /= arguments
+                row_sums = np.matmul(sinc, form_factors[batch, block_b, np.newaxis])
+                I_values[:, batch] += weight * np.sum(
+                    row_sums[..., 0] * form_factors[batch, block_a],
+                    axis=-1,
+                    dtype=np.float64,
+                )
+
+    return I_values
+
+
+def debye_intensity(
+    locations,
+    form_factor_matrix,
+    q_values,
+    block_size,
+    dtype=np.float64,
+    backend="numpy",
+):
+    """
+    Evaluates the Debye double sum over blocks of `block_size` by `block_size` bead pairs.
+
+    Only pairs above the diagonal are evaluated and counted twice, the diagonal contributes
+    `sum_i f_i(q) ** 2` since `sinc(0) = 1`. Peak memory is proportional to `M * block_size ** 2`
+    plus `B` by `Q` form factors.
+
+    With `dtype=np.float32` distances, sinc and products are evaluated in single precision
+    while sums over pairs are accumulated in double precision.
+
+    With `backend="blas"` squared distances come from the Gram matrix of bead locations and sums over
+    pairs from batched matrix vector products with form factors (rows of single precision tiles are summed
+    by BLAS in `dtype`), multithreaded BLAS libraries then use all cores. Blocks are split into tiles
+    of at most 128 beads. On one core 3000 beads and 20 `q` values take 1.3 s instead of 3.2 s in `float64`
+    and 0.16 s instead of 1.3 s in `float32`, where relative errors grow from 3e-7 to 5e-6.
+
+    Parameters
+    ----------
+    locations: np.array(float)
+        Array with shape `B` by `3` or `M` by `B` by `3` of bead locations.
+    form_factor_matrix: np.array(float)
+        Array with shape `B` by `Q` of bead form factors.
+    q_values: np.array(float)
+        Vector of length `Q` of scattering vectors, units: Angstrom^(-1)
+    block_size: int
+        Number of beads per block.
+    dtype: np.dtype, optional
+        Precision of distances and sinc evaluations, `np.float32` or `np.float64`, default `np.float64`
+    backend: string, optional
+        `"numpy"` for this blocked kernel, `"blas"` for matrix products over tiles or `"numba"` for the compiled
+        kernel of `numba_kernel`, which ignores `block_size`, default `"numpy"`
+
+    Returns
+    -------
+    np.array(float)
+        Array of length `Q` or shape `M` by `Q` with `I(q)` of each conformer.
+    """
+    backend = check_backend(backend)
+    if backend == "numba":
+        return saxs_single_bead.numba_kernel.debye_intensity(
+            locations, form_factor_matrix, q_values, check_dtype(dtype)
+        )
+
+    single = locations.ndim == 2
+    if single:
+        locations = locations[np.newaxis]
+
+    dtype = check_dtype(dtype)
+    if backend == "blas":
+        I_values = _blas_intensity(
+            locations, form_factor_matrix, q_values, block_size, dtype
+        )
+        return I_values[0] if single else I_values
+
+    if dtype != np.float64:
+        # centering keeps single precision coordinates close to the origin
+        locations = locations - np.mean(locations, axis=1, keepdims=True)
+    locations = locations.astype(dtype, copy=False)
+    compute_form_factors = form_factor_matrix.astype(dtype, copy=False)
+
+    n_conformers, n_beads, _ = locations.shape
+    I_values = np.zeros((n_conformers, len(q_values)))
+    I_values += np.sum(form_factor_matrix**2, axis=0)
+
+    for start_a in range(0, n_beads, block_size):
+        block_a = slice(start_a, min(start_a + block_size, n_beads))
+        for start_b in range(start_a, n_beads, block_size):
+            block_b = slice(start_b, min(start_b + block_size, n_beads))
+
+            distances, first, second = _pair_distances(locations, block_a, block_b)
+
+            for i, q in enumerate(q_values):
+                if block_a == block_b:
+                    products = (
+                        compute_form_factors[first, i] * compute_form_factors[second, i]
+                    )
+                else:
+                    products = (
+                        compute_form_factors[first, i, np.newaxis]
+                        * compute_form_factors[np.newaxis, second, i]
+                    )
+                I_values[:, i] += 2.0 * np.sum(
+                    products * np.sinc(distances * dtype.type(q / np.pi)),
+                    axis=tuple(range(1, distances.ndim)),
+                    dtype=np.float64,
+                )
+
+    if single:
+        return I_values[0]
+    return I_values
@@ -0,0 +1,325 @@
+# distance_histogram.py
+# pair distance histograms resolved by form factor types
+
+import collections
+import numpy as np
+import saxs_single_bead.form_factors
+import saxs_single_bead.partial_structure
+
+"""
+Largest absolute value of the derivative of sinc(x) = sin(x) / x, attained at x ~ 2.08.
+"""
+_max_sinc_slope = 0.4362
+
+_default_block_elements = 2**20
+
+_weightings = ("form_factor", "electrons")
+
+PairDistribution = collections.namedtuple(
+    "PairDistribution", ["r_values", "distribution", "self_term"]
+)
+PairDistribution.__doc__ = """
+Weighted pair distance distribution `P(r) = sum_{i != j} w_i w_j delta(r - r_ij)` averaged over conformers.
+
+Attributes
+----------
+r_values: np.array(float)
+    Vector of distances, units: Angstrom
+distribution: np.array(float)
+    Vector of `P(r)` values, units: Angstrom^(-1), its integral is `sum_{i != j} w_i w_j`.
+self_term: float
+    Contribution of pairs of beads with themselves `sum_i w_i ** 2`, `I(0)` is `self_term + integral of P(r)`.
+"""
+
+
+class PairDistanceHistogram:
+    """
+    Histograms of bead pair distances, one per pair of form factor types.
+
+    Binning the pair distances once replaces the `N` by `N` Debye double sum with a sum over
+    distance bins, so that the cost of each `q` point no longer depends on the number of beads.
+    Distances are represented by the centres of their bins, therefore for each conformer
+
+        |I_histogram(q) - I(q)| <= 0.4362 * q * bin_width * sum_{i<j} |f_i(q) f_j(q)|
+
+    which is a worst case bound, typical errors are orders of magnitude smaller (see `error_bound`).
+
+    Parameters
+    ----------
+    type_indices: np.array(int)
+        Vector of length `B` of form factor type indices of beads (see `form_factors.residue_type_indices`).
+    bin_width: float, optional
+        Width of distance bins, default `0.1`, units: Angstrom
+    """
+
+    def __init__(self, type_indices, bin_width=0.1):
+        if bin_width <= 0.0:
+            raise ValueError("`bin_width` has to be positive")
+
+        self.types, self._bead_types = np.unique(type_indices, return_inverse=True)
+        self.bin_width = bin_width
+        self.type_counts = np.bincount(self._bead_types, minlength=len(self.types))
+
+        first, second = np.triu_indices(len(self.types))
+        self.pairs = np.stack([first, second], axis=1)
+        self._pair_index = np.zeros((len(self.types), len(self.types)), dtype=int)
+        self._pair_index[first, second] = np.arange(len(first))
+        self._pair_index[second, first] = np.arange(len(first))
+
+        self.counts = np.zeros((len(self.pairs), 0))
+        self.conformers = 0
+
+    def add(self, locations):
+        """
+        Adds pair distances of one conformer or a batch of conformers to the histograms.
+
+        Parameters
+        ----------
+        locations: np.array(float)
+            Array with shape `B` by `3` or `M` by `B` by `3` of bead locations.
+        """
+        n_beads = len(self._bead_types)
+        locations = np.asarray(locations, dtype=float).reshape(-1, n_beads, 3)
+        block = max(1, _default_block_elements // max(n_beads, 1))
+
+        for conformer in locations:
+            for start in range(0, n_beads, block):
+                stop = min(start + block, n_beads)
+                rows, columns = np.triu_indices(stop - start, k=1, m=n_beads - start)
+                rows = rows + start
+                columns = columns + start
+
+                distances = np.sqrt(
+                    np.sum((conformer[rows] - conformer[columns]) ** 2, axis=-1)
+                )
+                bins = (distances / self.bin_width).astype(int)
+                pairs = self._pair_index[
+                    self._bead_types[rows], self._bead_types[columns]
+                ]
+                self._accumulate(pairs, bins)
+
+            self.conformers += 1
+
+    def _accumulate(self, pairs, bins):
+        if len(bins) == 0:
+            return
+        n_bins = max(self.counts.shape[1], bins.max() + 1)
+        if n_bins > self.counts.shape[1]:
+            self.counts = np.pad(
+                self.counts, ((0, 0), (0, n_bins - self.counts.shape[1]))
+            )
+        self.counts += np.bincount(
+            pairs * n_bins + bins, minlength=self.counts.size
+        ).reshape(self.counts.shape)
+
+    @property
+    def bin_centres(self):
+        """Centres of distance bins, units: Angstrom"""
+        return (np.arange(self.counts.shape[1]) + 0.5) * self.bin_width
+
+    def _type_form_factors(self, q_values):
+        return saxs_single_bead.form_factors._interpolate_table(self.types, q_values)
+
+    def intensity(self, q_values):
+        """
+        Computes scattering intensity averaged over all added conformers.
+
+        Parameters
+        ----------
+        q_values: np.array(float)
+            Vector of length `Q` of scattering vectors, units: Angstrom^(-1)
+
+        Returns
+        -------
+        np.array(float)
+            Vector of length `Q` of `I(q)` values.
+        """
+        if self.conformers == 0:
+            raise ValueError("No conformers were added to the histogram")
+
+        q_values = np.asarray(q_values, dtype=float)
+        form_factors = self._type_form_factors(q_values)
+
+        sinc = np.sinc(
+            self.bin_centres[:, np.newaxis] * q_values[np.newaxis, :] / np.pi
+        )
+        pair_sums = (self.counts / self.conformers) @ sinc
+
+        return np.sum(
+            self.type_counts[:, np.newaxis] * form_factors**2, axis=0
+        ) + 2.0 * np.sum(
+            form_factors[self.pairs[:, 0]] * form_factors[self.pairs[:, 1]] * pair_sums,
+            axis=0,
+        )
+
+    def partial_structure_factors(self, q_values):
+        """
+        Computes partial structure factors of pairs of types averaged over all added conformers,
+        `partial_structure.contract` turns them into `I(q)` for any form factors.
+
+        Parameters
+        ----------
+        q_values: np.array(float)
+            Vector of length `Q` of scattering vectors, units: Angstrom^(-1)
+
+        Returns
+        -------
+        partial_structure.PartialStructureFactors
+            Named tuple of `q_values`, `types` and `values`.
+        """
+        if self.conformers == 0:
+            raise ValueError("No conformers were added to the histogram")
+
+        q_values = np.asarray(q_values, dtype=float)
+        sinc = np.sinc(
+            self.bin_centres[:, np.newaxis] * q_values[np.newaxis, :] / np.pi
+        )
+        pair_sums = (self.counts / self.conformers) @ sinc
+
+        values = pair_sums[self._pair_index]
+        values[np.arange(len(self.types)), np.arange(len(self.types))] *= 2.0
+        values[
+            np.arange(len(self.types)), np.arange(len(self.types))
+        ] += self.type_counts[:, np.newaxis]
+        return saxs_single_bead.partial_structure.PartialStructureFactors(
+            q_values, self.types, values
+        )
+
+    def _type_weights(self, weights):
+        if isinstance(weights, str):
+            if weights == "form_factor":
+                return self._type_form_factors([0.0])[:, 0]
+            elif weights == "electrons":
+                return saxs_single_bead.form_factors._type_electrons(self.types)
+            raise ValueError(
+                f"{weights} is not a valid weighting. One of {', '.join(_weightings)} or an array is allowed."
+            )
+        weights = np.asarray(weights, dtype=float)
+        if weights.shape != (len(self.types),):
+            raise ValueError(
+                f"Weights of shape {(len(self.types),)} expected, got array of shape {weights.shape}"
+            )
+        return weights
+
+    def distribution(self, weights="form_factor", r_values=None):
+        """
+        Computes the weighted pair distance distribution `P(r)` averaged over all added conformers.
+
+        Parameters
+        ----------
+        weights: string or np.array(float), optional
+            `"form_factor"` for form factors at `q = 0`, `"electrons"` for numbers of electrons of beads
+            or a vector of weights of each type in `types`, default `"form_factor"`
+        r_values: np.array(float), optional
+            Distances at which `P(r)` is linearly interpolated, by default centres of distance bins, units: Angstrom
+
+        Returns
+        -------
+        PairDistribution
+            Named tuple of `r_values`, `distribution` and `self_term`.
+        """
+        if self.conformers == 0:
+            raise ValueError("No conformers were added to the histogram")
+
+        type_weights = self._type_weights(weights)
+        products = type_weights[self.pairs[:, 0]] * type_weights[self.pairs[:, 1]]
+        # both orderings of each pair, histogram counts are divided by bin width to give a density
+        density = 2.0 * (products @ self.counts) / (self.conformers * self.bin_width)
+        self_term = np.sum(self.type_counts * type_weights**2)
+
+        if r_values is None:
+            return PairDistribution(self.bin_centres, density, self_term)
+        r_values = np.asarray(r_values, dtype=float)
+        return PairDistribution(
+            r_values,
+            np.interp(r_values, self.bin_centres, density, left=0.0, right=0.0),
+            self_term,
+        )
+
+    def error_bound(self, q_values):
+        """
+        Worst case absolute error of `intensity` caused by binning of distances.
+
+        Parameters
+        ----------
+        q_values: np.array(float)
+            Vector of length `Q` of scattering vectors, units: Angstrom^(-1)
+
+        Returns
+        -------
+        np.array(float)
+            Vector of length `Q` of error bounds.
+        """
+        q_values = np.asarray(q_values, dtype=float)
+        form_factors = np.abs(self._type_form_factors(q_values))
+
+        total = np.sum(self.type_counts[:, np.newaxis] * form_factors, axis=0)
+        diagonal = np.sum(self.type_counts[:, np.newaxis] * form_factors**2, axis=0)
+
+        return (
+            _max_sinc_slope
+            * np.abs(q_values)
+            * self.bin_width
+            * 0.5
+            * (total**2 - diagonal)
+        )
+
+
+def histogram_intensity(type_indices, locations, q_values, bin_width=0.1):
+    """
+    Computes scattering intensity with the pair distance histogram engine.
+
+    Parameters
+    ----------
+    type_indices: np.array(int)
+        Vector of length `B` of form factor type indices of beads.
+    locations: np.array(float)
+        Array with shape `B` by `3` or `M` by `B` by `3` of bead locations,
+        histograms are pooled over all `M` conformers.
+    q_values: np.array(float)
+        Vector of length `Q` of scattering vectors, units: Angstrom^(-1)
+    bin_width: float, optional
+        Width of distance bins, default `0.1`, units: Angstrom
+
+    Returns
+    -------
+    np.array(float)
+        Vector of length `Q` of `I(q)` values.
+    """
+    histogram = PairDistanceHistogram(type_indices, bin_width=bin_width)
+    histogram.add(locations)
+    return histogram.intensity(q_values)
+
+
+def distribution_intensity(distribution, q_values):
+    """
+    Computes scattering intensity from a pair distance distribution by the sine transform
+
+        I(q) = self_term + integral P(r) sin(q r) / (q r) dr,
+
+    so that new `q` grids do not revisit the geometry. Weights of `P(r)` do not depend on `q`,
+    with form factor weights this is the approximation of constant form factors, accurate at low `q`.
+    `PairDistanceHistogram.intensity` keeps form factors resolved by type and `q`.
+
+    Parameters
+    ----------
+    distribution: PairDistribution
+        Distribution on an equally spaced grid of distances, for example from `PairDistanceHistogram.distribution`.
+    q_values: np.array(float)
+        Vector of length `Q` of scattering vectors, units: Angstrom^(-1)
+
+    Returns
+    -------
+    np.array(float)
+        Vector of length `Q` of `I(q)` values.
+    """
+    r_values = np.asarray(distribution.r_values, dtype=float)
+    if len(r_values) < 2:
+        return np.full(len(np.atleast_1d(q_values)), distribution.self_term)
+    steps = np.diff(r_values)
+    if np.any(steps <= 0.0) or not np.allclose(steps, steps[0]):
+        raise ValueError("Distances of the distribution have to be equally spaced")
+
+    q_values = np.asarray(q_values, dtype=float)
+    sinc = np.sinc(r_values[:, np.newaxis] * q_values[np.newaxis, :] / np.pi)
+    return distribution.self_term + steps[0] * (distribution.distribution @ sinc)
@@ -0,0 +1,466 @@
+# ensemble.py
+# streaming evaluation of scattering curves averaged over ensembles of conformers
+
+import concurrent.futures
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+import numpy as np
+import saxs_single_bead.debye_kernel
+import saxs_single_bead.bead_model
+
+
+def process_pool(n_workers=None):
+    """
+    Returns a `ProcessPoolExecutor` with `n_workers` processes started by `"spawn"`.
+
+    Forked workers inherit locks of threads running in the parent process and deadlock once the `"numba"`
+    backend (or a multithreaded BLAS) has started its thread pool, spawned workers start from a fresh
+    interpreter. Scripts creating pools have to guard their entry point with `if __name__ == "__main__":`.
+    """
+    return concurrent.futures.ProcessPoolExecutor(
+        n_workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+class EnsembleAccumulator:
+    """
+    Accumulates scattering curves of conformers added one at a time or in batches.
+
+    Conformers are processed in chunks that fit into `max_memory`, so memory use does not
+    depend on the number of conformers. Accumulators of the same problem can be merged,
+    for example to combine partial results computed by different workers.
+
+    Parameters
+    ----------
+    residue_codes: list(string) or BeadModel
+        List of residues of length `N`. Can be 3 letter codes (such as "GLY") or single letter codes (such as "G") or "BB"
+        for two bead backbone locations (blend model only). A `bead_model.BeadModel` replaces codes and `model`.
+    q_values: np.array(float)
+        Vector of length `Q` of scattering vectors, units: Angstrom^(-1)
+    model: int or list(int), optional
+        `1` for single bead, `2` for two bead or a list of length `N` with model type of each residue, default `1`.
+        Conformers have shape `N` by `3` for single bead and blend models and `N` by `2` by `3` for the two bead model.
+    block_size: int, optional
+        Number of beads per block of pairs processed at once, by default chosen from `max_memory`
+    max_memory: int, optional
+        Bound on memory used by temporary arrays, default `2 ** 30`, units: bytes
+    dtype: np.dtype, optional
+        Precision of distances and sinc evaluations, `np.float32` or `np.float64`, default `np.float64`
+    backend: string, optional
+        `"numpy"` for the blocked kernel, `"blas"` for matrix products over tiles or `"numba"` for the compiled
+        kernel (falls back to `"numpy"` with a warning if numba is not installed), default `"numpy"`
+
+    Examples
+    --------
+    >>> accumulator = EnsembleAccumulator(sequence, np.linspace(0.0, 0.5, 20))
+    >>> for conformer in conformer_generator:
+    ...     accumulator.add(conformer)
+    >>> (q_values, I_values) = accumulator.result()
+    """
+
+    def __init__(
+        self,
+        residue_codes,
+        q_values,
+        model=1,
+        block_size=None,
+        max_memory=None,
+        dtype=np.float64,
+        backend="numpy",
+    ):
+        self.q_values = np.asarray(q_values, dtype=float)
+        if isinstance(residue_codes, saxs_single_bead.bead_model.BeadModel):
+            self.beads = residue_codes
+        else:
+            self.beads = saxs_single_bead.bead_model.BeadModel(residue_codes, model)
+        self.residue_codes = self.beads.residue_codes
+        self.model = self.beads.model
+
+        self._form_factor_matrix = self.beads.form_factor_matrix(self.q_values)
+        self._conformer_shape = (self.beads.n_residues,) + self.beads.residue_shape
+
+        self.dtype = saxs_single_bead.debye_kernel.check_dtype(dtype)
+        self.backend = saxs_single_bead.debye_kernel.check_backend(backend)
+        self._block_size = saxs_single_bead.debye_kernel.choose_block_size(
+            self.beads.n_beads, block_size, max_memory, self.dtype
+        )
+        self._chunk = saxs_single_bead.debye_kernel.conformers_per_chunk(
+            self.beads.n_beads, self._block_size, max_memory, self.dtype
+        )
+
+        self.count = 0
+        self.sum = np.zeros_like(self.q_values)
+        self.squares = np.zeros_like(self.q_values)
+
+    def _conformer_intensities(self, conformers):
+        """
+        Returns `M` by `Q` array of `I(q)` of each conformer of the batch `conformers`.
+        """
+        return saxs_single_bead.debye_kernel.debye_intensity(
+            self.beads.locations(conformers),
+            self._form_factor_matrix,
+            self.q_values,
+            self._block_size,
+            dtype=self.dtype,
+            backend=self.backend,
+        )
+
+    def _chunks(self, n_conformers):
+        return [
+            (start, min(start + self._chunk, n_conformers))
+            for start in range(0, n_conformers, self._chunk)
+        ]
+
+    def _chunk_sums(self, conformers, chunks, keep=False):
+        """
+        Returns sums of `I(q)` and of squared deviations from the chunk mean of each chunk,
+        together with `I(q)` of each conformer of the chunk if `keep` is set.
+        """
+        chunk_sums = list()
+        for start, stop in chunks:
+            intensities = self._conformer_intensities(conformers[start:stop])
+            chunk_sum = np.sum(intensities, axis=0)
+            chunk_squares = np.sum(
+                (intensities - chunk_sum / (stop - start)) ** 2, axis=0
+            )
+            chunk_sums.append((chunk_sum, chunk_squares, intensities if keep else None))
+        return chunk_sums
+
+    def _combine(self, count, chunk_sum, chunk_squares):
+        """
+        Adds statistics of `count` conformers, squared deviations are combined with the pairwise
+        update of Chan et al. which stays accurate for small variances.
+        """
+        if self.count > 0:
+            deviation = chunk_sum / count - self.sum / self.count
+            self.squares += chunk_squares + deviation**2 * self.count * count / (
+                self.count + count
+            )
+        else:
+            self.squares += chunk_squares
+        self.sum += chunk_sum
+        self.count += count
+
+    def _reduce(self, chunk_sums, chunks, out=None):
+        for (chunk_sum, chunk_squares, intensities), (start, stop) in zip(
+            chunk_sums, chunks
+        ):
+            self._combine(stop - start, chunk_sum, chunk_squares)
+            if out is not None:
+                out[start:stop] = intensities
+
+    def _add_batch(self, conformers, out=None):
+        chunks = self._chunks(len(conformers))
+        for chunk in chunks:
+            # chunks are reduced one by one, so only one chunk of `I(q)` is kept at a time
+            self._reduce(
+                self._chunk_sums(conformers, [chunk], keep=out is not None),
+                [chunk],
+                out,
+            )
+
+    def add(self, locations):
+        """
+        Adds conformers to the ensemble.
+
+        Parameters
+        ----------
+        locations: np.array(float) or iterable(np.array(float))
+            Single conformer, batch of conformers with an additional leading axis of length `M`
+            or an iterable (such as a generator) of conformers or batches.
+
+        Returns
+        -------
+        EnsembleAccumulator
+            The accumulator itself.
+        """
+        if isinstance(locations, np.ndarray):
+            if locations.shape == self._conformer_shape:
+                self._add_batch(locations[np.newaxis])
+                return self
+            if locations.shape[1:] == self._conformer_shape:
+                self._add_batch(locations)
+                return self
+            raise ValueError(
+                f"Conformers of shape {self._conformer_shape} expected, got array of shape {locations.shape}"
+            )
+
+        buffer = list()
+        for item in locations:
+            item = np.asarray(item, dtype=float)
+            if item.shape != self._conformer_shape:
+                self.add(item)
+                continue
+            buffer.append(item)
+            if len(buffer) == self._chunk:
+                self._add_batch(np.array(buffer))
+                buffer = list()
+        if len(buffer) > 0:
+            self._add_batch(np.array(buffer))
+
+        return self
+
+    def add_parallel(self, conformers, n_workers=None, executor=None, out=None):
+        """
+        Adds a batch of conformers splitting the work between processes.
+
+        The batch is placed in shared memory once and never pickled per task. Each task returns sums
+        of `I(q)` over chunks of conformers which are reduced in the same order as in `add`,
+        so the result is identical to serial evaluation.
+
+        Work on different conformers is independent and only `Q` numbers per chunk are sent back,
+        so the speedup grows linearly with the number of workers up to the number of physical cores,
+        for large ensembles it is limited by memory bandwidth. Set `OMP_NUM_THREADS=1` so that
+        numpy threads do not compete with worker processes.
+
+        Parameters
+        ----------
+        conformers: np.array(float)
+            Batch of conformers with a leading axis of length `M`.
+        n_workers: int, optional
+            Number of worker processes, default number of cores. The batch is split into `4 * n_workers` tasks,
+            also when `executor` is given.
+        executor: concurrent.futures.Executor, optional
+            Executor running the tasks, by default a new `process_pool` with `n_workers` processes.
+        out: np.array(float), optional
+            Array with shape `M` by `Q` receiving `I(q)` of each conformer.
+
+        Returns
+        -------
+        EnsembleAccumulator
+            The accumulator itself.
+        """
+        conformers = np.ascontiguousarray(conformers, dtype=float)
+        if conformers.shape[1:] != self._conformer_shape:
+            raise ValueError(
+                f"Conformers of shape {self._conformer_shape} expected, got array of shape {conformers.shape}"
+            )
+
+        chunks = self._chunks(len(conformers))
+        if len(chunks) == 0:
+            return self
+
+        memory = shared_memory.SharedMemory(create=True, size=conformers.nbytes)
+        try:
+            np.ndarray(conformers.shape, dtype=float, buffer=memory.buf)[:] = conformers
+
+            if n_workers is None:
+                n_workers = os.cpu_count() or 1
+            own_executor = executor is None
+            if own_executor:
+                executor = process_pool(n_workers)
+            try:
+                tasks = np.array_split(np.arange(len(chunks)), 4 * n_workers)
+                futures = [
+                    executor.submit(
+                        _shared_chunk_sums,
+                        self,
+                        memory.name,
+                        conformers.shape,
+                        [chunks[i] for i in task],
+                        out is not None,
+                    )
+                    for task in tasks
+                    if len(task) > 0
+                ]
+                chunk_sums = [
+                    chunk_sum for future in futures for chunk_sum in future.result()
+                ]
+            finally:
+                if own_executor:
+                    executor.shutdown()
+        finally:
+            memory.close()
+            memory.unlink()
+
+        self._reduce(chunk_sums, chunks, out)
+        return self
+
+    def add_per_conformer(self, conformers, out=None, n_workers=None, executor=None):
+        """
+        Adds a batch of conformers and returns `I(q)` of each of them.
+
+        Rows are written chunk by chunk as they are computed, so `out` can be a memory mapped
+        array (for example from `np.lib.format.open_memmap`) much larger than available memory.
+
+        Parameters
+        ----------
+        conformers: np.array(float)
+            Batch of conformers with a leading axis of length `M`.
+        out: np.array(float), optional
+            Array with shape `M` by `Q` receiving `I(q)` of each conformer, by default a new array.
+        n_workers: int, optional
+            Number of worker processes, by default conformers are processed serially.
+        executor: concurrent.futures.Executor, optional
+            Executor used instead of a new process pool of `n_workers` processes.
+
+        Returns
+        -------
+        np.array(float)
+            Array with shape `M` by `Q` of `I(q)` of each conformer.
+        """
+        conformers = np.asarray(conformers, dtype=float)
+        if conformers.shape[1:] != self._conformer_shape:
+            raise ValueError(
+                f"Conformers of shape {self._conformer_shape} expected, got array of shape {conformers.shape}"
+            )
+        if out is None:
+            out = np.empty((len(conformers), len(self.q_values)))
+        if out.shape != (len(conformers), len(self.q_values)):
+            raise ValueError(
+                f"`out` of shape {(len(conformers), len(self.q_values))} expected, got array of shape {out.shape}"
+            )
+
+        if n_workers is None and executor is None:
+            self._add_batch(conformers, out)
+        else:
+            self.add_parallel(
+                conformers, n_workers=n_workers, executor=executor, out=out
+            )
+        return out
+
+    def merge(self, other):
+        """
+        Adds conformers accumulated by `other` to this accumulator.
+
+        Parameters
+        ----------
+        other: EnsembleAccumulator
+            Accumulator of the same residues (compared by form factor types, so "S" and "SER" match),
+            model and `q_values`.
+
+        Returns
+        -------
+        EnsembleAccumulator
+            The accumulator itself.
+        """
+        if self._conformer_shape != other._conformer_shape or not np.array_equal(
+            self.q_values, other.q_values
+        ):
+            raise ValueError("Only accumulators of the same problem can be merged")
+        if not np.array_equal(
+            self.beads.type_indices, other.beads.type_indices
+        ) or not np.array_equal(
+            np.broadcast_to(self.model, self.beads.n_residues),
+            np.broadcast_to(other.model, other.beads.n_residues),
+        ):
+            raise ValueError(
+                "Only accumulators of the same residues and model can be merged"
+            )
+
+        if other.count > 0:
+            self._combine(other.count, other.sum, other.squares)
+        return self
+
+    def result(self):
+        """
+        Returns scattering curve averaged over all added conformers.
+
+        Returns
+        -------
+        (np.array(float),np.array(float))
+            A tuple of numpy arrays containing values of `q` and `I(q)` respectively.
+        """
+        if self.count == 0:
+            raise ValueError("No conformers were added to the accumulator")
+        return (self.q_values, self.sum / self.count)
+
+    def standard_error(self):
+        """
+        Returns standard error of the averaged `I(q)` estimated from the spread between conformers.
+
+        Returns
+        -------
+        np.array(float)
+            Vector of length `Q` of standard errors, infinite for fewer than two conformers.
+        """
+        if self.count < 2:
+            return np.full_like(self.q_values, np.inf)
+        return np.sqrt(self.squares / (self.count - 1) / self.count)
+
+    def converged(self, tolerance):
+        """
+        Returns `True` if standard error relative to `I(q)` is below `tolerance` at all `q`.
+        """
+        if self.count < 2:
+            return False
+        return bool(
+            np.all(self.standard_error() <= tolerance * np.abs(self.sum / self.count))
+        )
+
+    def add_until_converged(
+        self, conformers, tolerance=1e-3, max_conformers=None, min_conformers=10
+    ):
+        """
+        Adds conformers taken from an iterable until the averaged curve is converged.
+
+        Conformers are evaluated in chunks and the iterable is not advanced further once the standard
+        error relative to `I(q)` is below `tolerance` at all `q` and at least `min_conformers` were added,
+        or once `max_conformers` were added.
+
+        Parameters
+        ----------
+        conformers: iterable(np.array(float))
+            Iterable (such as a generator) of conformers.
+        tolerance: float, optional
+            Largest standard error of `I(q)` relative to `I(q)`, default `1e-3`
+        max_conformers: int, optional
+            Largest number of conformers in the accumulator, by default the iterable is consumed until convergence
+        min_conformers: int, optional
+            Smallest number of conformers before convergence is tested, default `10`
+
+        Returns
+        -------
+        EnsembleAccumulator
+            The accumulator itself.
+        """
+        if tolerance <= 0.0:
+            raise ValueError("`tolerance` has to be positive")
+
+        def finished():
+            if max_conformers is not None and self.count >= max_conformers:
+                return True
+            return self.count >= min_conformers and self.converged(tolerance)
+
+        if finished():
+            return self
+
+        buffer = list()
+        for item in conformers:
+            item = np.asarray(item, dtype=float)
+            if item.shape != self._conformer_shape:
+                raise ValueError(
+                    f"Conformers of shape {self._conformer_shape} expected, got array of shape {item.shape}"
+                )
+            buffer.append(item)
+
+            # chunks never run past the next convergence test
+            limit = self._chunk
+            if self.count < min_conformers:
+                limit = min(limit, min_conformers - self.count)
+            if max_conformers is not None:
+                limit = min(limit, max_conformers - self.count)
+            if len(buffer) >= limit:
+                self._add_batch(np.array(buffer))
+                buffer = list()
+                if finished():
+                    return self
+
+        if len(buffer) > 0:
+            self._add_batch(np.array(buffer))
+        return self
+
+
+def _shared_chunk_sums(accumulator, name, shape, chunks, keep=False):
+    """
+    Computes chunk sums of `I(q)` of conformers stored in shared memory block `name`.
+    """
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        conformers = np.ndarray(shape, dtype=float, buffer=memory.buf)
+        chunk_sums = accumulator._chunk_sums(conformers, chunks, keep)
+        del conformers
+    finally:
+        memory.close()
+    return chunk_sums
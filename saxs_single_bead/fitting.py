@@ -0,0 +1,127 @@
+# fitting.py
+# scoring many model curves against experimental datasets at once
+
+import collections
+import numpy as np
+
+FitResult = collections.namedtuple("FitResult", ["chi2", "scale", "background"])
+FitResult.__doc__ = """
+Result of fitting model curves to experimental datasets.
+
+Attributes
+----------
+chi2: np.array(float)
+    Reduced chi squared `mean(((scale * I_model + background - I) / sigma) ** 2)` of each curve and dataset.
+scale: np.array(float)
+    Optimal scale factor of each curve and dataset.
+background: np.array(float)
+    Optimal constant background of each curve and dataset, zeros if no background was fitted.
+"""
+
+
+def interpolation_matrix(model_q, q_values):
+    """
+    Returns matrix of linear interpolation from `model_q` to `q_values`.
+
+    Parameters
+    ----------
+    model_q: np.array(float)
+        Increasing vector of length `Q` of `q` values of model curves, units: Angstrom^(-1)
+    q_values: np.array(float)
+        Vector of length `P` of `q` values within the range of `model_q`, units: Angstrom^(-1)
+
+    Returns
+    -------
+    np.array(float)
+        Array with shape `P` by `Q`, `curves @ matrix.T` interpolates rows of `curves`.
+    """
+    model_q = np.asarray(model_q, dtype=float)
+    q_values = np.asarray(q_values, dtype=float)
+    if len(model_q) < 2 or np.any(np.diff(model_q) <= 0.0):
+        raise ValueError("`q` values of model curves have to be increasing")
+    if np.min(q_values) < model_q[0] or np.max(q_values) > model_q[-1]:
+        raise ValueError(
+            f"Experimental q values from {np.min(q_values)} to {np.max(q_values)} exceed model range from {model_q[0]} to {model_q[-1]}"
+        )
+
+    right = np.clip(
+        np.searchsorted(model_q, q_values, side="right"), 1, len(model_q) - 1
+    )
+    left = right - 1
+    weight = (q_values - model_q[left]) / (model_q[right] - model_q[left])
+
+    matrix = np.zeros((len(q_values), len(model_q)))
+    rows = np.arange(len(q_values))
+    matrix[rows, left] = 1.0 - weight
+    matrix[rows, right] += weight
+    return matrix
+
+
+def _fit_dataset(curves, intensities, sigma, background):
+    """
+    Returns reduced chi squared, scale and background of all `curves` (`K` by `P`) fitted to one dataset.
+    """
+    weights = 1.0 / sigma**2
+    curve_data = curves @ (weights * intensities)
+    curve_curve = (curves**2) @ weights
+    if background:
+        curve_one = curves @ weights
+        one_one = np.sum(weights)
+        data_one = np.sum(weights * intensities)
+        determinant = curve_curve * one_one - curve_one**2
+        scale = (curve_data * one_one - curve_one * data_one) / determinant
+        offset = (curve_curve * data_one - curve_one * curve_data) / determinant
+    else:
+        scale = curve_data / curve_curve
+        offset = np.zeros_like(scale)
+
+    residuals = (
+        scale[:, np.newaxis] * curves + offset[:, np.newaxis] - intensities
+    ) / sigma
+    return (np.mean(residuals**2, axis=1), scale, offset)
+
+
+def fit_curves(q_values, curves, experiments, background=False):
+    """
+    Fits scale (and constant background) of every model curve to every experimental dataset.
+
+    Model curves are linearly interpolated onto each experimental grid, the optimal scale and background
+    of each curve minimize chi squared in closed form, so all `K` curves and all datasets are scored in
+    one vectorized pass. There is no need to normalize curves, for example by `I(0)`, beforehand.
+
+    Parameters
+    ----------
+    q_values: np.array(float)
+        Increasing vector of length `Q` of `q` values of model curves, units: Angstrom^(-1)
+    curves: np.array(float)
+        Array with shape `K` by `Q` of model curves, for example from `scattering_curve` of `K` candidates.
+    experiments: np.array(float) or list(np.array(float))
+        Array with shape `3` by `P` of experimental `q` values, `I(q)` and its errors, or a list of such arrays
+        of several datasets, `q` values have to lie within the range of `q_values`.
+    background: bool, optional
+        Fit constant background, default `False`
+
+    Returns
+    -------
+    FitResult
+        Named tuple of `chi2`, `scale` and `background` arrays of length `K`,
+        with shape `K` by `D` for a list of `D` datasets.
+    """
+    curves = np.atleast_2d(np.asarray(curves, dtype=float))
+    if curves.shape[1] != len(q_values):
+        raise ValueError(
+            f"Curves of length {len(q_values)} expected, got array of shape {curves.shape}"
+        )
+
+    several = isinstance(experiments, (list, tuple)) and np.ndim(experiments[0]) == 2
+    results = list()
+    for experiment in experiments if several else [experiments]:
+        experiment_q, intensities, sigma = np.asarray(experiment, dtype=float)
+        if np.any(sigma <= 0.0):
+            raise ValueError("`sigma` has to be positive")
+        interpolated = curves @ interpolation_matrix(q_values, experiment_q).T
+        results.append(_fit_dataset(interpolated, intensities, sigma, background))
+
+    if several:
+        return FitResult(*(np.stack(values, axis=1) for values in zip(*results)))
+    return FitResult(*results[0])
@@ -1,8 +1,8 @@
 # form_factors.py
 # raw data and helper functions for working with tabulated form factors
 
+import os
 import numpy as np
-import json
 
 
 """
@@ -12,17 +12,143 @@ small-angle X-ray scattering intensity of atomistic protein structures
 D. Tong, S. Yang and L. Lu
 J. Appl. Cryst. (2016)
 
-Supplemental data, tabulated form factors for single bead approximation located at C_alpha sites.
+Supplemental data, tabulated form factors for single bead approximation located at C_alpha sites
+and for two bead approximation located at C_alpha and COE sites.
+COE - centre of electrons (like centre of mass but you count only protons in the nucleus)
+
+Stored in `data/tong2016.npy` as an array with shape 42 by Q: `q` values followed by rows of the combined table.
 """
-from saxs_single_bead.form_factors_raw import _raw_data
+_data_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
 """
-Source: ibid.
+Registered tables, name -> path of a `.npy` file or array (see `register_table`).
+"""
+_registry = {"tong2016": os.path.join(_data_directory, "tong2016.npy")}
+_active_table = "tong2016"
 
-Supplemental data, tabulated form factors for two bead approximation located at C_alpha and COE sites.
-COE - centre of electrons (like centre of mass but you count only protons in the nucleus)
 """
-from saxs_single_bead.form_factors_raw import _raw_data_two_bead
+Custom residues, code -> (q values, single bead form factors, side chain form factors, electrons).
+"""
+_custom_residues = dict()
+
+"""
+Active table with custom residues appended, loaded on first use: (q values, rows, step of a uniform grid or None).
+"""
+_loaded = None
+
+
+def _load_table():
+    global _loaded
+    if _loaded is None:
+        data = _registry[_active_table]
+        if isinstance(data, (str, os.PathLike)):
+            data = np.load(data)
+        table_q = data[0]
+        rows = [data[1:]]
+        for (q_values, single, side_chain, _) in _custom_residues.values():
+            rows.append(np.interp(table_q, q_values, single)[np.newaxis])
+            rows.append(
+                np.full((1, len(table_q)), np.nan)
+                if side_chain is None
+                else np.interp(table_q, q_values, side_chain)[np.newaxis]
+            )
+
+        steps = np.diff(table_q)
+        uniform = np.allclose(steps, steps[0], rtol=1e-9, atol=0.0)
+        _loaded = (table_q, np.vstack(rows), steps[0] if uniform else None)
+    return _loaded
+
+
+def register_table(name, table):
+    """
+    Registers a table of form factors, for example another fit or neutron scattering lengths.
+
+    Parameters
+    ----------
+    name: string
+        Name used by `use_table`.
+    table: string or np.array(float)
+        Path of a `.npy` file (loaded on first use) or array with shape `42` by `Q`. The first row holds increasing
+        `q` values, units: Angstrom^(-1), followed by 20 single bead residues (in the order of `_three_letter_dict`),
+        20 side chain beads of the two bead model in the same order and the backbone bead ("BB").
+    """
+    if not isinstance(table, (str, os.PathLike)):
+        table = np.array(table, dtype=float)
+        if table.ndim != 2 or table.shape[0] != _backbone_index + 2:
+            raise ValueError(
+                f"Table of shape ({_backbone_index + 2}, Q) expected, got array of shape {table.shape}"
+            )
+        if table.shape[1] < 2 or np.any(np.diff(table[0]) <= 0.0):
+            raise ValueError("`q` values of the table have to be increasing")
+    _registry[name] = table
+
+
+def use_table(name):
+    """
+    Selects the registered table used by all form factor lookups, `"tong2016"` by default.
+    """
+    global _active_table, _loaded
+    if name not in _registry:
+        raise ValueError(
+            f"{name} is not a registered table. One of {', '.join(sorted(_registry))} is allowed."
+        )
+    _active_table = name
+    _loaded = None
+
+
+def table_names():
+    """
+    Returns names of registered tables.
+    """
+    return sorted(_registry)
+
+
+def register_residue(
+    code, q_values, form_factor, side_chain_form_factor=None, electrons=None
+):
+    """
+    Registers a custom residue (such as "SEP" for phosphoserine or "MSE" for selenomethionine) usable
+    in `residue_codes` of all functions. Form factors are interpolated onto the grid of the active table.
+
+    Parameters
+    ----------
+    code: string
+        Residue code, different from standard residues and "BB".
+    q_values: np.array(float)
+        Increasing vector of `q` values of the form factors, units: Angstrom^(-1)
+    form_factor: np.array(float)
+        Form factors of the residue in the single bead model.
+    side_chain_form_factor: np.array(float), optional
+        Form factors of the side chain bead of the two bead model, by default the residue
+        can not be used in the two bead model.
+    electrons: float, optional
+        Number of electrons of the residue, used for electron weighted pair distance distributions.
+    """
+    global _loaded
+    if code in _three_letter_dict or code in _single_letter_dict or code == "BB":
+        raise ValueError(f"{code} is a standard residue code")
+    q_values = np.asarray(q_values, dtype=float)
+    if np.any(np.diff(q_values) <= 0.0):
+        raise ValueError("`q_values` have to be increasing")
+    _custom_residues[code] = (
+        q_values,
+        np.asarray(form_factor, dtype=float),
+        None
+        if side_chain_form_factor is None
+        else np.asarray(side_chain_form_factor, dtype=float),
+        np.nan if electrons is None else float(electrons),
+    )
+    _loaded = None
+
+
+def _lookup(row, q):
+    """
+    Returns row `row` of the combined table linearly interpolated at `q` (a number or an array).
+    """
+    values = _interpolate_table([row], np.ravel(q))[0]
+    if np.ndim(q) == 0:
+        return values[0]
+    return values.reshape(np.shape(q))
 
 
 def _raw_form_factor(residue_id, q):
@@ -43,7 +169,7 @@ def _raw_form_factor(residue_id, q):
     """
     if residue_id not in range(0, 20):
         raise IndexError("Wrong residue id value (has to be 0-19)")
-    return np.interp(q, _raw_data[0, :], _raw_data[residue_id + 1, :])
+    return _lookup(residue_id, q)
 
 def _raw_form_factor_two_bead(residue_id, q):
     """
@@ -62,12 +188,12 @@ def _raw_form_factor_two_bead(residue_id, q):
         Form factor value.
     """
     if residue_id == -1:
-        return np.interp(q, _raw_data[0, :], _raw_data_two_bead[1, :])
+        return _lookup(_backbone_index, q)
         
     if residue_id not in range(0, 20):
         raise IndexError("Wrong residue id value (has to be 0-19) or -1 for backbone")        
         
-    return np.interp(q, _raw_data[0, :], _raw_data_two_bead[residue_id + 2, :])
+    return _lookup(_two_bead_offset + residue_id, q)
 
 
 _three_letter_dict = {
@@ -166,3 +292,159 @@ def form_factor_two_bead(residue_name, q):
         return _raw_form_factor_two_bead(_single_letter_dict[residue_name], q)
     else:
         raise IndexError("Wrong length of residue name (has to be 3 or 1)")
+
+
+"""
+Rows of the combined table of form factors on the common `q` grid.
+
+Rows `0-19` are single bead residues, rows `20-39` are side chain beads of the two bead model
+and row `40` is the backbone bead ("BB") of the two bead model. Custom residues follow,
+each with a single bead row and a side chain row.
+"""
+_two_bead_offset = 20
+_backbone_index = 40
+
+
+"""
+Numbers of electrons of rows of the combined table.
+
+Residues are counted without the water lost in the peptide bond, the backbone bead
+(N, H, C_alpha, H_alpha, C, O) has 29 electrons and side chain beads hold the rest of their residue.
+"""
+_residue_electrons = np.array(
+    [38, 54, 60, 68, 78, 30, 72, 62, 70, 62, 70, 60, 52, 68, 84, 46, 54, 54, 98, 86],
+    dtype=float,
+)
+_backbone_electrons = 29.0
+_electrons = np.concatenate(
+    [_residue_electrons, _residue_electrons - _backbone_electrons, [_backbone_electrons]]
+)
+
+
+def _type_electrons(type_indices):
+    """
+    Returns numbers of electrons of rows `type_indices` of the combined table, including custom residues.
+    """
+    electrons = [_electrons]
+    for (_, _, _, residue_electrons) in _custom_residues.values():
+        electrons.append([residue_electrons, residue_electrons - _backbone_electrons])
+    return np.concatenate(electrons)[type_indices]
+
+
+def _residue_index(residue_name):
+    if len(residue_name) == 3:
+        return _three_letter_dict[residue_name]
+    elif len(residue_name) == 1:
+        return _single_letter_dict[residue_name]
+    else:
+        raise IndexError("Wrong length of residue name (has to be 3 or 1)")
+
+
+def _custom_index(residue_name, model_type):
+    position = list(_custom_residues).index(residue_name)
+    if model_type == 2 and _custom_residues[residue_name][2] is None:
+        raise ValueError(
+            f"{residue_name} has no side chain form factor of the two bead model"
+        )
+    return _backbone_index + 1 + 2 * position + (1 if model_type == 2 else 0)
+
+
+def _type_index(residue_name, model_type):
+    if residue_name in _custom_residues and model_type in (1, 2):
+        return _custom_index(residue_name, model_type)
+    if model_type == 1:
+        return _residue_index(residue_name)
+    elif model_type == 2:
+        if residue_name == "BB":
+            return _backbone_index
+        return _two_bead_offset + _residue_index(residue_name)
+    else:
+        raise ValueError(
+            f"{model_type} is not a valid model type. '1' or '2' are allowed."
+        )
+
+
+def residue_type_indices(residue_codes, model=1):
+    """
+    Maps residue names to rows of the combined form factor table.
+
+    Parameters
+    ----------
+    residue_codes: list(string)
+        List of residues of length `N`. Can be 3 letter codes (such as "GLY") or single letter codes (such as "G") or "BB"
+        for two bead backbone locations.
+    model: int or list(int), optional
+        `1` for single bead, `2` for two bead or a list of length `N` with model type of each residue, default `1`.
+
+    Returns
+    -------
+    np.array(int)
+        Vector of length `N` of form factor type indices.
+    """
+    if np.ndim(model) == 0:
+        model = [model] * len(residue_codes)
+    if len(model) != len(residue_codes):
+        raise ValueError("Lengths of `residue_codes` and `model` do not match")
+
+    return np.array(
+        [
+            _type_index(code, model_type)
+            for (code, model_type) in zip(residue_codes, model)
+        ],
+        dtype=int,
+    )
+
+
+def _interpolate_table(type_indices, q_values):
+    """
+    Linearly interpolates rows `type_indices` of the combined table at all `q_values` at once.
+    Evaluates the formula of `np.interp` in the same order of operations, so values are identical to it,
+    including clamping outside of the tabulated range.
+    """
+    table_q, table, step = _load_table()
+    q_values = np.atleast_1d(np.asarray(q_values, dtype=float))
+    q_clipped = np.clip(q_values, table_q[0], table_q[-1])
+    if step is None:
+        right = np.clip(
+            np.searchsorted(table_q, q_clipped, side="right"), 1, len(table_q) - 1
+        )
+    else:
+        # on a uniform grid the interval is found in O(1), rounding is corrected to match `searchsorted`
+        right = np.clip(
+            ((q_clipped - table_q[0]) // step).astype(int) + 1, 1, len(table_q) - 1
+        )
+        right += (q_clipped >= table_q[right]) & (right < len(table_q) - 1)
+        right -= (q_clipped < table_q[right - 1]) & (right > 1)
+    left = right - 1
+
+    rows = table[type_indices]
+    slopes = (rows[:, right] - rows[:, left]) / (table_q[right] - table_q[left])
+    values = slopes * (q_clipped - table_q[left]) + rows[:, left]
+    # like `np.interp`, tabulated points are returned as they are
+    values = np.where(q_clipped == table_q[left], rows[:, left], values)
+    return np.where(q_clipped == table_q[right], rows[:, right], values)
+
+
+def form_factor_matrix(residue_codes, q_values, model=1):
+    """
+    Returns linearly interpolated form factors of all residues at all `q_values`.
+
+    Parameters
+    ----------
+    residue_codes: list(string)
+        List of residues of length `N`. Can be 3 letter codes (such as "GLY") or single letter codes (such as "G") or "BB"
+        for two bead backbone locations.
+    q_values: np.array(float)
+        Vector of length `Q` of scattering vectors, units: Angstrom^(-1)
+    model: int or list(int), optional
+        `1` for single bead, `2` for two bead or a list of length `N` with model type of each residue, default `1`.
+
+    Returns
+    -------
+    np.array(float)
+        Array with shape `N` by `Q` of form factor values.
+    """
+    type_indices = residue_type_indices(residue_codes, model)
+    (types, inverse) = np.unique(type_indices, return_inverse=True)
+
+    return _interpolate_table(types, q_values)[inverse]
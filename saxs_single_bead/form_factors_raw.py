@@ -1,141 +0,0 @@
-# Disable black so that tables don't turn into hundreds of lines
-# fmt: off
-import numpy as np
-
-"""
-Source: 
-Accurate optimization of amino acid form factors for computing 
-small-angle X-ray scattering intensity of atomistic protein structures
-D. Tong, S. Yang and L. Lu
-J. Appl. Cryst. (2016)
-
-Supplemental data, tabulated form factors for single bead approximation located at C_alpha sites.
-"""
-
-_raw_data = np.transpose(
-    np.array(
-        [
-        [0.0,9.031605,18.753885,20.176972,19.219688,9.168,9.985664,21.371629,6.211923,10.985094,6.228658,16.526707,19.968169,8.641675,19.033278,23.318231,14.012906,13.084412,7.142596,15.696784,14.149632,],
-        [0.01,9.032873,18.758167,20.175863,19.209075,9.169585,9.986057,21.366358,6.210098,10.985704,6.226842,16.52892,19.970212,8.637247,19.030661,23.315152,14.008752,13.08747,7.141364,15.703052,14.143818,],
-        [0.02,9.036791,18.770413,20.172925,19.178863,9.173406,9.987564,21.351259,6.20372,10.98785,6.220754,16.534341,19.975624,8.625259,19.022988,23.30544,13.997234,13.096045,7.136393,15.72059,14.126724,],
-        [0.03,9.043628,18.788663,20.169295,19.133694,9.176551,9.991123,21.328385,6.1902,10.992488,6.208426,16.53956,19.98247,8.609469,19.010785,23.287901,13.981071,13.108469,7.124318,15.745601,14.099197,],
-        [0.04,9.053617,18.809334,20.166787,19.080542,9.174037,9.998078,21.300848,6.165751,11.001047,6.186607,16.539751,19.988326,8.595518,18.994908,23.261208,13.964275,13.122416,7.100916,15.772021,14.062074,],
-        [0.05,9.066604,18.827417,20.167832,19.027618,9.15926,10.009681,21.272284,6.126404,11.014686,6.151336,16.530061,19.99142,8.589561,18.976488,23.224462,13.951202,13.135587,7.062673,15.792488,14.015666,],
-        [0.06,9.081629,18.83755,20.175379,18.982981,9.125331,10.026386,21.2462,6.06942,11.033075,6.099216,16.507321,19.9916,8.596348,18.956761,23.177281,13.945345,13.146403,7.008124,15.799933,13.959579,],
-        [0.07,9.096634,18.835728,20.192525,18.953043,9.066979,10.0474,21.225457,5.994376,11.053622,6.028911,16.471323,19.990231,8.617691,18.936712,23.119444,13.948425,13.154309,6.938438,15.789061,13.893043,],
-        [0.08,9.108509,18.820755,20.221683,18.941213,8.982089,10.070983,21.212014,5.903093,11.072202,5.941821,16.424712,19.988847,8.652353,18.916545,23.05068,13.96026,13.159564,6.857019,15.756924,13.815514,],
-        [0.09,9.11357,18.794529,20.263615,18.947024,8.872014,10.095418,21.206769,5.798346,11.085185,5.841437,16.371257,19.987582,8.697436,18.895243,22.970991,13.979364,13.162761,6.768438,15.702477,13.727142,],
-        [0.1,9.108373,18.760947,20.316985,18.966103,8.740612,10.119848,21.209284,5.682322,11.091325,5.73182,16.313191,19.984761,8.750126,18.870692,22.881113,14.003767,13.164397,6.677192,15.625672,13.628906,],
-        [0.11,9.090638,18.723944,20.378738,18.991204,8.59273,10.144288,21.217502,5.555909,11.092329,5.616192,16.248797,19.978045,8.808436,18.840554,22.782469,14.031546,13.164665,6.586648,15.526801,13.522499,],
-        [0.12,9.059841,18.685575,20.445062,19.014121,8.432989,10.168777,21.227744,5.419112,11.092055,5.496327,16.171382,19.966156,8.870744,18.803492,22.676463,14.06088,13.163519,6.498245,15.406436,13.410109,],
-        [0.13,9.017147,18.644909,20.512468,19.027868,8.265263,10.192343,21.235179,5.272021,11.095108,5.372836,16.070381,19.949818,8.935084,18.760098,22.563624,14.089763,13.160856,6.411049,15.26577,13.293968,],
-        [0.14,8.964777,18.598131,20.578605,19.028336,8.092754,10.212608,21.234772,5.115494,11.10569,5.245884,15.934559,19.93136,8.999217,18.713027,22.443197,14.115742,13.156509,6.321892,15.106835,13.17558,],
-        [0.15,8.905241,18.539726,20.642402,19.014933,7.918461,10.226525,21.222462,4.951128,11.127044,5.115745,15.756075,19.913541,9.061529,18.666225,22.313365,14.136103,13.149919,6.22626,14.932343,13.054953,],
-        [0.16,8.840775,18.464214,20.703389,18.990164,7.745807,10.23194,21.196137,4.780725,11.161265,4.982932,15.533623,19.898612,9.121961,18.62348,22.171839,14.148718,13.139763,6.119805,14.745376,12.930423,],
-        [0.17,8.773065,18.367817,20.760564,18.958463,7.579082,10.229001,21.155995,4.605769,11.20903,4.84811,15.273475,19.888143,9.182212,18.58672,22.016365,14.153202,13.124045,5.999953,14.54928,12.799355,],
-        [0.18,8.703146,18.249608,20.811623,18.924719,7.423303,10.220526,21.104129,4.42736,11.269185,4.712162,14.988272,19.883362,9.24497,18.554663,21.844993,14.151583,13.100816,5.866883,14.347721,12.659368,],
-        [0.19,8.631502,18.111941,20.853118,18.892815,7.283308,10.21124,21.043636,4.246674,11.33859,4.576403,14.694112,19.885413,9.312394,18.522584,21.656269,14.147774,13.069285,5.723455,14.144479,12.509341,],
-        [0.2,8.558451,17.960073,20.881486,18.864519,7.162439,10.206461,20.977759,4.065633,11.412582,4.442691,14.406807,19.895154,9.38445,18.483673,21.449581,14.145878,13.030827,5.574248,13.942857,12.349671,],
-        [0.21,8.484819,17.801153,20.894242,18.839063,7.061673,10.210934,20.909473,3.88745,11.485834,4.313319,14.138496,19.912561,9.458028,18.431523,21.225554,14.148261,12.989365,5.424329,13.745102,12.181789,],
-        [0.22,8.412586,17.643036,20.890731,18.813527,6.97986,10.228041,20.841475,3.716802,11.553196,4.190806,13.896001,19.93595,9.527511,18.36237,20.986135,14.154653,12.95079,5.278393,13.552368,12.007422,],
-        [0.23,8.345044,17.493458,20.872237,18.783741,6.914905,10.259209,20.776157,3.55952,11.610445,4.077836,13.681752,19.961417,9.586643,18.275878,20.734111,14.162871,12.921549,5.140554,13.365325,11.828268,],
-        [0.24,8.286158,17.359654,20.841605,18.745174,6.865001,10.303321,20.715065,3.421808,11.655041,3.977385,13.496626,19.982939,9.630701,18.174467,20.47221,14.170535,12.906959,5.014649,13.185093,11.646429,],
-        [0.25,8.239396,17.247965,20.802525,18.693549,6.829244,10.356417,20.657864,3.309372,11.686641,3.892916,13.342622,19.993432,9.657807,18.062238,20.202351,14.176544,12.909904,4.904576,13.014102,11.465417,],
-        [0.26,8.206731,17.16293,20.758625,18.625383,6.807737,10.412247,20.601548,3.227001,11.70687,3.828429,13.2234,19.986486,9.668988,17.944139,19.925529,14.181473,12.930266,4.814344,12.856477,11.290967,],
-        [0.27,8.188461,17.105947,20.712587,18.53868,6.801812,10.463809,20.540629,3.178724,11.718396,3.788319,13.142377,19.958059,9.667418,17.825054,19.642357,14.187007,12.965178,4.747861,12.717663,11.130658,],
-        [0.28,8.183869,17.074256,20.665539,18.433519,6.814505,10.505249,20.468465,3.16811,11.723965,3.777139,13.099953,19.907443,9.657571,17.708479,19.353807,14.195094,13.009986,4.708709,12.603263,10.991937,],
-        [0.29,8.192058,17.061181,20.616817,18.312023,6.850747,10.533222,20.379145,3.198159,11.72594,3.799323,13.091956,19.83721,9.644531,17.595495,19.061611,14.207319,13.059712,4.700017,12.517394,10.879351,],
-        [0.3,8.212318,17.057996,20.564082,18.177463,6.916602,10.547263,20.269114,3.270779,11.726183,3.858742,13.110306,19.752331,9.633143,17.485161,18.768095,14.22454,13.110615,4.724289,12.461229,10.792655,],
-        [0.31,8.243895,17.056755,20.503724,18.032974,7.017557,10.54928,20.137911,3.386343,11.72584,3.958113,13.145268,19.658781,9.626794,17.37625,18.475658,14.246625,13.161261,4.783161,12.432428,10.727172,],
-        [0.32,8.285626,17.052722,20.431583,17.880719,7.156573,10.54256,19.987814,3.543739,11.725022,4.098439,13.187995,19.561986,9.626278,17.268603,18.186178,14.272364,13.212479,4.877204,12.425751,10.676296,],
-        [0.33,8.335937,17.045098,20.343851,17.721904,7.332764,10.530643,19.822657,3.740664,11.722743,4.278644,13.232428,19.465376,9.629594,17.162565,17.900496,14.299776,13.266116,5.005851,12.434448,10.634446,],
-        [0.34,8.393207,17.035801,20.237814,17.557224,7.541132,10.516429,19.646439,3.973579,11.717316,4.495354,13.276293,19.369527,9.63309,17.05708,17.61804,14.326851,13.32331,5.167339,12.451614,10.598569,],
-        [0.35,8.45617,17.027228,20.112093,17.387081,7.773345,10.501753,19.462302,4.237204,11.706876,4.742771,13.321097,19.272375,9.63345,16.9487,17.336813,14.352276,13.383471,5.35853,12.470974,10.567571,],
-        [0.36,8.524049,17.020484,19.966466,17.211377,8.019225,10.48749,19.272171,4.524226,11.689606,5.012893,13.370888,19.170609,9.629425,16.832917,17.053963,14.375568,13.44453,5.574724,12.487316,10.540748,],
-        [0.37,8.596422,17.015049,19.801707,17.029362,8.268432,10.473946,19.077046,4.826,11.663698,5.296431,13.429804,19.061524,9.622359,16.706811,16.766756,14.396414,13.503873,5.809707,12.497093,10.516773,],
-        [0.38,8.672926,17.009873,19.619732,16.839993,8.511914,10.46113,18.877646,5.134104,11.627504,5.584328,13.49923,18.944199,9.615388,16.570749,16.473304,14.413794,13.558998,6.056054,12.49918,10.493835,],
-        [0.39,8.75286,17.004966,19.423815,16.642665,8.742964,10.448747,18.674982,5.441768,11.580177,5.869275,13.575982,18.819337,9.612001,16.427979,16.172582,14.425767,13.607593,6.305638,12.495174,10.470388,],
-        [0.4,8.834757,17.002378,19.218398,16.437826,8.957937,10.436077,18.470443,5.744296,11.522532,6.146599,13.65261,18.688178,9.614948,16.282818,15.863951,14.430311,13.647553,6.55037,12.488715,10.445622,],
-        [0.41,8.916219,17.005802,19.008305,16.227183,9.1565,10.422082,18.265374,6.038543,11.457456,6.414272,13.719731,18.551571,9.625965,16.138928,15.546844,14.426636,13.677462,6.783262,12.484048,10.419318,],
-        [0.42,8.99434,17.018868,18.797717,16.013563,9.341111,10.405891,18.060523,6.3222,11.389445,6.672324,13.769167,18.410033,9.646118,15.998539,15.220999,14.415834,13.697299,6.999548,12.484591,10.391434,],
-        [0.43,9.066667,17.042944,18.589552,15.800596,9.515619,10.387457,17.855869,6.593423,11.32348,6.921987,13.796387,18.264621,9.67618,15.862491,14.887018,14.40022,13.708667,7.197349,12.492118,10.361877,],
-        [0.44,9.132242,17.075664,18.385563,15.592158,9.683553,10.367975,17.651002,6.850827,11.263859,7.164828,13.801407,18.117729,9.716628,15.730635,14.546745,14.381811,13.714088,7.37752,12.506583,10.330718,],
-        [0.45,9.192113,17.111059,18.186906,15.391553,9.847041,10.349771,17.445816,7.093587,11.213469,7.401998,13.788236,17.972993,9.767263,15.602371,14.203245,14.361146,13.715798,7.542887,12.526225,10.29869,],
-        [0.46,9.249012,17.141346,17.994597,15.20066,10.006879,10.33564,17.241021,7.321621,11.173612,7.633771,13.763415,17.834172,9.826713,15.477267,13.860517,14.337359,13.714967,7.6974,12.547752,10.26765,],
-        [0.47,9.30641,17.159499,17.80955,15.019543,10.163316,10.32796,17.038214,7.535875,11.144103,7.859642,13.734161,17.703637,9.892132,15.355556,13.523146,14.309396,13.711944,7.845503,12.566731,10.240593,],
-        [0.48,9.36742,17.161381,17.632368,14.846822,10.316617,10.328033,16.839534,7.738545,11.123457,8.078941,13.706533,17.581341,9.95935,15.238137,13.195885,14.2773,13.707166,7.99154,12.578402,10.221008,],
-        [0.49,9.434072,17.146594,17.463217,14.680573,10.466856,10.335932,16.647114,7.932805,11.10912,8.291632,13.684143,17.464926,10.023606,15.126013,12.883081,14.24251,13.70185,8.138959,12.578789,10.21169,],
-        [0.5,9.507167,17.117942,17.301927,14.519166,10.613276,10.350773,16.462505,8.121897,11.097896,8.498707,13.667817,17.351017,10.080735,15.019529,12.588045,14.207045,13.697879,8.289462,12.565615,10.213577,],
-        ]
-    )
-)
-
-"""
-Source: 
-Accurate optimization of amino acid form factors for computing 
-small-angle X-ray scattering intensity of atomistic protein structures
-D. Tong, S. Yang and L. Lu
-J. Appl. Cryst. (2016)
-
-Supplemental data, tabulated form factors for two bead approximation located at C_alpha and COE sites.
-COE - centre of electrons (like centre of mass but you count only protons in the nucleus)
-"""
-_raw_data_two_bead = np.transpose(
-    np.array(
-        [
-            [0.0,1.05632e1,-1.531596,8.190685,9.613772,8.656488,-1.3952,-0.577537,1.0808429e1,-4.351277,0.421894,-4.334542,5.963507,9.404969,-1.921525,8.470078,1.2755031e1,3.449706,2.521212,-3.420604,5.133584,3.586432],
-            [1.0e-2,1.0555512e1,-1.523043,8.199697,9.620513,8.659802,-1.385,-0.570391,1.0815513e1,-4.343165,0.430366,-4.326667,5.973023,9.414472,-1.915671,8.477773,1.2764419e1,3.45618,2.530919,-3.411872,5.143554,3.593562],
-            [2.0e-2,1.0535605e1,-1.500528,8.223351,9.63759,8.667168,-1.357983,-0.551852,1.0833887e1,-4.322194,0.452989,-4.306453,5.997826,9.439387,-1.900669,8.497712,1.2789372e1,3.472968,2.556529,-3.389311,5.169872,3.611981],
-            [3.0e-2,1.0503259e1,-1.463797,8.26117,9.665286,8.680474,-1.315241,-0.520949,1.0864564e1,-4.288771,0.491128,-4.274445,6.036469,9.478762,-1.874585,8.530206,1.2830016e1,3.501676,2.597295,-3.353966,5.2115,3.642369],
-            [4.0e-2,1.0459729e1,-1.414119,8.310689,9.702533,8.701036,-1.260204,-0.477843,1.0907429e1,-4.245152,0.545455,-4.23309,6.085298,9.529886,-1.836107,8.574318,1.2885123e1,3.542788,2.650647,-3.308665,5.2653,3.683925],
-            [5.0e-2,1.0406608e1,-1.353277,8.368711,9.748134,8.730431,-1.197202,-0.423022,1.0962105e1,-4.194046,0.616716,-4.185279,6.140265,9.590084,-1.783989,8.629097,1.2953293e1,3.596103,2.713676,-3.256182,5.327633,3.735204],
-            [6.0e-2,1.034552e1,-1.283414,8.432019,9.801156,8.770445,-1.130435,-0.357447,1.1028022e1,-4.137776,0.705254,-4.133423,6.198157,9.657585,-1.717549,8.693903,1.3033127e1,3.660456,2.783736,-3.198284,5.395295,3.794348],
-            [7.0e-2,1.0277807e1,-1.20678,8.498288,9.861173,8.822915,-1.062768,-0.282548,1.1104739e1,-4.077493,0.810587,-4.07855,6.257678,9.731784,-1.637073,8.768598,1.3123359e1,3.733825,2.858867,-3.135268,5.466278,3.859661],
-            [8.0e-2,1.020442e1,-1.125481,8.566624,9.928151,8.889332,-0.995044,-0.199976,1.1192292e1,-4.013084,0.93147,-4.020094,6.319676,9.812612,-1.543844,8.853386,1.3223109e1,3.813774,2.937901,-3.066353,5.539917,3.930137],
-            [9.0e-2,1.0126095e1,-1.041318,8.637368,1.0002037e1,8.970167,-0.926342,-0.111215,1.1291204e1,-3.943968,1.066316,-3.956572,6.386315,9.899526,-1.439716,8.948314,1.3332192e1,3.897993,3.020296,-2.990685,5.616426,4.005526],
-            [0.1,1.0043667e1,-0.955708,8.711308,1.0082381e1,9.064165,-0.854932,-1.7353e-2,1.1401937e1,-3.870135,1.213432,-3.886651,6.459644,9.99103,-1.326558,9.052709,1.345108e1,3.984794,3.105832,-2.908199,5.696254,4.085928],
-            [0.11,9.958288,-0.869617,8.788829,1.0168243e1,9.168047,-0.779253,8.0871e-2,1.1524107e1,-3.792585,1.370862,-3.809868,6.540234,1.0085192e1,-1.206002,9.164913,1.3580265e1,4.073411,3.19433,-2.819825,5.779713,4.171392],
-            [0.12,9.871375,-0.783501,8.869519,1.0258408e1,9.27706,-0.698372,0.182869,1.1656022e1,-3.712812,1.536161,-3.726687,6.626521,1.0180699e1,-1.07958,9.282521,1.371938e1,4.163973,3.285519,-2.727116,5.867003,4.261896],
-            [0.13,9.784365,-0.697379,8.952306,1.0351707e1,9.386305,-0.611872,0.287993,1.1794917e1,-3.631805,1.706491,-3.63804,6.715165,1.0277489e1,-0.948913,9.403025,1.386672e1,4.257058,3.379039,-2.631755,5.958403,4.357541],
-            [0.14,9.698523,-0.611118,9.035842,1.0447153e1,9.492167,-0.519564,0.395364,1.1937704e1,-3.549489,1.878966,-3.544856,6.802319,1.0376461e1,-0.815668,9.524408,1.4019449e1,4.353052,3.474432,-2.535289,6.054287,4.458455],
-            [0.15,9.614954,-0.52479,9.118806,1.0543748e1,9.593008,-0.421356,0.503814,1.2081727e1,-3.46506,2.050965,-3.447922,6.885103,1.0478625e1,-0.681279,9.645214,1.4174226e1,4.451749,3.571056,-2.439035,6.154862,4.564304],
-            [0.16,9.534728,-0.438866,9.200073,1.0640147e1,9.688893,-0.317284,0.612021,1.2225116e1,-3.377852,2.220236,-3.348029,6.962547,1.0584374e1,-0.546707,9.76416,1.4327779e1,4.552375,3.668002,-2.343964,6.259896,4.673859],
-            [0.17,9.458972,-0.354205,9.278804,1.0734509e1,9.780786,-0.207608,0.718766,1.2366721e1,-3.287967,2.384799,-3.246182,7.035695,1.0693191e1,-0.412481,9.879729,1.4477156e1,4.653814,3.76409,-2.250574,6.368644,4.785037],
-            [0.18,9.38887,-0.271928,9.354466,1.0824725e1,9.869738,-9.2926e-2,0.823087,1.2505749e1,-3.196321,2.54273,-3.143715,7.106962,1.0803655e1,-0.279041,9.990101,1.4619665e1,4.754682,3.857962,-2.158957,6.479911,4.895358],
-            [0.19,9.325623,-0.193295,9.426687,1.0908898e1,9.95633,2.5653e-2,0.924227,1.2641279e1,-3.104292,2.692041,-3.042295,7.179033,1.0913594e1,-0.147229,1.0093438e1,1.4752768e1,4.853199,3.948274,-2.069131,6.592102,5.002444],
-            [0.2,9.270341,-0.119519,9.495077,1.0985823e1,1.0040426e1,0.14638,1.021481,1.2771937e1,-3.013293,2.830827,-2.943769,7.253756,1.1020326e1,-1.8606e-2,1.01884e1,1.4874248e1,4.94718,4.034033,-1.981391,6.703339,5.104288],
-            [0.21,9.223859,-5.1456e-2,9.559212,1.1055239e1,1.0121291e1,0.266994,1.114141,1.2895983e1,-2.924375,2.957712,-2.849797,7.33154,1.1121069e1,0.104707,1.0274623e1,1.4982694e1,5.034385,4.114938,-1.896347,6.811806,5.19935],
-            [0.22,9.186548,1.0721e-2,9.618873,1.1117799e1,1.0197952e1,0.385172,1.201572,1.3011721e1,-2.837944,3.072285,-2.76141,7.411538,1.1213411e1,0.220609,1.0352842e1,1.5077976e1,5.113121,4.191476,-1.814643,6.916223,5.286616],
-            [0.23,9.158264,6.76e-2,9.674327,1.1174767e1,1.0269573e1,0.499026,1.283274,1.3117863e1,-2.753753,3.175202,-2.678784,7.492376,1.1295643e1,0.327692,1.0424505e1,1.5161203e1,5.182708,4.264601,-1.736637,7.016127,5.365679],
-            [0.24,9.138533,0.120238,9.726349,1.1227533e1,1.0335569e1,0.60733,1.358766,1.3213523e1,-2.671262,3.267859,-2.601411,7.572864,1.136683e1,0.425576,1.0491058e1,1.5234082e1,5.243544,4.335147,-1.662333,7.111716,5.436766],
-            [0.25,9.126868,0.169634,9.775897,1.1277095e1,1.0395477e1,0.709348,1.427303,1.3297916e1,-2.5902,3.351819,-2.528547,7.652227,1.1426674e1,0.514748,1.055328e1,1.5298048e1,5.296783,4.403318,-1.591592,7.203365,5.500669],
-            [0.26,9.123025,0.216229,9.823651,1.1323703e1,1.0448835e1,0.804554,1.487687,1.3370158e1,-2.510916,3.428314,-2.45965,7.729837,1.1475352e1,0.59602,1.061104e1,1.5353746e1,5.343834,4.468545,-1.524392,7.29119,5.558582],
-            [0.27,9.127043,0.259704,9.869699,1.1366832e1,1.0495265e1,0.892582,1.538382,1.3429448e1,-2.434256,3.498069,-2.39452,7.80483,1.1513446e1,0.669981,1.0663524e1,1.54011e1,5.385903,4.529755,-1.460879,7.374955,5.611879],
-            [0.28,9.13909,0.299144,9.913511,1.1405482e1,1.0534738e1,0.973527,1.577953,1.3475581e1,-2.361053,3.561486,-2.333096,7.876022,1.1541931e1,0.736804,1.0709761e1,1.5439809e1,5.423719,4.585819,-1.401144,7.454369,5.661885],
-            [0.29,9.159218,0.33348,9.954166,1.1438623e1,1.0567732e1,1.048335,1.605607,1.3509415e1,-2.291582,3.619003,-2.275095,7.942247,1.1562123e1,0.796489,1.0749186e1,1.546982e1,5.457463,4.635962,-1.344928,7.529518,5.709683],
-            [0.3,9.187167,0.362013,9.990722,1.1465573e1,1.059509e1,1.118941,1.621531,1.3532945e1,-2.225275,3.671329,-2.219768,8.002825,1.1575548e1,0.849317,1.0781985e1,1.5491534e1,5.486925,4.680004,-1.291474,7.601102,5.756077],
-            [0.31,9.222282,0.384799,1.0022608e1,1.1486164e1,1.0617685e1,1.187971,1.626923,1.3548914e1,-2.16077,3.71938,-2.1659,8.057829,1.1583757e1,0.896168,1.0809109e1,1.5505747e1,5.511815,4.718484,-1.239624,7.670325,5.801741],
-            [0.32,9.263548,0.402756,1.0049908e1,1.1500697e1,1.0636168e1,1.258117,1.623754,1.3560181e1,-2.096189,3.763975,-2.112043,8.107989,1.1588168e1,0.938485,1.0831901e1,1.5513515e1,5.532119,4.752641,-1.188046,7.738519,5.847454],
-            [0.33,9.309718,0.417462,1.0073317e1,1.1509751e1,1.0650991e1,1.331449,1.614391,1.3569126e1,-2.029584,3.805549,-2.056828,8.15444,1.158994e1,0.977946,1.085146e1,1.5516054e1,5.548285,4.784159,-1.135453,7.806724,5.894164],
-            [0.34,9.359523,0.430748,1.009375e1,1.1513961e1,1.0662625e1,1.408931,1.601202,1.3577291e1,-1.959428,3.844065,-1.999251,8.198547,1.1589899e1,1.016033,1.0868096e1,1.5514672e1,5.561147,4.814657,-1.080767,7.875413,5.942673],
-            [0.35,9.411896,0.444249,1.0111818e1,1.1513885e1,1.0671753e1,1.490316,1.586227,1.3585316e1,-1.88503,3.879151,-1.93885,8.241869,1.1588554e1,1.053738,1.0881303e1,1.551065e1,5.571584,4.845158,-1.023259,7.944422,5.993105],
-            [0.36,9.466127,0.459033,1.0127558e1,1.151004e1,1.0679282e1,1.574418,1.57094,1.3593101e1,-1.806639,3.910356,-1.87572,8.286097,1.1586212e1,1.091469,1.0890318e1,1.5505031e1,5.580161,4.87583,-0.9627,8.013102,6.044575],
-            [0.37,9.521914,0.475386,1.0140621e1,1.1503071e1,1.0686198e1,1.659593,1.556114,1.3600137e1,-1.72522,3.93738,-1.810387,8.33277,1.158307e1,1.129096,1.0894887e1,1.5498371e1,5.586968,4.906116,-0.899495,8.080579,6.095408],
-            [0.38,9.579302,0.492713,1.0150775e1,1.1493867e1,1.0693353e1,1.744195,1.541784,1.3605857e1,-1.642074,3.96023,-1.743619,8.382782,1.1579144e1,1.166032,1.0895635e1,1.5490511e1,5.591782,4.93507,-0.834742,8.146005,6.143782],
-            [0.39,9.638572,0.509613,1.0158321e1,1.1483469e1,1.0701247e1,1.826886,1.527306,1.360988e1,-1.558587,3.979298,-1.676263,8.435899,1.157403e1,1.20139,1.0893739e1,1.5480535e1,5.594369,4.961652,-0.770156,8.208715,6.188349],
-            [0.4,9.700093,0.524158,1.0164149e1,1.1472753e1,1.0709909e1,1.906811,1.511559,1.3612059e1,-1.476177,3.995385,-1.609167,8.490612,1.1566753e1,1.23426,1.0890204e1,1.5466976e1,5.594687,4.984899,-0.707781,8.268335,6.228408],
-            [0.41,9.764203,0.534412,1.0169385e1,1.1462088e1,1.0718924e1,1.983722,1.493278,1.3612395e1,-1.396248,4.009653,-1.543127,8.544504,1.1555962e1,1.264106,1.0885364e1,1.5448285e1,5.592802,5.004063,-0.649548,8.324952,6.263695],
-            [0.42,9.831128,0.539018,1.0174875e1,1.1451223e1,1.072764e1,2.058079,1.47143,1.3610939e1,-1.319996,4.023482,-1.478781,8.595064,1.154048e1,1.291092,1.0878999e1,1.5423368e1,5.588614,5.01878,-0.596794,8.379354,6.294146],
-            [0.43,9.900978,0.537578,1.0180782e1,1.1439534e1,1.0735431e1,2.131053,1.445481,1.3607764e1,-1.248077,4.038218,-1.416467,8.640567,1.1519866e1,1.316098,1.087093e1,1.5391933e1,5.581635,5.029234,-0.549945,8.433168,6.319944],
-            [0.44,9.973791,0.53064,1.0186487e1,1.1426466e1,1.0741863e1,2.204378,1.415445,1.3603017e1,-1.180391,4.054869,-1.356115,8.680612,1.1494606e1,1.340354,1.0861542e1,1.535452e1,5.571064,5.036122,-0.508476,8.488662,6.341768],
-            [0.45,1.0049589e1,0.519355,1.0190824e1,1.1411861e1,1.0746656e1,2.280023,1.381671,1.3596972e1,-1.116166,4.073888,-1.297282,8.716041,1.1465797e1,1.364846,1.0851821e1,1.5312236e1,5.556179,5.040383,-0.471115,8.548173,6.36095],
-            [0.46,1.01284e1,0.505068,1.0192503e1,1.1395937e1,1.0749493e1,2.359777,1.344514,1.3590068e1,-1.054267,4.095103,-1.239343,8.74837,1.1434574e1,1.389823,1.0842902e1,1.5266416e1,5.536789,5.042847,-0.436149,8.613414,6.379306],
-            [0.47,1.0210233e1,0.489072,1.0190575e1,1.1378972e1,1.0749861e1,2.44484,1.304041,1.3582868e1,-0.993514,4.117862,-1.181709,8.779122,1.1401631e1,1.414668,1.0835496e1,1.5218353e1,5.513456,5.044043,-0.401741,8.685035,6.398742],
-            [0.48,1.029501e1,0.472569,1.0184776e1,1.1360993e1,1.0747053e1,2.535558,1.259939,1.3575925e1,-0.932868,4.141297,-1.123948,8.809439,1.1367112e1,1.438234,1.0829574e1,1.5169157e1,5.487329,5.044295,-0.36624,8.762643,6.420896],
-            [0.49,1.0382495e1,0.456679,1.0175653e1,1.1341714e1,1.0740337e1,2.631325,1.211676,1.3569523e1,-0.871499,4.164633,-1.065788,8.840081,1.1330862e1,1.459485,1.0824401e1,1.5119668e1,5.459747,5.043925,-0.328527,8.845192,6.446937],
-            [0.5,1.0472258e1,0.442304,1.0164451e1,1.1320759e1,1.0729169e1,2.730697,1.158807,1.3563409e1,-0.808844,4.187354,-1.007069,8.871555,1.1292854e1,1.478129,1.0818745e1,1.5070344e1,5.431878,5.04335,-0.288341,8.931426,6.477489]
-    ]
-    )
-)
-
-# fmt : on
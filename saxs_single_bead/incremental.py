@@ -0,0 +1,216 @@
+# incremental.py
+# scattering curves updated in O(N Q) when a few beads move, for Monte Carlo refinement
+
+import numpy as np
+import saxs_single_bead.bead_model
+
+_max_block_elements = 2**22
+
+
+class IncrementalScattering:
+    """
+    Scattering curve of a structure that keeps per bead partial sums
+
+        P_i(q) = sum_{j != i} f_j(q) sinc(q r_ij),  I(q) = sum_i f_i(q) ** 2 + sum_i f_i(q) P_i(q),
+
+    so that moving `k` residues costs `k * B * Q` operations instead of `B ** 2 * Q`.
+    Moves are proposed with `propose` and then either committed with `accept` or discarded with `reject`.
+    Every `check_every` accepted moves the partial sums are recomputed from scratch, the largest relative
+    deviation of `I(q)` found is stored in `drift`.
+
+    Parameters
+    ----------
+    residue_codes: list(string)
+        List of residues of length `N`. Can be 3 letter codes (such as "GLY") or single letter codes (such as "G") or "BB"
+        for two bead backbone locations (blend model only).
+    residue_locations: np.array(float)
+        Array with shape `N` by `3` (`N` by `2` by `3` for the two bead model) of locations.
+    q_values: np.array(float)
+        Vector of length `Q` of scattering vectors, units: Angstrom^(-1)
+    model: int or list(int), optional
+        `1` for single bead, `2` for two bead or a list of length `N` with model type of each residue, default `1`.
+    check_every: int, optional
+        Number of accepted moves between recomputations from scratch, default `1000`
+
+    Examples
+    --------
+    >>> state = IncrementalScattering(sequence, locations, np.linspace(0.0, 0.5, 20))
+    >>> trial = state.propose([17], locations[17] + step)
+    >>> if chi2(trial) < chi2(state.intensity):
+    ...     state.accept()
+    ... else:
+    ...     state.reject()
+    """
+
+    def __init__(
+        self, residue_codes, residue_locations, q_values, model=1, check_every=1000
+    ):
+        if check_every < 1:
+            raise ValueError("`check_every` has to be at least 1")
+
+        self.q_values = np.asarray(q_values, dtype=float)
+        self.model = model
+        self.check_every = check_every
+        self._beads = saxs_single_bead.bead_model.BeadModel(residue_codes, model)
+
+        residue_locations = np.asarray(residue_locations, dtype=float)
+        expected = (self._beads.n_residues,) + self._beads.residue_shape
+        if residue_locations.shape != expected:
+            raise ValueError(
+                f"Locations of shape {expected} expected, got array of shape {residue_locations.shape}"
+            )
+
+        self._form_factor_matrix = self._beads.form_factor_matrix(self.q_values)
+        self._self_term = np.sum(self._form_factor_matrix**2, axis=0)
+        self._locations = self._beads.locations(residue_locations).copy()
+
+        self.accepted = 0
+        self.drift = 0.0
+        self._pending = None
+        self.intensity = None
+        self.recompute()
+
+    @property
+    def locations(self):
+        """
+        Current residue locations, `N` by `3` or `N` by `2` by `3` for the two bead model.
+        """
+        return self._locations.reshape(
+            (self._beads.n_residues,) + self._beads.residue_shape
+        ).copy()
+
+    def _intensity(self, partial_sums):
+        return self._self_term + np.sum(self._form_factor_matrix * partial_sums, axis=0)
+
+    def recompute(self):
+        """
+        Recomputes partial sums and `I(q)` from scratch.
+
+        Returns
+        -------
+        float
+            Largest relative deviation between previous and recomputed `I(q)`.
+        """
+        n_beads = len(self._locations)
+        rows = max(1, _max_block_elements // max(n_beads, 1))
+        partial_sums = np.zeros_like(self._form_factor_matrix)
+        for start in range(0, n_beads, rows):
+            block = slice(start, min(start + rows, n_beads))
+            distances = np.sqrt(
+                np.sum(
+                    (self._locations[block, np.newaxis] - self._locations[np.newaxis])
+                    ** 2,
+                    axis=-1,
+                )
+            )
+            for i, q in enumerate(self.q_values):
+                partial_sums[block, i] = (
+                    np.sinc(distances * (q / np.pi)) @ self._form_factor_matrix[:, i]
+                )
+        partial_sums -= self._form_factor_matrix  # remove sinc(0) of the bead itself
+
+        intensity = self._intensity(partial_sums)
+        deviation = (
+            0.0
+            if self.intensity is None
+            else np.max(np.abs(intensity - self.intensity) / np.abs(intensity))
+        )
+        self._partial_sums = partial_sums
+        self.intensity = intensity
+        return deviation
+
+    def _bead_indices(self, indices):
+        indices = np.atleast_1d(np.asarray(indices, dtype=int))
+        if np.any(indices < 0) or np.any(indices >= self._beads.n_residues):
+            raise IndexError("Residue index out of range")
+        if len(np.unique(indices)) != len(indices):
+            raise ValueError("Each residue can be moved only once per proposal")
+        return self._beads.bead_indices(indices)
+
+    def propose(self, indices, new_positions):
+        """
+        Computes scattering curve after moving residues `indices` to `new_positions`.
+
+        The move is kept pending until `accept` or `reject` is called, a new proposal replaces it.
+
+        Parameters
+        ----------
+        indices: list(int)
+            Indices of `k` moved residues.
+        new_positions: np.array(float)
+            Array with shape `k` by `3` (`k` by `2` by `3` for the two bead model) of new locations.
+
+        Returns
+        -------
+        np.array(float)
+            Vector of length `Q` of trial `I(q)`.
+        """
+        beads = self._bead_indices(indices)
+        new_positions = np.asarray(new_positions, dtype=float).reshape(
+            (-1, 3)
+        )  # beads of each residue are consecutive, as in `beads`
+        if len(new_positions) != len(beads):
+            raise ValueError("One new position per moved residue expected")
+
+        locations = self._locations.copy()
+        locations[beads] = new_positions
+
+        old_distances = np.sqrt(
+            np.sum(
+                (self._locations[beads, np.newaxis] - self._locations[np.newaxis]) ** 2,
+                axis=-1,
+            )
+        )
+        new_distances = np.sqrt(
+            np.sum((locations[beads, np.newaxis] - locations[np.newaxis]) ** 2, axis=-1)
+        )
+
+        partial_sums = self._partial_sums.copy()
+        moved = np.zeros(len(locations), dtype=bool)
+        moved[beads] = True
+        for i, q in enumerate(self.q_values):
+            new_sinc = np.sinc(new_distances * (q / np.pi))
+            change = new_sinc - np.sinc(old_distances * (q / np.pi))
+            partial_sums[~moved, i] += (
+                self._form_factor_matrix[beads, i] @ change[:, ~moved]
+            )
+            # moved beads see changes of all their pairs, recompute their rows
+            partial_sums[beads, i] = (
+                new_sinc @ self._form_factor_matrix[:, i]
+                - self._form_factor_matrix[beads, i]
+            )
+
+        intensity = self._intensity(partial_sums)
+        self._pending = (locations, partial_sums, intensity)
+        return intensity
+
+    def accept(self):
+        """
+        Commits the pending move.
+
+        Returns
+        -------
+        np.array(float)
+            Vector of length `Q` of new `I(q)`.
+        """
+        if self._pending is None:
+            raise ValueError("No move is pending")
+        self._locations, self._partial_sums, self.intensity = self._pending
+        self._pending = None
+
+        self.accepted += 1
+        if self.accepted % self.check_every == 0:
+            self.drift = max(self.drift, self.recompute())
+        return self.intensity
+
+    def reject(self):
+        """
+        Discards the pending move.
+
+        Returns
+        -------
+        np.array(float)
+            Vector of length `Q` of current `I(q)`.
+        """
+        self._pending = None
+        return self.intensity
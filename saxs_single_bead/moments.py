@@ -0,0 +1,266 @@
+# moments.py
+# low q series of the Debye sum from form factor weighted moments of bead locations
+
+import math
+import numpy as np
+import saxs_single_bead.form_factors
+import saxs_single_bead.debye_kernel
+
+_default_order = 8
+
+_max_block_elements = 2**22
+
+
+def _multi_indices(degree):
+    """
+    Returns exponents `(a, b, c)` with `a + b + c = degree` and multinomial coefficients `degree! / (a! b! c!)`.
+    """
+    exponents = [
+        (a, b, degree - a - b) for a in range(degree + 1) for b in range(degree - a + 1)
+    ]
+    coefficients = [
+        math.factorial(degree)
+        // (math.factorial(a) * math.factorial(b) * math.factorial(c))
+        for (a, b, c) in exponents
+    ]
+    return (exponents, coefficients)
+
+
+def _basis(centred, order):
+    """
+    Returns monomials `|r| ** (2 k) * x ** a * y ** b * z ** c` for `k + a + b + c <= order`
+    of conformers `centred` (`C` by `B` by `3`) and a dictionary of their column indices.
+    """
+    squared = np.sum(centred**2, axis=-1)
+    columns = dict()
+    values = list()
+    for degree in range(order + 1):
+        for a, b, c in _multi_indices(degree)[0]:
+            monomial = (
+                centred[..., 0] ** a * centred[..., 1] ** b * centred[..., 2] ** c
+            )
+            for k in range(order - degree + 1):
+                columns[(k, a, b, c)] = len(values)
+                values.append(squared**k * monomial)
+    return (np.stack(values, axis=-1), columns)
+
+
+def pair_moments(locations, form_factor_matrix, order=_default_order):
+    """
+    Computes `S_n(q) = sum_ij f_i(q) f_j(q) r_ij ** (2 n)` for `n = 0, ..., order` averaged over conformers.
+
+    Expanding `r_ij ** 2 = r_i ** 2 + r_j ** 2 - 2 r_i . r_j` reduces the double sum to products of
+    single sums `sum_i f_i(q) |r_i| ** (2 k) r_i ** alpha`, so the cost is proportional to `B` (not `B ** 2`)
+    for each conformer.
+
+    Parameters
+    ----------
+    locations: np.array(float)
+        Array with shape `B` by `3` or `M` by `B` by `3` of bead locations.
+    form_factor_matrix: np.array(float)
+        Array with shape `B` by `Q` of bead form factors.
+    order: int, optional
+        Largest power `n`, default `8`
+
+    Returns
+    -------
+    np.array(float)
+        Array with shape `order + 1` by `Q`.
+    """
+    locations = np.asarray(locations, dtype=float)
+    locations = locations.reshape((-1,) + locations.shape[-2:])
+    moments = np.zeros((order + 1, form_factor_matrix.shape[1]))
+
+    n_conformers, n_beads, _ = locations.shape
+    n_basis = len(_basis(np.zeros((1, 1, 3)), order)[1])
+    beads = max(1, min(n_beads, _max_block_elements // n_basis))
+    chunk = max(1, _max_block_elements // (n_basis * beads))
+
+    for start in range(0, n_conformers, chunk):
+        conformers = locations[start : start + chunk]
+        # centring keeps moments small, pair distances do not change
+        centred = conformers - np.mean(conformers, axis=1, keepdims=True)
+        single_sums = 0.0
+        for first in range(0, n_beads, beads):
+            block = slice(first, first + beads)
+            basis, columns = _basis(centred[:, block], order)
+            single_sums = single_sums + np.einsum(
+                "cbk,bq->cqk", basis, form_factor_matrix[block]
+            )
+
+        for n in range(order + 1):
+            for m in range(n + 1):
+                exponents, coefficients = _multi_indices(m)
+                for k in range(n - m + 1):
+                    l = n - m - k
+                    weight = (
+                        math.factorial(n)
+                        // (math.factorial(k) * math.factorial(l) * math.factorial(m))
+                        * (-2) ** m
+                    )
+                    for (a, b, c), coefficient in zip(exponents, coefficients):
+                        moments[n] += (
+                            weight
+                            * coefficient
+                            * np.sum(
+                                single_sums[..., columns[(k, a, b, c)]]
+                                * single_sums[..., columns[(l, a, b, c)]],
+                                axis=0,
+                            )
+                        )
+
+    return moments / len(locations)
+
+
+def series_limit(order=_default_order, accuracy=1e-6):
+    """
+    Returns the largest `x = q * D_max` for which the truncated series of `sinc(x)` up to `x ** (2 order)`
+    has error below `accuracy`, the first omitted term `x ** (2 order + 2) / (2 order + 3)!` bounds the error.
+    """
+    return min(
+        (accuracy * math.factorial(2 * order + 3)) ** (1.0 / (2 * order + 2)),
+        np.sqrt((2 * order + 2) * (2 * order + 3)),
+    )
+
+
+def diameter_bound(locations):
+    """
+    Returns twice the largest distance of a bead from the centre of its conformer, an upper bound of `D_max`.
+    """
+    locations = np.asarray(locations, dtype=float)
+    locations = locations.reshape((-1,) + locations.shape[-2:])
+    centred = locations - np.mean(locations, axis=1, keepdims=True)
+    return 2.0 * np.sqrt(np.max(np.sum(centred**2, axis=-1)))
+
+
+def moment_intensity(
+    locations,
+    form_factor_matrix,
+    q_values,
+    accuracy=1e-6,
+    order=_default_order,
+    block_size=None,
+    max_memory=None,
+    dtype=np.float64,
+    backend="numpy",
+):
+    """
+    Computes scattering intensity from the low `q` series
+
+        I(q) = sum_n (-1) ** n q ** (2 n) / (2 n + 1)! S_n(q),   S_n(q) = sum_ij f_i(q) f_j(q) r_ij ** (2 n),
+
+    for `q` where the absolute error is bounded by `accuracy * (sum_j |f_j(q)|) ** 2`, larger `q` are handed over
+    to the exact Debye kernel. For non negative form factors the first omitted term `S_{order + 1}` bounds
+    the error, otherwise `q * D_max` has to be below `series_limit(order, accuracy)`.
+
+    Parameters
+    ----------
+    locations: np.array(float)
+        Array with shape `B` by `3` or `M` by `B` by `3` of bead locations, the result is averaged over conformers.
+    form_factor_matrix: np.array(float)
+        Array with shape `B` by `Q` of bead form factors.
+    q_values: np.array(float)
+        Vector of length `Q` of scattering vectors, units: Angstrom^(-1)
+    accuracy: float, optional
+        Bound on truncation error relative to `(sum_j |f_j(q)|) ** 2`, default `1e-6`
+    order: int, optional
+        Largest power of `q ** 2` of the series, default `8`
+    block_size: int, optional
+        Number of beads per block of the exact kernel, by default chosen from `max_memory`
+    max_memory: int, optional
+        Bound on memory used by temporary arrays of the exact kernel, default `2 ** 30`, units: bytes
+    dtype: np.dtype, optional
+        Precision of distances and sinc evaluations of the exact kernel, default `np.float64`
+    backend: string, optional
+        Kernel of the exact Debye sum, see `debye_kernel.debye_intensity`, default `"numpy"`
+
+    Returns
+    -------
+    np.array(float)
+        Vector of length `Q` of `I(q)` values.
+    """
+    if accuracy <= 0.0:
+        raise ValueError("`accuracy` has to be positive")
+
+    q_values = np.asarray(q_values, dtype=float)
+    locations = np.asarray(locations, dtype=float)
+    locations = locations.reshape((-1,) + locations.shape[-2:])
+    I_values = np.zeros_like(q_values)
+
+    moments = pair_moments(locations, form_factor_matrix, order + 1)
+    powers = np.arange(order + 2)[:, np.newaxis]
+    factors = np.array(
+        [(-1) ** n / math.factorial(2 * n + 1) for n in range(order + 2)]
+    )[:, np.newaxis]
+    terms = factors * q_values ** (2 * powers) * moments
+    allowed = accuracy * np.sum(np.abs(form_factor_matrix), axis=0) ** 2
+
+    # while terms of sinc decrease, the first omitted term bounds the error of each pair,
+    # for non negative form factors the sum of these bounds is the omitted term of the series
+    x_max = q_values * diameter_bound(locations)
+    decreasing = x_max <= np.sqrt((2 * order + 2) * (2 * order + 3))
+    positive = np.all(form_factor_matrix >= 0.0, axis=0)
+    low = np.where(
+        positive & decreasing,
+        np.abs(terms[order + 1]) <= allowed,
+        x_max <= series_limit(order, accuracy),
+    )
+    I_values[low] = np.sum(terms[: order + 1, low], axis=0)
+
+    if not np.all(low):
+        n_beads = locations.shape[1]
+        block_size = saxs_single_bead.debye_kernel.choose_block_size(
+            n_beads, block_size, max_memory, dtype
+        )
+        chunk = saxs_single_bead.debye_kernel.conformers_per_chunk(
+            n_beads, block_size, max_memory, dtype
+        )
+        high = ~low
+        for start in range(0, len(locations), chunk):
+            I_values[high] += np.sum(
+                saxs_single_bead.debye_kernel.debye_intensity(
+                    locations[start : start + chunk],
+                    form_factor_matrix[:, high],
+                    q_values[high],
+                    block_size,
+                    dtype,
+                    backend,
+                ),
+                axis=0,
+            )
+        I_values[high] /= len(locations)
+
+    return I_values
+
+
+def guinier_parameters(residue_codes, residue_locations, model=1):
+    """
+    Returns exact `I(0)` and form factor weighted radius of gyration of the averaged curve,
+
+        I(0) = (sum_i f_i(0)) ** 2,   R_g ** 2 = S_1(0) / (2 S_0(0)),
+
+    so that `I(q) ~ I(0) (1 - (q R_g) ** 2 / 3)` at small `q`. Cost is proportional to `M * N`.
+
+    Parameters
+    ----------
+    residue_codes: list(string)
+        List of residues of length `N`. Can be 3 letter codes (such as "GLY") or single letter codes (such as "G") or "BB"
+        for two bead backbone locations (blend model only).
+    residue_locations: np.array(float)
+        Array with shape `N` by `3` (`N` by `2` by `3` for the two bead model) of locations,
+        with an additional leading axis of length `M` for ensembles.
+    model: int or list(int), optional
+        `1` for single bead, `2` for two bead or a list of length `N` with model type of each residue, default `1`.
+
+    Returns
+    -------
+    (float,float)
+        `I(0)` and `R_g`, units: Angstrom
+    """
+    codes = saxs_single_bead.debye_kernel.bead_codes(residue_codes, model)
+    moments = pair_moments(
+        saxs_single_bead.debye_kernel.bead_locations(residue_locations, model),
+        saxs_single_bead.form_factors.form_factor_matrix(codes, [0.0], model=model),
+        order=1,
+    )[:, 0]
+    return (moments[0], np.sqrt(moments[1] / (2.0 * moments[0])))
@@ -0,0 +1,214 @@
+# multipole.py
+# spherical harmonic expansion of the scattering amplitude for very large structures
+
+import numpy as np
+
+_max_block_elements = 2**24
+
+
+def spherical_bessel(l_max, x):
+    """
+    Computes spherical Bessel functions of the first kind `j_l(x)` for `l = 0, ..., l_max`.
+
+    Uses downward (Miller) recurrence, which is stable for all orders, normalized with
+    the closed forms of `j_0` and `j_1`.
+
+    Parameters
+    ----------
+    l_max: int
+        Largest order.
+    x: np.array(float)
+        Vector of non negative arguments.
+
+    Returns
+    -------
+    np.array(float)
+        Array with shape `l_max + 1` by `len(x)`.
+    """
+    x = np.atleast_1d(np.asarray(x, dtype=float))
+    values = np.zeros((l_max + 1, len(x)))
+
+    tiny = x < 1e-8
+    values[0, tiny] = 1.0
+    x = x[~tiny]
+    if len(x) == 0:
+        return values
+
+    largest = max(l_max, np.max(x))
+    l_start = int(largest + 15 + 4 * largest ** (1.0 / 3.0))
+
+    l_stored = max(l_max, 1)
+    upper = np.zeros_like(x)
+    current = np.full_like(x, 1e-300)
+    computed = np.zeros((l_stored + 1, len(x)))
+    for l in range(l_start, 0, -1):
+        upper, current = (current, (2 * l + 1) / x * current - upper)
+        if l - 1 <= l_stored:
+            computed[l - 1] = current
+        large = np.abs(current) > 1e200
+        if np.any(large):
+            upper[large] *= 1e-200
+            current[large] *= 1e-200
+            computed[:, large] *= 1e-200
+
+    # zeros of j_0 and j_1 interlace, normalize with the larger of the two
+    j_0 = np.sin(x) / x
+    j_1 = np.sin(x) / x**2 - np.cos(x) / x
+    first_order = np.abs(j_1) > np.abs(j_0)
+    scale = np.where(
+        first_order,
+        j_1 / np.where(first_order, computed[1], 1.0),
+        j_0 / np.where(first_order, 1.0, computed[0]),
+    )
+    values[:, ~tiny] = computed[: l_max + 1] * scale
+    return values
+
+
+def real_spherical_harmonics(l_max, directions):
+    """
+    Computes orthonormal real spherical harmonics `Y_lm` for `l = 0, ..., l_max`.
+
+    Parameters
+    ----------
+    l_max: int
+        Largest order.
+    directions: np.array(float)
+        Array with shape `B` by `3` of vectors, need not be normalized.
+
+    Returns
+    -------
+    np.array(float)
+        Array with shape `B` by `(l_max + 1) ** 2`, column `l ** 2 + l + m` holds `Y_lm`.
+    """
+    directions = np.asarray(directions, dtype=float)
+    radius = np.sqrt(np.sum(directions**2, axis=-1))
+    cos_theta = np.where(
+        radius > 0, directions[:, 2] / np.where(radius > 0, radius, 1), 1.0
+    )
+    cos_theta = np.clip(cos_theta, -1.0, 1.0)
+    sin_theta = np.sqrt(1.0 - cos_theta**2)
+    phi = np.arctan2(directions[:, 1], directions[:, 0])
+
+    harmonics = np.zeros((len(directions), (l_max + 1) ** 2))
+    diagonal = np.full_like(cos_theta, np.sqrt(1.0 / (4.0 * np.pi)))
+    for m in range(0, l_max + 1):
+        if m > 0:
+            diagonal = np.sqrt((2 * m + 1) / (2.0 * m)) * sin_theta * diagonal
+        if m == 0:
+            cosine, sine = (np.ones_like(phi), np.zeros_like(phi))
+        else:
+            cosine, sine = (
+                np.sqrt(2.0) * np.cos(m * phi),
+                np.sqrt(2.0) * np.sin(m * phi),
+            )
+
+        previous, legendre = (np.zeros_like(cos_theta), diagonal)
+        for l in range(m, l_max + 1):
+            if l == m + 1:
+                previous, legendre = (
+                    legendre,
+                    np.sqrt(2 * m + 3.0) * cos_theta * legendre,
+                )
+            elif l > m + 1:
+                a = np.sqrt((4.0 * l**2 - 1.0) / (l**2 - m**2))
+                b = np.sqrt((4.0 * (l - 1) ** 2 - 1.0) / ((l - 1) ** 2 - m**2))
+                previous, legendre = (
+                    legendre,
+                    a * (cos_theta * legendre - previous / b),
+                )
+
+            harmonics[:, l**2 + l + m] = legendre * cosine
+            if m > 0:
+                harmonics[:, l**2 + l - m] = legendre * sine
+
+    return harmonics
+
+
+def truncation_order(x, accuracy):
+    """
+    Returns the smallest expansion order `L >= x` such that
+    `sum_{l > L} (2 l + 1) j_l(x) ** 2 <= accuracy`.
+
+    Parameters
+    ----------
+    x: float
+        Product of scattering vector and radius of the structure.
+    accuracy: float
+        Bound on relative truncation error.
+
+    Returns
+    -------
+    int
+        Truncation order.
+    """
+    largest = int(np.ceil(x + 15 + 4 * max(x, 1.0) ** (1.0 / 3.0)))
+    bessel = spherical_bessel(largest, [x])[:, 0]
+    tail = np.cumsum(((2 * np.arange(largest + 1) + 1) * bessel**2)[::-1])[::-1]
+    below = np.nonzero(tail[1:] <= accuracy)[0]
+    order = below[0] if len(below) > 0 else largest
+    return int(max(order, np.ceil(x)))
+
+
+def multipole_intensity(locations, form_factor_matrix, q_values, accuracy=1e-6):
+    """
+    Computes scattering intensity from a spherical harmonic expansion of the scattering amplitude
+
+        I(q) = 4 pi sum_lm ( sum_j f_j(q) j_l(q r_j) Y_lm(r_j) ) ** 2
+
+    at cost proportional to `B * L(q) ** 2` for each `q`, instead of `B ** 2` of the Debye sum.
+    The order `L(q)` is chosen from `q` times the radius of the structure so that the absolute
+    error is bounded by `accuracy * (sum_j |f_j(q)|) ** 2`.
+
+    Parameters
+    ----------
+    locations: np.array(float)
+        Array with shape `B` by `3` or `M` by `B` by `3` of bead locations, the result is averaged over conformers.
+    form_factor_matrix: np.array(float)
+        Array with shape `B` by `Q` of bead form factors.
+    q_values: np.array(float)
+        Vector of length `Q` of scattering vectors, units: Angstrom^(-1)
+    accuracy: float, optional
+        Bound on truncation error relative to `(sum_j |f_j(q)|) ** 2`, default `1e-6`
+
+    Returns
+    -------
+    np.array(float)
+        Vector of length `Q` of `I(q)` values.
+    """
+    if accuracy <= 0.0:
+        raise ValueError("`accuracy` has to be positive")
+
+    q_values = np.asarray(q_values, dtype=float)
+    locations = np.asarray(locations, dtype=float)
+    locations = locations.reshape((-1,) + locations.shape[-2:])
+
+    I_values = np.zeros_like(q_values)
+    for conformer in locations:
+        centred = conformer - np.mean(conformer, axis=0)
+        radii = np.sqrt(np.sum(centred**2, axis=-1))
+        orders = np.array(
+            [truncation_order(q * np.max(radii), accuracy) for q in q_values]
+        )
+        l_max = int(np.max(orders))
+
+        amplitudes = np.zeros((len(q_values), (l_max + 1) ** 2))
+        block = max(
+            1, _max_block_elements // ((l_max + 1) ** 2 + len(q_values) * (l_max + 1))
+        )
+        for start in range(0, len(centred), block):
+            chunk = slice(start, start + block)
+            harmonics = real_spherical_harmonics(l_max, centred[chunk])
+            weights = np.zeros((len(q_values), l_max + 1, len(radii[chunk])))
+            for i, q in enumerate(q_values):
+                weights[i, : orders[i] + 1] = form_factor_matrix[
+                    chunk, i
+                ] * spherical_bessel(orders[i], q * radii[chunk])
+
+            for l in range(l_max + 1):
+                rows = orders >= l
+                columns = slice(l**2, (l + 1) ** 2)
+                amplitudes[rows, columns] += weights[rows, l] @ harmonics[:, columns]
+
+        I_values += 4.0 * np.pi * np.sum(amplitudes**2, axis=1)
+
+    return I_values / len(locations)
@@ -0,0 +1,117 @@
+# numba_kernel.py
+# optional compiled Debye kernel fusing distances, sinc and form factor products in one loop over pairs
+
+import importlib.util
+import os
+import numpy as np
+
+"""
+Whether numba can be imported, the kernel itself is compiled on first use.
+"""
+available = importlib.util.find_spec("numba") is not None
+
+_compiled = None
+
+
+def _make_pair_sums(prange):
+    """
+    Returns the loop over pairs with rows distributed by `prange`, `range` for plain Python
+    and `numba.prange` for the compiled kernel.
+    """
+
+    def _pair_sums(locations, form_factors, q_values, out):
+        """
+        Adds `2 sum_{i<j} f_i(q) f_j(q) sinc(q r_ij)` of each conformer to rows of `out` (`M` by `Q`).
+
+        Rows `i` and `B - 1 - i` are handled by the same iteration, so that parallel iterations
+        have equal numbers of pairs. Each bead accumulates its own row of partial sums in double precision,
+        no temporaries of pairs are allocated.
+        """
+        n_conformers, n_beads, _ = locations.shape
+        n_q = len(q_values)
+        for m in range(n_conformers):
+            rows = np.zeros((n_beads, n_q))
+            for p in prange((n_beads + 1) // 2):
+                for t in range(2):
+                    # the (unsigned) parallel index and signed sizes must not be unified to float
+                    i = np.int64(p) if t == 0 else np.int64(n_beads - 1 - p)
+                    if t == 1 and i == p:
+                        break
+                    for j in range(i + 1, n_beads):
+                        dx = locations[m, i, 0] - locations[m, j, 0]
+                        dy = locations[m, i, 1] - locations[m, j, 1]
+                        dz = locations[m, i, 2] - locations[m, j, 2]
+                        distance = np.sqrt(dx * dx + dy * dy + dz * dz)
+                        for k in range(n_q):
+                            x = q_values[k] * distance
+                            sinc = np.sin(x) / x if x != 0.0 else 1.0
+                            rows[i, k] += form_factors[i, k] * form_factors[j, k] * sinc
+            for i in range(n_beads):
+                for k in range(n_q):
+                    out[m, k] += 2.0 * rows[i, k]
+
+    return _pair_sums
+
+
+_pair_sums = _make_pair_sums(range)
+
+
+def _kernel():
+    """
+    Returns `_pair_sums` compiled in parallel mode, numba is imported only when the kernel is first needed.
+
+    Compiled code is cached on disk only if `NUMBA_CACHE_DIR` is set, numba otherwise writes its cache
+    next to this module, which fails or litters read only and site-packages installs.
+    """
+    global _compiled
+    if _compiled is None:
+        import numba
+
+        _compiled = numba.njit(parallel=True, cache="NUMBA_CACHE_DIR" in os.environ)(
+            _make_pair_sums(numba.prange)
+        )
+    return _compiled
+
+
+def debye_intensity(locations, form_factor_matrix, q_values, dtype=np.float64):
+    """
+    Evaluates the Debye double sum with the compiled kernel, parallelized across cores.
+
+    Parameters
+    ----------
+    locations: np.array(float)
+        Array with shape `B` by `3` or `M` by `B` by `3` of bead locations.
+    form_factor_matrix: np.array(float)
+        Array with shape `B` by `Q` of bead form factors.
+    q_values: np.array(float)
+        Vector of length `Q` of scattering vectors, units: Angstrom^(-1)
+    dtype: np.dtype, optional
+        Precision of distances and sinc evaluations, `np.float32` or `np.float64`, default `np.float64`
+
+    Returns
+    -------
+    np.array(float)
+        Array of length `Q` or shape `M` by `Q` with `I(q)` of each conformer.
+    """
+    locations = np.asarray(locations, dtype=float)
+    single = locations.ndim == 2
+    if single:
+        locations = locations[np.newaxis]
+
+    dtype = np.dtype(dtype)
+    if dtype != np.float64:
+        # centering keeps single precision coordinates close to the origin
+        locations = locations - np.mean(locations, axis=1, keepdims=True)
+
+    I_values = np.zeros((len(locations), len(q_values)))
+    I_values += np.sum(form_factor_matrix**2, axis=0)
+    _kernel()(
+        np.ascontiguousarray(locations, dtype=dtype),
+        np.ascontiguousarray(form_factor_matrix, dtype=dtype),
+        np.ascontiguousarray(q_values, dtype=dtype),
+        I_values,
+    )
+
+    if single:
+        return I_values[0]
+    return I_values
@@ -0,0 +1,165 @@
+# partial_structure.py
+# form factor independent partial structure factors of pairs of bead types
+
+import collections
+import numpy as np
+import saxs_single_bead.form_factors
+import saxs_single_bead.debye_kernel
+import saxs_single_bead.bead_model
+
+PartialStructureFactors = collections.namedtuple(
+    "PartialStructureFactors", ["q_values", "types", "values"]
+)
+PartialStructureFactors.__doc__ = """
+Partial structure factors `S_ab(q) = sum_{i in a} sum_{j in b} sinc(q r_ij)` averaged over conformers,
+pairs `i = j` included, so that `I(q) = sum_ab f_a(q) f_b(q) S_ab(q)` for any form factors of types.
+
+Attributes
+----------
+q_values: np.array(float)
+    Vector of length `Q` of scattering vectors, units: Angstrom^(-1)
+types: np.array(int)
+    Vector of length `K` of bead types, rows of the combined form factor table (see `form_factors.residue_type_indices`).
+values: np.array(float)
+    Array with shape `K` by `K` by `Q` of `S_ab(q)`, symmetric in `a` and `b`.
+"""
+
+
+def partial_structure_factors(
+    residue_codes,
+    residue_locations,
+    q_values,
+    model=1,
+    block_size=None,
+    max_memory=None,
+    dtype=np.float64,
+):
+    """
+    Computes partial structure factors of all pairs of bead types of a structure or an ensemble.
+
+    The geometry is visited once, `contract` then evaluates `I(q)` for any form factor table, solvent
+    contrast or deuteration level at cost proportional to `K ** 2 * Q`.
+
+    Parameters
+    ----------
+    residue_codes: list(string)
+        List of residues of length `N`. Can be 3 letter codes (such as "GLY") or single letter codes (such as "G") or "BB"
+        for two bead backbone locations (blend model only).
+    residue_locations: np.array(float)
+        Array with shape `N` by `3` (`N` by `2` by `3` for the two bead model) of locations,
+        with an additional leading axis of length `M` for ensembles.
+    q_values: np.array(float)
+        Vector of length `Q` of scattering vectors, units: Angstrom^(-1)
+    model: int or list(int), optional
+        `1` for single bead, `2` for two bead or a list of length `N` with model type of each residue, default `1`.
+    block_size: int, optional
+        Number of beads per block of pairs processed at once, by default chosen from `max_memory`
+    max_memory: int, optional
+        Bound on memory used by temporary arrays, default `2 ** 30`, units: bytes
+    dtype: np.dtype, optional
+        Precision of distances and sinc evaluations, `np.float32` or `np.float64`, sums over pairs are
+        accumulated in `np.float64`, default `np.float64`
+
+    Returns
+    -------
+    PartialStructureFactors
+        Named tuple of `q_values`, `types` and `values`.
+    """
+    beads = saxs_single_bead.bead_model.BeadModel(residue_codes, model)
+    locations = beads.locations(residue_locations).reshape((-1, beads.n_beads, 3))
+    q_values = np.asarray(q_values, dtype=float)
+    dtype = saxs_single_bead.debye_kernel.check_dtype(dtype)
+    if dtype != np.float64:
+        # centering keeps single precision coordinates close to the origin
+        locations = locations - np.mean(locations, axis=1, keepdims=True)
+    locations = locations.astype(dtype, copy=False)
+
+    types, bead_types = np.unique(beads.type_indices, return_inverse=True)
+    n_types = len(types)
+    n_conformers, n_beads, _ = locations.shape
+    block_size = saxs_single_bead.debye_kernel.choose_block_size(
+        n_beads, block_size, max_memory, dtype
+    )
+    chunk = saxs_single_bead.debye_kernel.conformers_per_chunk(
+        n_beads, block_size, max_memory, dtype
+    )
+
+    # ordered pairs of types, only pairs i < j are visited and symmetrized at the end
+    sums = np.zeros((len(q_values), n_types * n_types))
+    for start in range(0, n_conformers, chunk):
+        conformers = locations[start : start + chunk]
+        for start_a in range(0, n_beads, block_size):
+            block_a = slice(start_a, min(start_a + block_size, n_beads))
+            for start_b in range(start_a, n_beads, block_size):
+                block_b = slice(start_b, min(start_b + block_size, n_beads))
+                distances, first, second = (
+                    saxs_single_bead.debye_kernel._pair_distances(
+                        conformers, block_a, block_b
+                    )
+                )
+                if block_a == block_b:
+                    pair_types = bead_types[first] * n_types + bead_types[second]
+                else:
+                    pair_types = (
+                        bead_types[first, np.newaxis] * n_types
+                        + bead_types[np.newaxis, second]
+                    ).ravel()
+                pair_types = np.broadcast_to(
+                    pair_types, (len(conformers), pair_types.size)
+                ).ravel()
+
+                for i, q in enumerate(q_values):
+                    sums[i] += np.bincount(
+                        pair_types,
+                        weights=np.sinc(distances * dtype.type(q / np.pi)).ravel(),
+                        minlength=n_types * n_types,
+                    )
+
+    sums = np.moveaxis(sums.reshape((len(q_values), n_types, n_types)), 0, -1)
+    values = (sums + np.swapaxes(sums, 0, 1)) / n_conformers
+    values[np.arange(n_types), np.arange(n_types)] += np.bincount(
+        bead_types, minlength=n_types
+    )[:, np.newaxis]
+    return PartialStructureFactors(q_values, types, values)
+
+
+def contract(partials, form_factors=None):
+    """
+    Computes scattering intensity `I(q) = sum_ab f_a(q) f_b(q) S_ab(q)` from partial structure factors.
+
+    Parameters
+    ----------
+    partials: PartialStructureFactors
+        Partial structure factors, for example from `partial_structure_factors`.
+    form_factors: np.array(float), optional
+        Array with shape `K` by `Q` of form factors of `partials.types` or vector of length `K` of
+        `q` independent scattering lengths (for example contrasts at a given deuteration level),
+        by default form factors of the active table (see `form_factors.use_table`).
+
+    Returns
+    -------
+    np.array(float)
+        Vector of length `Q` of `I(q)` values.
+
+    Examples
+    --------
+    >>> partials = partial_structure_factors(sequence, ensemble, q_values)
+    >>> form_factors.register_table("refitted", "refitted.npy")
+    >>> for name in form_factors.table_names():
+    ...     form_factors.use_table(name)
+    ...     I_values = contract(partials)
+    """
+    if form_factors is None:
+        form_factors = saxs_single_bead.form_factors._interpolate_table(
+            partials.types, partials.q_values
+        )
+    form_factors = np.asarray(form_factors, dtype=float)
+    if form_factors.ndim == 1:
+        form_factors = np.repeat(
+            form_factors[:, np.newaxis], len(partials.q_values), axis=1
+        )
+    if form_factors.shape != (len(partials.types), len(partials.q_values)):
+        raise ValueError(
+            f"Form factors of shape {(len(partials.types), len(partials.q_values))} expected, got array of shape {form_factors.shape}"
+        )
+    return np.einsum("aq,abq,bq->q", form_factors, partials.values, form_factors)
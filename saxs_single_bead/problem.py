@@ -0,0 +1,244 @@
+# problem.py
+# reusable scattering problems caching geometry between evaluations
+
+import numpy as np
+import saxs_single_bead.form_factors
+import saxs_single_bead.debye_kernel
+import saxs_single_bead.bead_model
+import saxs_single_bead.distance_histogram
+import saxs_single_bead.scattering_curve
+
+
+class ScatteringProblem:
+    """
+    Structure or ensemble prepared for repeated evaluation of scattering curves.
+
+    Residue codes are validated and encoded once. Pair distances (`"debye"` engine) or pair distance
+    histograms (`"histogram"` engine) are computed on first use and reused, so that further
+    evaluations only pay for the `q` dependent part. Caches are not pickled, which keeps problems
+    cheap to send to worker processes.
+
+    Parameters
+    ----------
+    residue_codes: list(string)
+        List of residues of length `N`. Can be 3 letter codes (such as "GLY") or single letter codes (such as "G") or "BB"
+        for two bead backbone locations (blend model only).
+    residue_locations: np.array(float)
+        Array with shape `N` by `3` (`N` by `2` by `3` for the two bead model) of locations,
+        with an additional leading axis of length `M` for ensembles.
+    model: int or list(int), optional
+        `1` for single bead, `2` for two bead or a list of length `N` with model type of each residue, default `1`.
+    engine: string, optional
+        `"debye"`, `"histogram"`, `"multipole"` or `"moments"`, default `"debye"`
+    bin_width: float, optional
+        Width of distance bins of the `"histogram"` engine, default `0.1`, units: Angstrom
+    accuracy: float, optional
+        Bound on truncation error of the `"multipole"` and `"moments"` engines relative to `(sum_j |f_j(q)|) ** 2`,
+        default `1e-6`
+    max_memory: int, optional
+        Largest size of cached pair distances, larger problems are evaluated with the blocked kernel
+        without caching, default `2 ** 30`, units: bytes
+    dtype: np.dtype, optional
+        Precision of distances and sinc evaluations of the `"debye"` and `"moments"` engines, default `np.float64`
+    backend: string, optional
+        Kernel of the `"debye"` and `"moments"` engines, see `scattering_curve.scattering_curve`. Only `"numpy"`
+        caches pair distances, `"blas"` and `"numba"` evaluate distances again on each call without
+        temporary arrays of all pairs, default `"numpy"`
+
+    Examples
+    --------
+    >>> problem = ScatteringProblem(sequence, locations)
+    >>> for q_values in grids:
+    ...     I_values = problem.intensity(q_values)
+    """
+
+    def __init__(
+        self,
+        residue_codes,
+        residue_locations,
+        model=1,
+        engine="debye",
+        bin_width=0.1,
+        accuracy=1e-6,
+        max_memory=None,
+        dtype=np.float64,
+        backend="numpy",
+    ):
+        saxs_single_bead.scattering_curve._check_engine(engine)
+        self.model = model
+        self.engine = engine
+        self.bin_width = bin_width
+        self.accuracy = accuracy
+        self.max_memory = (
+            saxs_single_bead.debye_kernel._default_max_memory
+            if max_memory is None
+            else max_memory
+        )
+        self.dtype = saxs_single_bead.debye_kernel.check_dtype(dtype)
+        self.backend = saxs_single_bead.debye_kernel.check_backend(backend)
+
+        self._beads = saxs_single_bead.bead_model.BeadModel(residue_codes, model)
+        self.bead_codes = self._beads.codes
+        self.type_indices = self._beads.type_indices
+        self.locations = self._beads.locations(residue_locations).reshape(
+            (-1, self._beads.n_beads, 3)
+        )
+
+        self._clear_caches()
+
+    def _clear_caches(self):
+        self._distances = None
+        self._pair_types = None
+        self._types = None
+        self._histogram = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for cache in ("_distances", "_pair_types", "_types", "_histogram"):
+            state[cache] = None
+        return state
+
+    def _cache_distances(self):
+        """
+        Computes condensed pair distances of all conformers and type pair index of each pair.
+        """
+        types, bead_types = np.unique(self.type_indices, return_inverse=True)
+        first, second = np.triu_indices(len(bead_types), k=1)
+        self._pair_types = (bead_types[first] * len(types) + bead_types[second]).astype(
+            np.int32
+        )
+        self._types = types
+
+        if self.dtype != np.float64:
+            locations = self.locations - np.mean(self.locations, axis=1, keepdims=True)
+        else:
+            locations = self.locations
+        locations = locations.astype(self.dtype, copy=False)
+        self._distances = np.empty((len(locations), len(first)), dtype=self.dtype)
+        for m, conformer in enumerate(locations):
+            self._distances[m] = np.sqrt(
+                np.sum((conformer[second] - conformer[first]) ** 2, axis=-1)
+            )
+
+    def _pair_histogram(self):
+        if self._histogram is None:
+            self._histogram = saxs_single_bead.distance_histogram.PairDistanceHistogram(
+                self.type_indices, bin_width=self.bin_width
+            )
+            self._histogram.add(self.locations)
+        return self._histogram
+
+    def distribution(self, weights="form_factor", r_values=None):
+        """
+        Computes the weighted pair distance distribution `P(r)` averaged over all conformers.
+
+        Histograms are binned with `bin_width` once and shared with the `"histogram"` engine.
+
+        Parameters
+        ----------
+        weights: string or np.array(float), optional
+            `"form_factor"` for form factors at `q = 0`, `"electrons"` for numbers of electrons of beads
+            or a vector of weights of each of the sorted unique `type_indices`, default `"form_factor"`
+        r_values: np.array(float), optional
+            Distances at which `P(r)` is linearly interpolated, by default centres of distance bins, units: Angstrom
+
+        Returns
+        -------
+        distance_histogram.PairDistribution
+            Named tuple of `r_values`, `distribution` and `self_term`.
+        """
+        return self._pair_histogram().distribution(weights=weights, r_values=r_values)
+
+    def _debye_intensity(self, q_values):
+        n_pairs = len(self.type_indices) * (len(self.type_indices) - 1) // 2
+        # distances of each conformer and one type pair index of each pair
+        cached_bytes = len(self.locations) * n_pairs * self.dtype.itemsize + n_pairs * 4
+        if self._distances is None and (
+            cached_bytes > self.max_memory or self.backend != "numpy"
+        ):
+            block_size = saxs_single_bead.debye_kernel.choose_block_size(
+                len(self.type_indices), None, self.max_memory, self.dtype
+            )
+            form_factor_matrix = self._beads.form_factor_matrix(q_values)
+            return np.mean(
+                [
+                    saxs_single_bead.debye_kernel.debye_intensity(
+                        conformer,
+                        form_factor_matrix,
+                        q_values,
+                        block_size,
+                        self.dtype,
+                        self.backend,
+                    )
+                    for conformer in self.locations
+                ],
+                axis=0,
+            )
+
+        if self._distances is None:
+            self._cache_distances()
+
+        form_factors = saxs_single_bead.form_factors._interpolate_table(
+            self._types, q_values
+        )
+        counts = np.bincount(
+            np.searchsorted(self._types, self.type_indices), minlength=len(self._types)
+        )
+        I_values = np.sum(counts[:, np.newaxis] * form_factors**2, axis=0)
+
+        for i, q in enumerate(q_values):
+            products = np.outer(form_factors[:, i], form_factors[:, i]).astype(
+                self.dtype
+            )
+            I_values[i] += (
+                2.0
+                * np.sum(
+                    products.ravel()[self._pair_types]
+                    * np.sinc(self._distances * self.dtype.type(q / np.pi)),
+                    dtype=np.float64,
+                )
+                / len(self._distances)
+            )
+        return I_values
+
+    def intensity(self, q_values):
+        """
+        Computes scattering intensity averaged over all conformers.
+
+        Parameters
+        ----------
+        q_values: np.array(float) or list(np.array(float))
+            Values of `q` or a list of grids evaluated in one pass, units: Angstrom^(-1)
+
+        Returns
+        -------
+        np.array(float) or list(np.array(float))
+            Values of `I(q)` on each grid.
+        """
+        unique_q, q_layout = saxs_single_bead.scattering_curve._q_grid(
+            None, None, None, q_values
+        )
+
+        if self.engine == "debye":
+            I_values = self._debye_intensity(unique_q)
+        elif self.engine == "histogram":
+            I_values = self._pair_histogram().intensity(unique_q)
+        else:
+            I_values = saxs_single_bead.scattering_curve._engine_curve(
+                self.engine,
+                self._beads,
+                self.locations,
+                unique_q,
+                self.bin_width,
+                self.accuracy,
+                max_memory=self.max_memory,
+                dtype=self.dtype,
+                backend=self.backend,
+            )
+
+        arranged = saxs_single_bead.scattering_curve._arrange_curves(
+            q_layout, unique_q, I_values
+        )
+        if isinstance(arranged, list):
+            return [I for (_, I) in arranged]
+        return arranged[1]
@@ -12,10 +12,34 @@ def element_mass(element_name):
 def element_electrons(element_name):
     return _electrons_dict[element_name]
 
+def _residue_key(line):
+    """
+    Returns `(chain, residue number, insertion code)` identifying the residue of an ATOM `line`
+    """
+    return (line[21], int(line[22:26]), line[26])
+
+def _sorted_residues(residues):
+    """
+    Returns keys of `residues` (from `_residue_key`) sorted by residue number and insertion code
+    within each chain, chains in order of appearance
+    """
+    chains = list(dict.fromkeys(key[0] for key in residues))
+    return sorted(residues, key=lambda key: (chains.index(key[0]), key[1], key[2]))
+
+def _format_residue(key):
+    """
+    Returns residue `key` (from `_residue_key`) for messages, such as "27A of chain B"
+    """
+    chain, resid, insertion = key
+    return f"{resid}{insertion.strip()}" + (f" of chain {chain}" if chain.strip() else "")
+
 def read_c_alpha_pdb(filename):
     """
     Reads a .pdb file into np.array
 
+    Residues are identified by chain, residue number and insertion code, ordered by residue number
+    within each chain and chains in order of appearance.
+
     Parameters
     ----------
     filename: string
@@ -37,13 +61,13 @@ def read_c_alpha_pdb(filename):
     for line in lines:
         if line[0:4] == "ATOM":
             if "CA" in line:
-                resid = int(line[22:26])
+                resid = _residue_key(line)
                 x = float(line[30:38])
                 y = float(line[38:46])
                 z = float(line[46:54])
                 if resid in residues:
                     print(
-                        f"Warning: multiple locations for residue {resid}",
+                        f"Warning: multiple locations for residue {_format_residue(resid)}",
                         file=sys.stderr,
                     )
                 residues[resid] = [x, y, z]
@@ -54,12 +78,45 @@ def read_c_alpha_pdb(filename):
             break
 
     residues_list = list()
-    for i in sorted(residues.keys()):
+    for i in _sorted_residues(residues):
         residues_list.append(residues[i])
 
     return np.array(residues_list)
 
 
+def read_sequence_pdb(filename):
+    """
+    Reads residue names of a .pdb file in the order of `read_c_alpha_pdb`
+
+    Parameters
+    ----------
+    filename: string
+        Path to file to be read
+
+    Returns
+    -------
+    list(string)
+        List of length `N` of 3 letter residue codes (such as "GLY") of
+        residues with C_alpha atoms
+    """
+
+    with open(filename, encoding="utf-8") as f:
+        contents = f.read()
+
+    lines = contents.splitlines()
+
+    residues = dict()
+    for line in lines:
+        if line[0:4] == "ATOM":
+            if line[12:16] == " CA ":
+                resid = _residue_key(line)
+                residues[resid] = line[17:20].strip()
+        elif line[0:3] == "END":
+            break
+
+    return [residues[i] for i in _sorted_residues(residues)]
+
+
 def residue_coe(residue_dict):
     """
     Determines centre of electrons of a residue described by `residue_dict`
@@ -116,7 +173,7 @@ def read_backbone_and_coe_pdb(filename):
     
     for line in lines:
         if line[0:4] == "ATOM":
-            resid = int(line[22:26])
+            resid = _residue_key(line)
             atomid = int(line[6:11])
             atomrole = line[12:16] # for example "CA "
             elementid = line[76:78]  # two letter code, right justified
@@ -127,7 +184,7 @@ def read_backbone_and_coe_pdb(filename):
             if ' CA ' == atomrole:
                 if resid in ca_atoms:
                     print(
-                        f"Warning: multiple locations for residue {resid}",
+                        f"Warning: multiple locations for residue {_format_residue(resid)}",
                         file=sys.stderr,
                     )
                 ca_atoms[resid] = [x, y, z]
@@ -154,11 +211,11 @@ def read_backbone_and_coe_pdb(filename):
             break
 
     bb_residues_list = list()
-    for i in sorted(ca_atoms.keys()):
+    for i in _sorted_residues(ca_atoms):
         bb_residues_list.append(residue_coe(backbone_atoms[i]))
         
     coe_residues_list = list()
-    for i in sorted(ca_atoms.keys()):
+    for i in _sorted_residues(ca_atoms):
         if len(sidechain_atoms[i]) != 0: #all but glycine        
             coe_residues_list.append(residue_coe(sidechain_atoms[i]))
         else:
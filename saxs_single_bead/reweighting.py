@@ -0,0 +1,362 @@
+# reweighting.py
+# fitting conformer weights of ensembles to experimental scattering curves
+
+import collections
+import warnings
+import numpy as np
+import saxs_single_bead.bead_model
+import saxs_single_bead.scattering_curve
+
+_methods = ("nnls", "maxent")
+
+ReweightingResult = collections.namedtuple(
+    "ReweightingResult",
+    ["weights", "scale", "background", "chi2", "effective_size", "curve"],
+)
+ReweightingResult.__doc__ = """
+Result of a reweighting fit.
+
+Attributes
+----------
+weights: np.array(float)
+    Vector of length `M` of conformer weights summing to one.
+scale: float
+    Fitted scale factor.
+background: float
+    Fitted constant background, `0.0` if no background was fitted.
+chi2: float
+    Reduced chi squared, `mean(((curve - I) / sigma) ** 2)`.
+effective_size: float
+    Kish effective ensemble size `1 / sum(weights ** 2)`.
+curve: np.array(float)
+    Reweighted curve `scale * weights @ intensities + background` at experimental `q` values.
+"""
+
+
+def _nnls(matrix, target, max_iterations=None):
+    """
+    Solves `min |matrix @ x - target|` subject to `x >= 0` with the active set method of Lawson and Hanson.
+
+    Columns are normalized first, the number of passive (positive) variables never exceeds
+    the number of rows, so each step solves a small least squares problem.
+    """
+    n_rows, n_columns = matrix.shape
+    norms = np.sqrt(np.sum(matrix**2, axis=0))
+    norms[norms == 0.0] = 1.0
+    matrix = matrix / norms
+    if max_iterations is None:
+        max_iterations = 3 * n_columns
+
+    solution = np.zeros(n_columns)
+    passive = np.zeros(n_columns, dtype=bool)
+    tolerance = 10.0 * np.finfo(float).eps * max(n_rows, n_columns)
+    tolerance *= np.max(np.sum(np.abs(matrix), axis=0)) * np.max(np.abs(target))
+
+    gradient = matrix.T @ target
+    for _ in range(max_iterations):
+        candidates = np.where(passive, -np.inf, gradient)
+        entering = np.argmax(candidates)
+        if candidates[entering] <= tolerance:
+            break
+        passive[entering] = True
+
+        while True:
+            indices = np.nonzero(passive)[0]
+            trial = np.linalg.lstsq(matrix[:, indices], target, rcond=None)[0]
+            if np.all(trial > 0.0):
+                solution[:] = 0.0
+                solution[indices] = trial
+                break
+
+            # step back to the boundary and release variables reaching zero
+            current = solution[indices]
+            blocking = trial <= 0.0
+            step = np.min(current[blocking] / (current[blocking] - trial[blocking]))
+            solution[indices] = current + step * (trial - current)
+            released = indices[solution[indices] <= tolerance]
+            solution[released] = 0.0
+            passive[released] = False
+            if not np.any(passive):
+                break
+
+        gradient = matrix.T @ (target - matrix @ solution)
+
+    return solution / norms
+
+
+def _maxent(matrix, target, unit, prior, theta, background, max_iterations):
+    """
+    Bayesian/maximum entropy reweighting with scale `s` and background `b` fitted jointly.
+
+    Weights `w ~ prior * exp(-s * matrix @ l)` are parametrized by multipliers `l` of the dual problem,
+    at the optimum `theta * l` equals the residual `s * w @ matrix + b * unit - target` and the residual
+    is orthogonal to `w @ matrix` and `unit` (optimal scale and background). The `Q + 2` equations are
+    solved with Newton steps and backtracking on their squared norm. `matrix` (`M` by `Q`), `target`
+    and `unit` are divided by `sigma`.
+
+    Curves are multiplied by the initial scale, so that the equations of scale and background are measured
+    in units of the residual. Otherwise they dominate the squared norm for curves far from the experimental
+    units and most Newton steps are cut short by backtracking.
+    """
+    n_q = len(target)
+    size = n_q + (2 if background else 1)
+    # start from prior weights with least squares scale and background
+    columns = [prior @ matrix, unit] if background else [prior @ matrix]
+    coefficients = np.linalg.lstsq(np.transpose(columns), target, rcond=None)[0]
+    offset = coefficients[1] if background else 0.0
+    unit_scale = coefficients[0] if coefficients[0] != 0.0 else 1.0
+    matrix = unit_scale * matrix
+    scale = 1.0 if coefficients[0] != 0.0 else 0.0
+    # centering at the prior average keeps the covariance formula below accurate
+    prior_average = prior @ matrix
+    centred = matrix - prior_average
+    multipliers = np.zeros(n_q)
+
+    def equations(multipliers, scale, offset):
+        exponents = -scale * (centred @ multipliers)
+        weights = prior * np.exp(exponents - np.max(exponents))
+        weights /= np.sum(weights)
+        average = weights @ matrix
+        values = [
+            theta * multipliers - (scale * average + offset * unit - target),
+            [average @ multipliers],
+        ]
+        if background:
+            values.append([unit @ multipliers])
+        return (np.concatenate(values), weights, average)
+
+    tolerance = 1e-10 * max(1.0, np.max(np.abs(target)))
+    values, weights, average = equations(multipliers, scale, offset)
+    length = 1.0
+    for _ in range(max_iterations):
+        if np.max(np.abs(values)) < tolerance:
+            break
+        # conformers with negligible weights do not change the covariance
+        significant = weights > 1e-16 * np.max(weights)
+        deviation = average - prior_average
+        weighted = centred[significant] * np.sqrt(weights[significant, np.newaxis])
+        covariance = weighted.T @ weighted - np.outer(deviation, deviation)
+        projected = covariance @ multipliers
+
+        jacobian = np.zeros((size, size))
+        jacobian[:n_q, :n_q] = scale**2 * covariance + theta * np.eye(n_q)
+        jacobian[:n_q, n_q] = scale * projected - average
+        jacobian[n_q, :n_q] = average - scale * projected
+        jacobian[n_q, n_q] = -(multipliers @ projected)
+        if background:
+            jacobian[:n_q, n_q + 1] = -unit
+            jacobian[n_q + 1, :n_q] = unit
+        step = np.linalg.lstsq(jacobian, -values, rcond=None)[0]
+
+        # steps far from the solution are damped similarly in consecutive iterations
+        length = min(1.0, 2.0 * length)
+        while True:
+            trial = (
+                multipliers + length * step[:n_q],
+                scale + length * step[n_q],
+                offset + length * step[n_q + 1] if background else 0.0,
+            )
+            trial_values, trial_weights, trial_average = equations(*trial)
+            if (
+                trial_values @ trial_values <= (1.0 - 1e-4 * length) * (values @ values)
+                or length < 1e-10
+            ):
+                break
+            length *= 0.5
+        multipliers, scale, offset = trial
+        values, weights, average = (trial_values, trial_weights, trial_average)
+
+    if not np.max(np.abs(values)) < tolerance:
+        warnings.warn(
+            f"Maximum entropy reweighting did not converge in {max_iterations} Newton steps, "
+            "increase `max_iterations` or `theta`",
+            RuntimeWarning,
+        )
+    return (weights, unit_scale * scale, offset)
+
+
+def reweight(
+    intensities,
+    experiment_intensities,
+    sigma,
+    method="nnls",
+    background=True,
+    theta=1.0,
+    prior=None,
+    max_iterations=100,
+):
+    """
+    Fits conformer weights, scale and background to an experimental scattering curve.
+
+    With `method="nnls"` the curve `sum_m c_m I_m(q) + b` is fitted with non negative `c_m`,
+    `scale = sum_m c_m` and `weights = c / scale`, solutions are sparse.
+    With `method="maxent"` weights maximize `theta * S - chi2 / 2`, where `S` is the relative entropy
+    with respect to `prior` (Bayesian/maximum entropy reweighting), larger `theta` keeps weights closer to `prior`.
+    Scale and background are fitted together with the weights. Each Newton step of `"maxent"` costs
+    about `M * Q ** 2` operations and smaller `theta` needs more steps, on one core 10000 conformers
+    by 100 `q` values take about 0.05 s for `theta=10`, 0.1 s for `theta=1`, 0.25 s for `theta=0.1`
+    and 0.75 s for `theta=0.01`, compared to 0.03 s of `"nnls"`.
+
+    Parameters
+    ----------
+    intensities: np.array(float)
+        Array with shape `M` by `Q` of `I(q)` of each conformer at experimental `q` values,
+        for example from `scattering_curve_ensemble(..., per_conformer=True)`.
+    experiment_intensities: np.array(float)
+        Vector of length `Q` of measured `I(q)`.
+    sigma: np.array(float)
+        Vector of length `Q` of measurement errors.
+    method: string, optional
+        `"nnls"` or `"maxent"`, default `"nnls"`
+    background: bool, optional
+        Fit constant background, default `True`
+    theta: float, optional
+        Weight of the entropy term of `"maxent"`, default `1.0`
+    prior: np.array(float), optional
+        Vector of length `M` of prior weights of `"maxent"`, default uniform.
+    max_iterations: int, optional
+        Largest number of Newton steps of `"maxent"`, a `RuntimeWarning` is issued if the last iterate
+        does not solve the optimality conditions, default `100`
+
+    Returns
+    -------
+    ReweightingResult
+        Named tuple of `weights`, `scale`, `background`, `chi2`, `effective_size` and `curve`.
+    """
+    if method not in _methods:
+        raise ValueError(
+            f"{method} is not a valid method. One of {', '.join(_methods)} is allowed."
+        )
+    intensities = np.asarray(intensities, dtype=float)
+    experiment_intensities = np.asarray(experiment_intensities, dtype=float)
+    sigma = np.asarray(sigma, dtype=float)
+    if intensities.ndim != 2 or intensities.shape[1] != len(experiment_intensities):
+        raise ValueError(
+            f"Intensities of shape (M, {len(experiment_intensities)}) expected, got array of shape {intensities.shape}"
+        )
+    if sigma.shape != experiment_intensities.shape or np.any(sigma <= 0.0):
+        raise ValueError(
+            "`sigma` has to be positive and match experimental intensities"
+        )
+
+    target = experiment_intensities / sigma
+    if method == "nnls":
+        columns = [intensities.T / sigma[:, np.newaxis]]
+        if background:
+            columns.append(np.transpose([1.0 / sigma, -1.0 / sigma]))
+        coefficients = _nnls(np.hstack(columns), target)
+        n_conformers = len(intensities)
+        scale = np.sum(coefficients[:n_conformers])
+        if scale <= 0.0:
+            raise ValueError("No conformer with a positive contribution was found")
+        weights = coefficients[:n_conformers] / scale
+        offset = (
+            coefficients[n_conformers] - coefficients[n_conformers + 1]
+            if background
+            else 0.0
+        )
+    else:
+        if prior is None:
+            prior = np.full(len(intensities), 1.0 / len(intensities))
+        prior = np.asarray(prior, dtype=float) / np.sum(prior)
+        weights, scale, offset = _maxent(
+            intensities / sigma,
+            target,
+            1.0 / sigma,
+            prior,
+            theta,
+            background,
+            max_iterations,
+        )
+
+    curve = scale * (weights @ intensities) + offset
+    return ReweightingResult(
+        weights=weights,
+        scale=scale,
+        background=offset,
+        chi2=np.mean(((curve - experiment_intensities) / sigma) ** 2),
+        effective_size=1.0 / np.sum(weights**2),
+        curve=curve,
+    )
+
+
+def reweight_ensemble(
+    residue_codes,
+    residue_locations,
+    experiment,
+    model=1,
+    method="nnls",
+    background=True,
+    theta=1.0,
+    prior=None,
+    block_size=None,
+    max_memory=None,
+    n_workers=None,
+    executor=None,
+    dtype=np.float64,
+):
+    """
+    Computes curves of all conformers at experimental `q` values once and fits conformer weights with `reweight`.
+
+    Parameters
+    ----------
+    residue_codes: list(string)
+        List of residues of length `N`. Can be 3 letter codes (such as "GLY") or single letter codes (such as "G") or "BB"
+        for two bead backbone locations (blend model only).
+    residue_locations: np.array(float)
+        Array with shape `M` by `N` by `3` (`M` by `N` by `2` by `3` for the two bead model) of locations of conformers.
+    experiment: np.array(float)
+        Array with shape `3` by `Q` of `q` values, measured `I(q)` and its errors, units: Angstrom^(-1)
+    model: int or list(int), optional
+        `1` for single bead, `2` for two bead or a list of length `N` with model type of each residue, default `1`.
+    method: string, optional
+        `"nnls"` or `"maxent"`, default `"nnls"`
+    background: bool, optional
+        Fit constant background, default `True`
+    theta: float, optional
+        Weight of the entropy term of `"maxent"`, default `1.0`
+    prior: np.array(float), optional
+        Vector of length `M` of prior weights of `"maxent"`, default uniform.
+    block_size: int, optional
+        Number of beads per block of pairs processed at once, by default chosen from `max_memory`
+    max_memory: int, optional
+        Bound on memory used by temporary arrays, default `2 ** 30`, units: bytes
+    n_workers: int, optional
+        Number of worker processes sharing conformers, by default conformers are processed serially
+    executor: concurrent.futures.Executor, optional
+        Executor used instead of a new process pool of `n_workers` processes
+    dtype: np.dtype, optional
+        Precision of distances and sinc evaluations, `np.float32` or `np.float64`, default `np.float64`
+
+    Returns
+    -------
+    (np.array(float),ReweightingResult)
+        Array with shape `M` by `Q` of `I(q)` of each conformer and the result of `reweight`.
+    """
+    q_values, experiment_intensities, sigma = np.asarray(experiment, dtype=float)
+    _, intensities = saxs_single_bead.scattering_curve._ensemble_curves(
+        saxs_single_bead.bead_model.BeadModel(residue_codes, model),
+        residue_locations,
+        saxs_single_bead.scattering_curve._q_grid(None, None, None, q_values),
+        "debye",
+        None,
+        None,
+        block_size,
+        max_memory,
+        n_workers,
+        executor,
+        dtype,
+        per_conformer=True,
+    )
+    return (
+        intensities,
+        reweight(
+            intensities,
+            experiment_intensities,
+            sigma,
+            method=method,
+            background=background,
+            theta=theta,
+            prior=prior,
+        ),
+    )
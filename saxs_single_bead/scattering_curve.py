@@ -1,9 +1,209 @@
-import saxs_single_bead.form_factors
+import os
+import saxs_single_bead.distance_histogram
+import saxs_single_bead.bead_model
+import saxs_single_bead.ensemble
+import saxs_single_bead.multipole
+import saxs_single_bead.moments
 import numpy as np
 
 
+def _q_grid(minimal_q, maximal_q, points, q_values=None):
+    """
+    Returns `q` values to evaluate and layout of requested grids for `_arrange_curves`.
+
+    Explicit `q_values` (one array or a list of arrays for several datasets) are merged into
+    one sorted array of unique values so that all geometry work is shared.
+    """
+    if q_values is None:
+        return (np.linspace(minimal_q, maximal_q, points), None)
+
+    several = (
+        isinstance(q_values, (list, tuple))
+        and len(q_values) > 0
+        and np.ndim(q_values[0]) > 0
+    )
+    grids = [
+        np.asarray(grid, dtype=float) for grid in (q_values if several else [q_values])
+    ]
+    unique, inverse = np.unique(np.concatenate(grids), return_inverse=True)
+    return (unique, (several, grids, inverse.ravel()))
+
+
+def _arrange_curves(layout, q_values, *curves):
+    """
+    Returns `(q_values, *curves)` on requested grids, a list of such tuples for several datasets.
+    """
+    if layout is None:
+        return (q_values,) + curves
+
+    several, grids, inverse = layout
+    arranged = list()
+    start = 0
+    for grid in grids:
+        indices = inverse[start : start + len(grid)]
+        arranged.append((grid,) + tuple(curve[..., indices] for curve in curves))
+        start += len(grid)
+
+    if several:
+        return arranged
+    return arranged[0]
+
+
+_engines = ("debye", "histogram", "multipole", "moments")
+
+
+def _check_engine(engine):
+    if engine not in _engines:
+        raise ValueError(
+            f"{engine} is not a valid engine. One of {', '.join(_engines)} is allowed."
+        )
+
+
+def _engine_curve(
+    engine,
+    beads,
+    locations,
+    q_values,
+    bin_width,
+    accuracy,
+    block_size=None,
+    max_memory=None,
+    dtype=np.float64,
+    backend="numpy",
+):
+    """
+    Evaluates `I(q)` averaged over all conformers of bead `locations` with an engine other than `"debye"`.
+    Settings of the Debye kernel are used by `"moments"` at large `q`.
+    """
+    _check_engine(engine)
+    if engine == "histogram":
+        return saxs_single_bead.distance_histogram.histogram_intensity(
+            beads.type_indices,
+            locations,
+            q_values,
+            bin_width=bin_width,
+        )
+    elif engine == "multipole":
+        return saxs_single_bead.multipole.multipole_intensity(
+            locations,
+            beads.form_factor_matrix(q_values),
+            q_values,
+            accuracy=accuracy,
+        )
+    elif engine == "moments":
+        return saxs_single_bead.moments.moment_intensity(
+            locations,
+            beads.form_factor_matrix(q_values),
+            q_values,
+            accuracy=accuracy,
+            block_size=block_size,
+            max_memory=max_memory,
+            dtype=dtype,
+            backend=backend,
+        )
+
+
+def _conformer_output(out, shape):
+    """
+    Returns array receiving `I(q)` of each conformer, `out` can be an array or a path of a `.npy` file.
+    """
+    if out is None:
+        return np.empty(shape)
+    if isinstance(out, (str, os.PathLike)):
+        return np.lib.format.open_memmap(out, mode="w+", dtype=np.float64, shape=shape)
+    if out.shape != shape:
+        raise ValueError(
+            f"`out` of shape {shape} expected, got array of shape {out.shape}"
+        )
+    return out
+
+
+def _ensemble_curves(
+    beads,
+    residue_locations,
+    q_grid,
+    engine,
+    bin_width,
+    accuracy,
+    block_size,
+    max_memory,
+    n_workers,
+    executor,
+    dtype,
+    per_conformer=False,
+    out=None,
+    backend="numpy",
+):
+    """
+    Evaluates average or per conformer `I(q)` of an ensemble of `bead_model.BeadModel` `beads`
+    on `q_grid` returned by `_q_grid`. All public functions share this core, single structures
+    are ensembles of one conformer.
+    """
+    q_values, q_layout = q_grid
+    if out is not None and not per_conformer:
+        raise ValueError("`out` is only used with `per_conformer=True`")
+
+    if per_conformer:
+        if q_layout is not None:
+            if q_layout[0]:
+                if out is not None:
+                    raise ValueError("`out` requires a single grid of `q` values")
+            else:
+                # one grid is evaluated as requested, so rows of `out` match it
+                q_values, q_layout = (q_layout[1][0], None)
+        residue_locations = np.asarray(residue_locations, dtype=float)
+        out = _conformer_output(out, (len(residue_locations), len(q_values)))
+
+    if engine != "debye":
+        locations = beads.locations(residue_locations)
+        settings = (bin_width, accuracy, block_size, max_memory, dtype, backend)
+        if not per_conformer:
+            return _arrange_curves(
+                q_layout,
+                q_values,
+                _engine_curve(engine, beads, locations, q_values, *settings),
+            )
+        for m, conformer in enumerate(locations):
+            out[m] = _engine_curve(engine, beads, conformer, q_values, *settings)
+        return _arrange_curves(q_layout, q_values, out)
+
+    accumulator = saxs_single_bead.ensemble.EnsembleAccumulator(
+        beads,
+        q_values,
+        block_size=block_size,
+        max_memory=max_memory,
+        dtype=dtype,
+        backend=backend,
+    )
+    if per_conformer:
+        accumulator.add_per_conformer(
+            residue_locations, out, n_workers=n_workers, executor=executor
+        )
+        return _arrange_curves(q_layout, q_values, out)
+
+    if n_workers is None and executor is None:
+        accumulator.add(residue_locations)
+    else:
+        accumulator.add_parallel(
+            residue_locations, n_workers=n_workers, executor=executor
+        )
+    return _arrange_curves(q_layout, *accumulator.result())
+
+
 def scattering_curve(
-    residue_codes, residue_locations, minimal_q=0.0, maximal_q=0.5, points=20
+    residue_codes,
+    residue_locations,
+    minimal_q=0.0,
+    maximal_q=0.5,
+    points=20,
+    q_values=None,
+    engine="debye",
+    bin_width=0.1,
+    accuracy=1e-6,
+    block_size=None,
+    max_memory=None,
+    dtype=np.float64,
+    backend="numpy",
 ):
     """
     Computes scattering curve from `residue_codes` and `residue_locations` `N` by `3` array.
@@ -21,42 +221,71 @@ def scattering_curve(
         Maximal scattering vector, default `0.5`, units: Angstrom^(-1)
     points: int, optional
         Number of points int the plot, default `20.`
+    q_values: np.array(float) or list(np.array(float)), optional
+        Values of `q` to evaluate instead of `points` equally spaced values from `minimal_q` to `maximal_q`.
+        A list of arrays (for example grids of several experimental datasets) is evaluated in one pass,
+        units: Angstrom^(-1)
+    engine: string, optional
+        `"debye"` for the exact Debye sum, `"histogram"` for pair distance histograms, `"multipole"`
+        for spherical harmonic expansion or `"moments"` for the low `q` series handing over to the Debye sum,
+        default `"debye"`
+    bin_width: float, optional
+        Width of distance bins of the `"histogram"` engine, default `0.1`, units: Angstrom
+    accuracy: float, optional
+        Bound on truncation error of the `"multipole"` and `"moments"` engines relative to `(sum_j |f_j(q)|) ** 2`,
+        default `1e-6`
+    block_size: int, optional
+        Number of beads per block of pairs processed at once by the `"debye"` and `"moments"` engines, by default chosen from `max_memory`
+    max_memory: int, optional
+        Bound on memory used by temporary arrays of the `"debye"` and `"moments"` engines, default `2 ** 30`, units: bytes
+    dtype: np.dtype, optional
+        Precision of distances and sinc evaluations of the `"debye"` and `"moments"` engines, `np.float32` or `np.float64`,
+        sums over pairs are always accumulated in `np.float64`, default `np.float64`
+    backend: string, optional
+        Kernel of the `"debye"` and `"moments"` engines, `"numpy"` for elementwise sums over blocks of pairs, `"blas"` for matrix
+        products of sinc kernels and form factors or `"numba"` for a compiled loop over pairs without temporaries,
+        parallelized across cores (falls back to `"numpy"` with a warning if numba is not installed), default `"numpy"`
 
     Returns
     -------
     (np.array(float),np.array(float))
-        A tuple of numpy arrays containing values of `q` and `I(q)` respectively.
+        A tuple of numpy arrays containing values of `q` and `I(q)` respectively,
+        a list of such tuples if `q_values` is a list of arrays.
     """
-    distance_matrix = np.sqrt(
-        np.sum(
-            (residue_locations[np.newaxis, :, :] - residue_locations[:, np.newaxis, :])
-            ** 2,
-            axis=-1,
-        )
+    return _ensemble_curves(
+        saxs_single_bead.bead_model.BeadModel(residue_codes, 1),
+        np.asarray(residue_locations, dtype=float)[np.newaxis],
+        _q_grid(minimal_q, maximal_q, points, q_values),
+        engine,
+        bin_width,
+        accuracy,
+        block_size,
+        max_memory,
+        None,
+        None,
+        dtype,
+        backend=backend,
     )
 
-    q_values = np.linspace(minimal_q, maximal_q, points)
-    I_values = np.zeros_like(q_values)
-
-    for i, q in enumerate(q_values):
-        form_factors = np.array(
-            [
-                saxs_single_bead.form_factors.form_factor(code, q)
-                for code in residue_codes
-            ]
-        )
-        I_values[i] = np.sum(
-            form_factors[:, np.newaxis]
-            * form_factors[np.newaxis, :]
-            * np.sinc(distance_matrix * q / np.pi),
-            axis=(0, 1),
-        )
-
-    return (q_values, I_values)
-
 
 def scattering_curve_ensemble(
-    residue_codes, residue_locations, minimal_q=0.0, maximal_q=0.5, points=20
+    residue_codes,
+    residue_locations,
+    minimal_q=0.0,
+    maximal_q=0.5,
+    points=20,
+    q_values=None,
+    engine="debye",
+    bin_width=0.1,
+    accuracy=1e-6,
+    block_size=None,
+    max_memory=None,
+    n_workers=None,
+    executor=None,
+    dtype=np.float64,
+    per_conformer=False,
+    out=None,
+    backend="numpy",
 ):
     """
     Computes average scattering curve from `residue_codes` and `residue_locations` `M` by `N` by `3` array.
@@ -74,46 +303,78 @@ def scattering_curve_ensemble(
         Maximal scattering vector, default `0.5`, units: Angstrom^(-1)
     points: int, optional
         Number of points int the plot, default `20.`
+    q_values: np.array(float) or list(np.array(float)), optional
+        Values of `q` to evaluate instead of `points` equally spaced values from `minimal_q` to `maximal_q`.
+        A list of arrays (for example grids of several experimental datasets) is evaluated in one pass,
+        units: Angstrom^(-1)
+    engine: string, optional
+        `"debye"` for the exact Debye sum, `"histogram"` for pair distance histograms, `"multipole"`
+        for spherical harmonic expansion or `"moments"` for the low `q` series handing over to the Debye sum,
+        default `"debye"`
+    bin_width: float, optional
+        Width of distance bins of the `"histogram"` engine, default `0.1`, units: Angstrom
+    accuracy: float, optional
+        Bound on truncation error of the `"multipole"` and `"moments"` engines relative to `(sum_j |f_j(q)|) ** 2`,
+        default `1e-6`
+    block_size: int, optional
+        Number of beads per block of pairs processed at once by the `"debye"` and `"moments"` engines, by default chosen from `max_memory`
+    max_memory: int, optional
+        Bound on memory used by temporary arrays of the `"debye"` and `"moments"` engines, default `2 ** 30`, units: bytes
+    n_workers: int, optional
+        Number of worker processes sharing conformers, by default conformers are processed serially
+    executor: concurrent.futures.Executor, optional
+        Executor used instead of a new process pool of `n_workers` processes
+    dtype: np.dtype, optional
+        Precision of distances and sinc evaluations of the `"debye"` and `"moments"` engines, `np.float32` or `np.float64`,
+        sums over pairs are always accumulated in `np.float64`, default `np.float64`
+    per_conformer: bool, optional
+        Return `I(q)` of each conformer instead of the average, default `False`
+    out: np.array(float) or string, optional
+        Array with shape `M` by `Q` or path of a `.npy` file (created as a memory mapped array) receiving `I(q)`
+        of each conformer as it is computed, only with `per_conformer=True` and a single grid of `q` values.
+    backend: string, optional
+        Kernel of the `"debye"` and `"moments"` engines, `"numpy"` for elementwise sums over blocks of pairs, `"blas"` for matrix
+        products of sinc kernels and form factors or `"numba"` for a compiled loop over pairs without temporaries,
+        parallelized across cores (falls back to `"numpy"` with a warning if numba is not installed), default `"numpy"`
 
     Returns
     -------
     (np.array(float),np.array(float))
-        A tuple of numpy arrays containing values of `q` and `I(q)` respectively.
+        A tuple of numpy arrays containing values of `q` and `I(q)` respectively (`M` by `Q` array with
+        `per_conformer=True`), a list of such tuples if `q_values` is a list of arrays.
     """
-    distance_matrices = np.sqrt(
-        np.sum(
-            (
-                residue_locations[:, np.newaxis, :, :]
-                - residue_locations[:, :, np.newaxis, :]
-            )
-            ** 2,
-            axis=-1,
-        )
+    return _ensemble_curves(
+        saxs_single_bead.bead_model.BeadModel(residue_codes, 1),
+        residue_locations,
+        _q_grid(minimal_q, maximal_q, points, q_values),
+        engine,
+        bin_width,
+        accuracy,
+        block_size,
+        max_memory,
+        n_workers,
+        executor,
+        dtype,
+        per_conformer,
+        out,
+        backend=backend,
     )
 
-    q_values = np.linspace(minimal_q, maximal_q, points)
-    I_values = np.zeros_like(q_values)
-
-    for i, q in enumerate(q_values):
-        form_factors = np.array(
-            [
-                saxs_single_bead.form_factors.form_factor(code, q)
-                for code in residue_codes
-            ]
-        )
-
-        I_values[i] = np.sum(
-            form_factors[:, np.newaxis]
-            * form_factors[np.newaxis, :]
-            * np.mean(np.sinc(distance_matrices * q / np.pi), axis=0),
-            axis=(0, 1),
-        )
-
-    return (q_values, I_values)
-
 
 def scattering_curve_two_bead(
-    residue_codes, residue_locations, minimal_q=0.0, maximal_q=0.5, points=20
+    residue_codes,
+    residue_locations,
+    minimal_q=0.0,
+    maximal_q=0.5,
+    points=20,
+    q_values=None,
+    engine="debye",
+    bin_width=0.1,
+    accuracy=1e-6,
+    block_size=None,
+    max_memory=None,
+    dtype=np.float64,
+    backend="numpy",
 ):
     """
     Computes scattering curve from `residue_codes` and `residue_locations` `N` by `2` by `3` array.
@@ -131,48 +392,71 @@ def scattering_curve_two_bead(
         Maximal scattering vector, default `0.5`, units: Angstrom^(-1)
     points: int, optional
         Number of points int the plot, default `20.`
+    q_values: np.array(float) or list(np.array(float)), optional
+        Values of `q` to evaluate instead of `points` equally spaced values from `minimal_q` to `maximal_q`.
+        A list of arrays (for example grids of several experimental datasets) is evaluated in one pass,
+        units: Angstrom^(-1)
+    engine: string, optional
+        `"debye"` for the exact Debye sum, `"histogram"` for pair distance histograms, `"multipole"`
+        for spherical harmonic expansion or `"moments"` for the low `q` series handing over to the Debye sum,
+        default `"debye"`
+    bin_width: float, optional
+        Width of distance bins of the `"histogram"` engine, default `0.1`, units: Angstrom
+    accuracy: float, optional
+        Bound on truncation error of the `"multipole"` and `"moments"` engines relative to `(sum_j |f_j(q)|) ** 2`,
+        default `1e-6`
+    block_size: int, optional
+        Number of beads per block of pairs processed at once by the `"debye"` and `"moments"` engines, by default chosen from `max_memory`
+    max_memory: int, optional
+        Bound on memory used by temporary arrays of the `"debye"` and `"moments"` engines, default `2 ** 30`, units: bytes
+    dtype: np.dtype, optional
+        Precision of distances and sinc evaluations of the `"debye"` and `"moments"` engines, `np.float32` or `np.float64`,
+        sums over pairs are always accumulated in `np.float64`, default `np.float64`
+    backend: string, optional
+        Kernel of the `"debye"` and `"moments"` engines, `"numpy"` for elementwise sums over blocks of pairs, `"blas"` for matrix
+        products of sinc kernels and form factors or `"numba"` for a compiled loop over pairs without temporaries,
+        parallelized across cores (falls back to `"numpy"` with a warning if numba is not installed), default `"numpy"`
 
     Returns
     -------
     (np.array(float),np.array(float))
-        A tuple of numpy arrays containing values of `q` and `I(q)` respectively.
+        A tuple of numpy arrays containing values of `q` and `I(q)` respectively,
+        a list of such tuples if `q_values` is a list of arrays.
     """
-
-    residue_codes = (["BB"] * len(residue_codes)) + residue_codes
-    residue_locations = np.vstack(
-        [residue_locations[:, 0], residue_locations[:, 1]]
-    )  # combine bead lists to one long list
-
-    distance_matrix = np.sqrt(
-        np.sum(
-            (residue_locations[np.newaxis, :, :] - residue_locations[:, np.newaxis, :])
-            ** 2,
-            axis=-1,
-        )
+    return _ensemble_curves(
+        saxs_single_bead.bead_model.BeadModel(residue_codes, 2),
+        np.asarray(residue_locations, dtype=float)[np.newaxis],
+        _q_grid(minimal_q, maximal_q, points, q_values),
+        engine,
+        bin_width,
+        accuracy,
+        block_size,
+        max_memory,
+        None,
+        None,
+        dtype,
+        backend=backend,
     )
 
-    q_values = np.linspace(minimal_q, maximal_q, points)
-    I_values = np.zeros_like(q_values)
-
-    for i, q in enumerate(q_values):
-        form_factors = np.array(
-            [
-                saxs_single_bead.form_factors.form_factor_two_bead(code, q)
-                for code in residue_codes
-            ]
-        )
-        I_values[i] = np.sum(
-            form_factors[:, np.newaxis]
-            * form_factors[np.newaxis, :]
-            * np.sinc(distance_matrix * q / np.pi),
-            axis=(0, 1),
-        )
-
-    return (q_values, I_values)
-
 
 def scattering_curve_two_bead_ensemble(
-    residue_codes, residue_locations, minimal_q=0.0, maximal_q=0.5, points=20
+    residue_codes,
+    residue_locations,
+    minimal_q=0.0,
+    maximal_q=0.5,
+    points=20,
+    q_values=None,
+    engine="debye",
+    bin_width=0.1,
+    accuracy=1e-6,
+    block_size=None,
+    max_memory=None,
+    n_workers=None,
+    executor=None,
+    dtype=np.float64,
+    per_conformer=False,
+    out=None,
+    backend="numpy",
 ):
     """
     Computes average scattering curve from `residue_codes` and `residue_locations` `M` by `N` by `2` by `3` array.
@@ -190,62 +474,63 @@ def scattering_curve_two_bead_ensemble(
         Maximal scattering vector, default `0.5`, units: Angstrom^(-1)
     points: int, optional
         Number of points int the plot, default `20.`
+    q_values: np.array(float) or list(np.array(float)), optional
+        Values of `q` to evaluate instead of `points` equally spaced values from `minimal_q` to `maximal_q`.
+        A list of arrays (for example grids of several experimental datasets) is evaluated in one pass,
+        units: Angstrom^(-1)
+    engine: string, optional
+        `"debye"` for the exact Debye sum, `"histogram"` for pair distance histograms, `"multipole"`
+        for spherical harmonic expansion or `"moments"` for the low `q` series handing over to the Debye sum,
+        default `"debye"`
+    bin_width: float, optional
+        Width of distance bins of the `"histogram"` engine, default `0.1`, units: Angstrom
+    accuracy: float, optional
+        Bound on truncation error of the `"multipole"` and `"moments"` engines relative to `(sum_j |f_j(q)|) ** 2`,
+        default `1e-6`
+    block_size: int, optional
+        Number of beads per block of pairs processed at once by the `"debye"` and `"moments"` engines, by default chosen from `max_memory`
+    max_memory: int, optional
+        Bound on memory used by temporary arrays of the `"debye"` and `"moments"` engines, default `2 ** 30`, units: bytes
+    n_workers: int, optional
+        Number of worker processes sharing conformers, by default conformers are processed serially
+    executor: concurrent.futures.Executor, optional
+        Executor used instead of a new process pool of `n_workers` processes
+    dtype: np.dtype, optional
+        Precision of distances and sinc evaluations of the `"debye"` and `"moments"` engines, `np.float32` or `np.float64`,
+        sums over pairs are always accumulated in `np.float64`, default `np.float64`
+    per_conformer: bool, optional
+        Return `I(q)` of each conformer instead of the average, default `False`
+    out: np.array(float) or string, optional
+        Array with shape `M` by `Q` or path of a `.npy` file (created as a memory mapped array) receiving `I(q)`
+        of each conformer as it is computed, only with `per_conformer=True` and a single grid of `q` values.
+    backend: string, optional
+        Kernel of the `"debye"` and `"moments"` engines, `"numpy"` for elementwise sums over blocks of pairs, `"blas"` for matrix
+        products of sinc kernels and form factors or `"numba"` for a compiled loop over pairs without temporaries,
+        parallelized across cores (falls back to `"numpy"` with a warning if numba is not installed), default `"numpy"`
 
     Returns
     -------
     (np.array(float),np.array(float))
-        A tuple of numpy arrays containing values of `q` and `I(q)` respectively.
+        A tuple of numpy arrays containing values of `q` and `I(q)` respectively (`M` by `Q` array with
+        `per_conformer=True`), a list of such tuples if `q_values` is a list of arrays.
     """
-
-    residue_codes = (["BB"] * len(residue_codes)) + residue_codes
-    (M, N, _, _) = residue_locations.shape
-
-    residue_locations = np.transpose(residue_locations, axes=(0, 2, 1, 3)).reshape(
-        M, 2 * N, 3
-    )  # combine bead lists to one long list
-
-    distance_matrices = np.sqrt(
-        np.sum(
-            (
-                residue_locations[:, np.newaxis, :, :]
-                - residue_locations[:, :, np.newaxis, :]
-            )
-            ** 2,
-            axis=-1,
-        )
+    return _ensemble_curves(
+        saxs_single_bead.bead_model.BeadModel(residue_codes, 2),
+        residue_locations,
+        _q_grid(minimal_q, maximal_q, points, q_values),
+        engine,
+        bin_width,
+        accuracy,
+        block_size,
+        max_memory,
+        n_workers,
+        executor,
+        dtype,
+        per_conformer,
+        out,
+        backend=backend,
     )
 
-    q_values = np.linspace(minimal_q, maximal_q, points)
-    I_values = np.zeros_like(q_values)
-
-    for i, q in enumerate(q_values):
-        form_factors = np.array(
-            [
-                saxs_single_bead.form_factors.form_factor_two_bead(code, q)
-                for code in residue_codes
-            ]
-        )
-
-        I_values[i] = np.sum(
-            form_factors[:, np.newaxis]
-            * form_factors[np.newaxis, :]
-            * np.mean(np.sinc(distance_matrices * q / np.pi), axis=0),
-            axis=(0, 1),
-        )
-
-    return (q_values, I_values)
-
-
-def _form_factor_one_two(code, q, model_type):
-    if model_type == 1:
-        return saxs_single_bead.form_factors.form_factor(code, q)
-    elif model_type == 2:
-        return saxs_single_bead.form_factors.form_factor_two_bead(code, q)
-    else:
-        raise ValueError(
-            f"{model_type} is not a valid model type. '1' or '2' are allowed."
-        )
-
 
 def scattering_curve_one_two_blend(
     residue_codes,
@@ -254,6 +539,14 @@ def scattering_curve_one_two_blend(
     minimal_q=0.0,
     maximal_q=0.5,
     points=20,
+    q_values=None,
+    engine="debye",
+    bin_width=0.1,
+    accuracy=1e-6,
+    block_size=None,
+    max_memory=None,
+    dtype=np.float64,
+    backend="numpy",
 ):
     """
     Computes scattering curve from `residue_codes` and `residue_locations` `N` by `2` by `3` array.
@@ -274,40 +567,52 @@ def scattering_curve_one_two_blend(
         Maximal scattering vector, default `0.5`, units: Angstrom^(-1)
     points: int, optional
         Number of points int the plot, default `20.`
+    q_values: np.array(float) or list(np.array(float)), optional
+        Values of `q` to evaluate instead of `points` equally spaced values from `minimal_q` to `maximal_q`.
+        A list of arrays (for example grids of several experimental datasets) is evaluated in one pass,
+        units: Angstrom^(-1)
+    engine: string, optional
+        `"debye"` for the exact Debye sum, `"histogram"` for pair distance histograms, `"multipole"`
+        for spherical harmonic expansion or `"moments"` for the low `q` series handing over to the Debye sum,
+        default `"debye"`
+    bin_width: float, optional
+        Width of distance bins of the `"histogram"` engine, default `0.1`, units: Angstrom
+    accuracy: float, optional
+        Bound on truncation error of the `"multipole"` and `"moments"` engines relative to `(sum_j |f_j(q)|) ** 2`,
+        default `1e-6`
+    block_size: int, optional
+        Number of beads per block of pairs processed at once by the `"debye"` and `"moments"` engines, by default chosen from `max_memory`
+    max_memory: int, optional
+        Bound on memory used by temporary arrays of the `"debye"` and `"moments"` engines, default `2 ** 30`, units: bytes
+    dtype: np.dtype, optional
+        Precision of distances and sinc evaluations of the `"debye"` and `"moments"` engines, `np.float32` or `np.float64`,
+        sums over pairs are always accumulated in `np.float64`, default `np.float64`
+    backend: string, optional
+        Kernel of the `"debye"` and `"moments"` engines, `"numpy"` for elementwise sums over blocks of pairs, `"blas"` for matrix
+        products of sinc kernels and form factors or `"numba"` for a compiled loop over pairs without temporaries,
+        parallelized across cores (falls back to `"numpy"` with a warning if numba is not installed), default `"numpy"`
 
     Returns
     -------
     (np.array(float),np.array(float))
-        A tuple of numpy arrays containing values of `q` and `I(q)` respectively.
+        A tuple of numpy arrays containing values of `q` and `I(q)` respectively,
+        a list of such tuples if `q_values` is a list of arrays.
     """
-
-    distance_matrix = np.sqrt(
-        np.sum(
-            (residue_locations[np.newaxis, :, :] - residue_locations[:, np.newaxis, :])
-            ** 2,
-            axis=-1,
-        )
+    return _ensemble_curves(
+        saxs_single_bead.bead_model.BeadModel(residue_codes, residue_model),
+        np.asarray(residue_locations, dtype=float)[np.newaxis],
+        _q_grid(minimal_q, maximal_q, points, q_values),
+        engine,
+        bin_width,
+        accuracy,
+        block_size,
+        max_memory,
+        None,
+        None,
+        dtype,
+        backend=backend,
     )
 
-    q_values = np.linspace(minimal_q, maximal_q, points)
-    I_values = np.zeros_like(q_values)
-
-    for i, q in enumerate(q_values):
-        form_factors = np.array(
-            [
-                _form_factor_one_two(code, q, model_type)
-                for (code, model_type) in zip(residue_codes, residue_model)
-            ]
-        )
-        I_values[i] = np.sum(
-            form_factors[:, np.newaxis]
-            * form_factors[np.newaxis, :]
-            * np.sinc(distance_matrix * q / np.pi),
-            axis=(0, 1),
-        )
-
-    return (q_values, I_values)
-
 
 def scattering_curve_one_two_blend_ensemble(
     residue_codes,
@@ -316,6 +621,18 @@ def scattering_curve_one_two_blend_ensemble(
     minimal_q=0.0,
     maximal_q=0.5,
     points=20,
+    q_values=None,
+    engine="debye",
+    bin_width=0.1,
+    accuracy=1e-6,
+    block_size=None,
+    max_memory=None,
+    n_workers=None,
+    executor=None,
+    dtype=np.float64,
+    per_conformer=False,
+    out=None,
+    backend="numpy",
 ):
     """
     Computes average scattering curve from `residue_codes` and `residue_locations` `M` by `N` by `2` by `3` array.
@@ -336,40 +653,195 @@ def scattering_curve_one_two_blend_ensemble(
         Maximal scattering vector, default `0.5`, units: Angstrom^(-1)
     points: int, optional
         Number of points int the plot, default `20.`
+    q_values: np.array(float) or list(np.array(float)), optional
+        Values of `q` to evaluate instead of `points` equally spaced values from `minimal_q` to `maximal_q`.
+        A list of arrays (for example grids of several experimental datasets) is evaluated in one pass,
+        units: Angstrom^(-1)
+    engine: string, optional
+        `"debye"` for the exact Debye sum, `"histogram"` for pair distance histograms, `"multipole"`
+        for spherical harmonic expansion or `"moments"` for the low `q` series handing over to the Debye sum,
+        default `"debye"`
+    bin_width: float, optional
+        Width of distance bins of the `"histogram"` engine, default `0.1`, units: Angstrom
+    accuracy: float, optional
+        Bound on truncation error of the `"multipole"` and `"moments"` engines relative to `(sum_j |f_j(q)|) ** 2`,
+        default `1e-6`
+    block_size: int, optional
+        Number of beads per block of pairs processed at once by the `"debye"` and `"moments"` engines, by default chosen from `max_memory`
+    max_memory: int, optional
+        Bound on memory used by temporary arrays of the `"debye"` and `"moments"` engines, default `2 ** 30`, units: bytes
+    n_workers: int, optional
+        Number of worker processes sharing conformers, by default conformers are processed serially
+    executor: concurrent.futures.Executor, optional
+        Executor used instead of a new process pool of `n_workers` processes
+    dtype: np.dtype, optional
+        Precision of distances and sinc evaluations of the `"debye"` and `"moments"` engines, `np.float32` or `np.float64`,
+        sums over pairs are always accumulated in `np.float64`, default `np.float64`
+    per_conformer: bool, optional
+        Return `I(q)` of each conformer instead of the average, default `False`
+    out: np.array(float) or string, optional
+        Array with shape `M` by `Q` or path of a `.npy` file (created as a memory mapped array) receiving `I(q)`
+        of each conformer as it is computed, only with `per_conformer=True` and a single grid of `q` values.
+    backend: string, optional
+        Kernel of the `"debye"` and `"moments"` engines, `"numpy"` for elementwise sums over blocks of pairs, `"blas"` for matrix
+        products of sinc kernels and form factors or `"numba"` for a compiled loop over pairs without temporaries,
+        parallelized across cores (falls back to `"numpy"` with a warning if numba is not installed), default `"numpy"`
 
     Returns
     -------
     (np.array(float),np.array(float))
-        A tuple of numpy arrays containing values of `q` and `I(q)` respectively.
+        A tuple of numpy arrays containing values of `q` and `I(q)` respectively (`M` by `Q` array with
+        `per_conformer=True`), a list of such tuples if `q_values` is a list of arrays.
     """
+    return _ensemble_curves(
+        saxs_single_bead.bead_model.BeadModel(residue_codes, residue_model),
+        residue_locations,
+        _q_grid(minimal_q, maximal_q, points, q_values),
+        engine,
+        bin_width,
+        accuracy,
+        block_size,
+        max_memory,
+        n_workers,
+        executor,
+        dtype,
+        per_conformer,
+        out,
+        backend=backend,
+    )
 
-    distance_matrices = np.sqrt(
-        np.sum(
-            (
-                residue_locations[:, np.newaxis, :, :]
-                - residue_locations[:, :, np.newaxis, :]
-            )
-            ** 2,
-            axis=-1,
-        )
+
+def scattering_curve_ensemble_converged(
+    residue_codes,
+    conformers,
+    minimal_q=0.0,
+    maximal_q=0.5,
+    points=20,
+    q_values=None,
+    model=1,
+    tolerance=1e-3,
+    max_conformers=None,
+    min_conformers=10,
+    block_size=None,
+    max_memory=None,
+    dtype=np.float64,
+    backend="numpy",
+):
+    """
+    Computes average scattering curve of conformers taken from an iterable until the average is converged.
+
+    Conformers are consumed (for example from a generator producing chains) until the standard error
+    of the average relative to `I(q)` drops below `tolerance` at all `q`, or `max_conformers` were used.
+    The standard error is estimated from the spread of `I(q)` between conformers.
+
+    Parameters
+    ----------
+    residue_codes: list(string)
+        List of residues of length `N`. Can be 3 letter codes (such as "GLY") or single letter codes (such as "G") or "BB"
+        for two bead backbone locations (blend model only).
+    conformers: iterable(np.array(float))
+        Iterable of arrays with shape `N` by `3` (`N` by `2` by `3` for the two bead model) of locations.
+    minimal_q: float, optional
+        Minimal scattering vector, default `0.0`, units: Angstrom^(-1)
+    maximal_q: float, optional
+        Maximal scattering vector, default `0.5`, units: Angstrom^(-1)
+    points: int, optional
+        Number of points int the plot, default `20.`
+    q_values: np.array(float) or list(np.array(float)), optional
+        Values of `q` to evaluate instead of `points` equally spaced values from `minimal_q` to `maximal_q`,
+        a list of arrays is evaluated in one pass, units: Angstrom^(-1)
+    model: int or list(int), optional
+        `1` for single bead, `2` for two bead or a list of length `N` with model type of each residue, default `1`.
+    tolerance: float, optional
+        Largest standard error of `I(q)` relative to `I(q)`, default `1e-3`
+    max_conformers: int, optional
+        Largest number of conformers used, by default conformers are consumed until convergence
+    min_conformers: int, optional
+        Smallest number of conformers before convergence is tested, default `10`
+    block_size: int, optional
+        Number of beads per block of pairs processed at once, by default chosen from `max_memory`
+    max_memory: int, optional
+        Bound on memory used by temporary arrays, default `2 ** 30`, units: bytes
+    dtype: np.dtype, optional
+        Precision of distances and sinc evaluations, `np.float32` or `np.float64`, default `np.float64`
+    backend: string, optional
+        Kernel of the `"debye"` engine, `"numpy"` for elementwise sums over blocks of pairs, `"blas"` for matrix
+        products of sinc kernels and form factors or `"numba"` for a compiled loop over pairs without temporaries,
+        parallelized across cores (falls back to `"numpy"` with a warning if numba is not installed), default `"numpy"`
+
+    Returns
+    -------
+    (np.array(float),np.array(float),np.array(float),int)
+        A tuple containing values of `q`, `I(q)`, standard error of `I(q)` and the number of conformers used,
+        for a list of `q_values` arrays a list of `(q, I(q), standard error)` tuples and the number of conformers.
+    """
+    q_values, q_layout = _q_grid(minimal_q, maximal_q, points, q_values)
+
+    accumulator = saxs_single_bead.ensemble.EnsembleAccumulator(
+        residue_codes,
+        q_values,
+        model=model,
+        block_size=block_size,
+        max_memory=max_memory,
+        dtype=dtype,
+        backend=backend,
+    )
+    accumulator.add_until_converged(
+        conformers,
+        tolerance=tolerance,
+        max_conformers=max_conformers,
+        min_conformers=min_conformers,
     )
 
-    q_values = np.linspace(minimal_q, maximal_q, points)
-    I_values = np.zeros_like(q_values)
+    curves = _arrange_curves(
+        q_layout, *accumulator.result(), accumulator.standard_error()
+    )
+    if isinstance(curves, list):
+        return (curves, accumulator.count)
+    return curves + (accumulator.count,)
 
-    for i, q in enumerate(q_values):
-        form_factors = np.array(
-            [
-                _form_factor_one_two(code, q, model_type)
-                for (code, model_type) in zip(residue_codes, residue_model)
-            ]
-        )
 
-        I_values[i] = np.sum(
-            form_factors[:, np.newaxis]
-            * form_factors[np.newaxis, :]
-            * np.mean(np.sinc(distance_matrices * q / np.pi), axis=0),
-            axis=(0, 1),
-        )
+def pair_distance_distribution(
+    residue_codes,
+    residue_locations,
+    model=1,
+    weights="form_factor",
+    bin_width=0.1,
+    r_values=None,
+):
+    """
+    Computes the weighted pair distance distribution `P(r)` of a structure or an ensemble.
 
-    return (q_values, I_values)
+    Conformers are binned one at a time into type resolved histograms, so memory does not grow with
+    the number of conformers. `distance_histogram.distribution_intensity` turns the result into `I(q)`
+    on any `q` grid without revisiting the geometry.
+
+    Parameters
+    ----------
+    residue_codes: list(string)
+        List of residues of length `N`. Can be 3 letter codes (such as "GLY") or single letter codes (such as "G") or "BB"
+        for two bead backbone locations (blend model only).
+    residue_locations: np.array(float)
+        Array with shape `N` by `3` (`N` by `2` by `3` for the two bead model) of locations,
+        with an additional leading axis of length `M` for ensembles.
+    model: int or list(int), optional
+        `1` for single bead, `2` for two bead or a list of length `N` with model type of each residue, default `1`.
+    weights: string, optional
+        `"form_factor"` for form factors at `q = 0` or `"electrons"` for numbers of electrons of beads,
+        default `"form_factor"`
+    bin_width: float, optional
+        Width of distance bins, default `0.1`, units: Angstrom
+    r_values: np.array(float), optional
+        Distances at which `P(r)` is linearly interpolated, by default centres of distance bins, units: Angstrom
+
+    Returns
+    -------
+    distance_histogram.PairDistribution
+        Named tuple of `r_values`, `distribution` and `self_term`.
+    """
+    beads = saxs_single_bead.bead_model.BeadModel(residue_codes, model)
+    histogram = saxs_single_bead.distance_histogram.PairDistanceHistogram(
+        beads.type_indices, bin_width=bin_width
+    )
+    histogram.add(beads.locations(residue_locations))
+    return histogram.distribution(weights=weights, r_values=r_values)
@@ -0,0 +1,395 @@
+# selection.py
+# selection of small sub-ensembles fitting experimental curves (ensemble optimization)
+
+import collections
+import numpy as np
+import saxs_single_bead.fitting
+import saxs_single_bead.bead_model
+import saxs_single_bead.ensemble
+import saxs_single_bead.scattering_curve
+
+_methods = ("greedy", "genetic")
+
+SelectionResult = collections.namedtuple(
+    "SelectionResult", ["indices", "chi2", "scale", "background", "curve", "run_chi2"]
+)
+SelectionResult.__doc__ = """
+Result of a sub-ensemble selection.
+
+Attributes
+----------
+indices: np.array(int)
+    Sorted indices of selected conformers of the pool, an index repeats if a conformer was selected more than once.
+chi2: float
+    Reduced chi squared of the selected sub-ensemble.
+scale: float
+    Fitted scale factor.
+background: float
+    Fitted constant background, `0.0` if no background was fitted.
+curve: np.array(float)
+    Fitted curve `scale * mean(intensities[indices]) + background`.
+run_chi2: np.array(float)
+    Reduced chi squared found by each independent run.
+"""
+
+
+class _Problem:
+    """
+    Pool of per conformer curves and one dataset, scores averages of subsets.
+
+    Chi squared of an average curve `c` with optimal scale and background only depends on the weighted
+    products `c.c`, `c.I` and `c.1`, which are precomputed for every conformer of the pool. Scoring all
+    replacements of one conformer of a subset then takes one product of the pool with the sum of the
+    remaining curves and `O(1)` work per candidate.
+    """
+
+    def __init__(self, intensities, experiment_intensities, sigma, size, background):
+        self.intensities = intensities
+        self.size = size
+        self.background = background
+
+        self.weights = 1.0 / sigma**2
+        self.weighted_data = self.weights * experiment_intensities
+        self.data_data = np.sum(self.weighted_data * experiment_intensities)
+        self.data_one = np.sum(self.weighted_data)
+        self.one_one = np.sum(self.weights)
+        self.n_q = len(experiment_intensities)
+
+        self.curve_data = intensities @ self.weighted_data
+        self.curve_one = intensities @ self.weights
+        self.curve_curve = (intensities**2) @ self.weights
+
+    def _chi2(self, curve_curve, curve_data, curve_one):
+        """
+        Returns reduced chi squared of curves with weighted products `curve_curve`, `curve_data` and `curve_one`.
+        """
+        if self.background:
+            determinant = curve_curve * self.one_one - curve_one**2
+            explained = (
+                curve_data**2 * self.one_one
+                - 2.0 * curve_data * curve_one * self.data_one
+                + curve_curve * self.data_one**2
+            ) / determinant
+        else:
+            explained = curve_data**2 / curve_curve
+        return np.maximum(self.data_data - explained, 0.0) / self.n_q
+
+    def scores(self, sums, count):
+        """
+        Returns reduced chi squared of averages `sums / count`, `sums` has shape `K` by `Q`.
+        """
+        sums = np.atleast_2d(sums)
+        return self._chi2(
+            np.sum(sums**2 * self.weights, axis=1) / count**2,
+            (sums @ self.weighted_data) / count,
+            (sums @ self.weights) / count,
+        )
+
+    def best_replacement(self, base, count, excluded):
+        """
+        Returns the pool index `j` minimizing chi squared of `(base + I_j) / count` and the chi squared.
+        """
+        cross = self.intensities @ (self.weights * base)
+        chi2 = self._chi2(
+            (np.sum(base**2 * self.weights) + 2.0 * cross + self.curve_curve)
+            / count**2,
+            (base @ self.weighted_data + self.curve_data) / count,
+            (base @ self.weights + self.curve_one) / count,
+        )
+        chi2[excluded] = np.inf
+        best = np.argmin(chi2)
+        return (best, chi2[best])
+
+
+def _greedy_run(problem, rng, repeats, initial, max_sweeps):
+    """
+    Builds a subset by forward selection (or starts from a random one) and improves it by swapping
+    single conformers until no swap lowers chi squared.
+    """
+    n_pool = len(problem.intensities)
+    if initial:
+        indices = list()
+        sums = np.zeros(problem.intensities.shape[1])
+        for count in range(1, problem.size + 1):
+            excluded = [] if repeats else indices
+            best, _ = problem.best_replacement(sums, count, excluded)
+            indices.append(best)
+            sums = sums + problem.intensities[best]
+        indices = np.array(indices)
+    else:
+        indices = rng.choice(n_pool, size=problem.size, replace=repeats)
+        sums = np.sum(problem.intensities[indices], axis=0)
+
+    chi2 = problem.scores(sums, problem.size)[0]
+    for _ in range(max_sweeps):
+        improved = False
+        for slot in rng.permutation(problem.size):
+            base = sums - problem.intensities[indices[slot]]
+            excluded = [] if repeats else np.delete(indices, slot)
+            best, best_chi2 = problem.best_replacement(base, problem.size, excluded)
+            # improvements below rounding of the closed form are ignored
+            if best_chi2 < chi2 - 1e-12 * problem.data_data / problem.n_q:
+                indices[slot] = best
+                sums = base + problem.intensities[best]
+                chi2 = best_chi2
+                improved = True
+        if not improved:
+            break
+
+    return indices
+
+
+def _repair(indices, n_pool, rng):
+    """
+    Replaces repeated indices of a subset by random unused ones.
+    """
+    unique, first = np.unique(indices, return_index=True)
+    repeated = np.setdiff1d(np.arange(len(indices)), first)
+    if len(repeated) > 0:
+        unused = np.setdiff1d(np.arange(n_pool), unique)
+        indices[repeated] = rng.choice(unused, size=len(repeated), replace=False)
+    return indices
+
+
+def _genetic_run(problem, rng, repeats, population, generations):
+    """
+    Evolves a population of subsets with tournament selection, uniform crossover, single conformer
+    mutations and elitism.
+    """
+    n_pool = len(problem.intensities)
+    members = np.array(
+        [
+            rng.choice(n_pool, size=problem.size, replace=repeats)
+            for _ in range(population)
+        ]
+    )
+    sums = np.sum(problem.intensities[members], axis=1)
+    fitness = problem.scores(sums, problem.size)
+
+    for _ in range(generations):
+        elite = np.argmin(fitness)
+        children = np.empty_like(members)
+        child_sums = np.empty_like(sums)
+        children[0] = members[elite]
+        child_sums[0] = sums[elite]
+
+        contests = rng.integers(0, population, size=(population - 1, 2, 2))
+        winners = np.where(
+            fitness[contests[..., 0]] <= fitness[contests[..., 1]],
+            contests[..., 0],
+            contests[..., 1],
+        )
+        for child, (mother, father) in enumerate(winners, start=1):
+            genes = np.where(
+                rng.random(problem.size) < 0.5, members[mother], members[father]
+            )
+            genes[rng.integers(0, problem.size)] = rng.integers(0, n_pool)
+            if not repeats:
+                genes = _repair(genes, n_pool, rng)
+
+            # sum of the child is updated from the mother in O(Q) per differing slot
+            differing = np.nonzero(genes != members[mother])[0]
+            children[child] = genes
+            child_sums[child] = (
+                sums[mother]
+                + np.sum(problem.intensities[genes[differing]], axis=0)
+                - np.sum(problem.intensities[members[mother][differing]], axis=0)
+            )
+
+        members, sums = (children, child_sums)
+        fitness = problem.scores(sums, problem.size)
+
+    return members[np.argmin(fitness)]
+
+
+def _selection_run(problem, method, seed, repeats, initial, options):
+    rng = np.random.default_rng(seed)
+    if method == "greedy":
+        return _greedy_run(problem, rng, repeats, initial, options["max_sweeps"])
+    return _genetic_run(
+        problem, rng, repeats, options["population"], options["generations"]
+    )
+
+
+def select_subensemble(
+    intensities,
+    experiment_intensities,
+    sigma,
+    size,
+    method="greedy",
+    background=False,
+    repeats=True,
+    n_runs=1,
+    seed=None,
+    n_workers=None,
+    executor=None,
+    max_sweeps=100,
+    population=50,
+    generations=200,
+):
+    """
+    Selects `size` conformers of a pool whose averaged curve best fits an experimental curve.
+
+    Curves of the pool are computed once, a subset is scored by the reduced chi squared of its average with
+    optimal scale (and background). Moves replace one conformer, which updates the sum of curves in `O(Q)`.
+    `method="greedy"` builds the subset by forward selection and then swaps single conformers for the best
+    replacement in the pool until no swap improves the fit, further runs start from random subsets.
+    `method="genetic"` evolves a population of subsets as in the ensemble optimization method.
+
+    Parameters
+    ----------
+    intensities: np.array(float)
+        Array with shape `M` by `Q` of `I(q)` of each conformer of the pool at experimental `q` values,
+        for example from `scattering_curve_ensemble(..., per_conformer=True)`.
+    experiment_intensities: np.array(float)
+        Vector of length `Q` of measured `I(q)`.
+    sigma: np.array(float)
+        Vector of length `Q` of measurement errors.
+    size: int
+        Number of selected conformers.
+    method: string, optional
+        `"greedy"` or `"genetic"`, default `"greedy"`
+    background: bool, optional
+        Fit constant background, default `False`
+    repeats: bool, optional
+        Allow selecting a conformer more than once, default `True`
+    n_runs: int, optional
+        Number of independent runs, the best subset is returned, default `1`
+    seed: int, optional
+        Seed of the random number generators of the runs.
+    n_workers: int, optional
+        Number of worker processes running independent runs, by default runs are serial
+    executor: concurrent.futures.Executor, optional
+        Executor used instead of a new `ensemble.process_pool` of `n_workers` processes
+    max_sweeps: int, optional
+        Largest number of sweeps over all slots of `"greedy"`, default `100`
+    population: int, optional
+        Number of subsets of `"genetic"`, default `50`
+    generations: int, optional
+        Number of generations of `"genetic"`, default `200`
+
+    Returns
+    -------
+    SelectionResult
+        Named tuple of `indices`, `chi2`, `scale`, `background`, `curve` and `run_chi2`.
+    """
+    if method not in _methods:
+        raise ValueError(
+            f"{method} is not a valid method. One of {', '.join(_methods)} is allowed."
+        )
+    intensities = np.asarray(intensities, dtype=float)
+    experiment_intensities = np.asarray(experiment_intensities, dtype=float)
+    sigma = np.asarray(sigma, dtype=float)
+    if intensities.ndim != 2 or intensities.shape[1] != len(experiment_intensities):
+        raise ValueError(
+            f"Intensities of shape (M, {len(experiment_intensities)}) expected, got array of shape {intensities.shape}"
+        )
+    if size < 1 or (not repeats and size > len(intensities)):
+        raise ValueError("`size` has to be between 1 and the number of conformers")
+
+    problem = _Problem(intensities, experiment_intensities, sigma, size, background)
+    options = {
+        "max_sweeps": max_sweeps,
+        "population": population,
+        "generations": generations,
+    }
+    seeds = np.random.SeedSequence(seed).spawn(n_runs)
+    arguments = [
+        (problem, method, seeds[run], repeats, run == 0, options)
+        for run in range(n_runs)
+    ]
+
+    if n_workers is None and executor is None:
+        subsets = [_selection_run(*argument) for argument in arguments]
+    else:
+        own_executor = executor is None
+        if own_executor:
+            executor = saxs_single_bead.ensemble.process_pool(n_workers)
+        try:
+            futures = [
+                executor.submit(_selection_run, *argument) for argument in arguments
+            ]
+            subsets = [future.result() for future in futures]
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+    subsets = np.array(subsets)
+    chi2, scale, offset = saxs_single_bead.fitting._fit_dataset(
+        np.mean(intensities[subsets], axis=1),
+        experiment_intensities,
+        sigma,
+        background,
+    )
+    best = np.argmin(chi2)
+    return SelectionResult(
+        indices=np.sort(subsets[best]),
+        chi2=chi2[best],
+        scale=scale[best],
+        background=offset[best],
+        curve=scale[best] * np.mean(intensities[subsets[best]], axis=0) + offset[best],
+        run_chi2=chi2,
+    )
+
+
+def select_ensemble(
+    residue_codes,
+    residue_locations,
+    experiment,
+    size,
+    model=1,
+    block_size=None,
+    max_memory=None,
+    dtype=np.float64,
+    **options,
+):
+    """
+    Computes curves of a pool of conformers at experimental `q` values once and selects a sub-ensemble
+    with `select_subensemble`.
+
+    Parameters
+    ----------
+    residue_codes: list(string)
+        List of residues of length `N`. Can be 3 letter codes (such as "GLY") or single letter codes (such as "G") or "BB"
+        for two bead backbone locations (blend model only).
+    residue_locations: np.array(float)
+        Array with shape `M` by `N` by `3` (`M` by `N` by `2` by `3` for the two bead model) of locations of conformers.
+    experiment: np.array(float)
+        Array with shape `3` by `Q` of `q` values, measured `I(q)` and its errors, units: Angstrom^(-1)
+    size: int
+        Number of selected conformers.
+    model: int or list(int), optional
+        `1` for single bead, `2` for two bead or a list of length `N` with model type of each residue, default `1`.
+    block_size: int, optional
+        Number of beads per block of pairs processed at once, by default chosen from `max_memory`
+    max_memory: int, optional
+        Bound on memory used by temporary arrays, default `2 ** 30`, units: bytes
+    dtype: np.dtype, optional
+        Precision of distances and sinc evaluations, `np.float32` or `np.float64`, default `np.float64`
+    options:
+        Further keyword arguments of `select_subensemble`, such as `method`, `n_runs` or `n_workers`.
+
+    Returns
+    -------
+    (np.array(float),SelectionResult)
+        Array with shape `M` by `Q` of `I(q)` of each conformer and the result of `select_subensemble`.
+    """
+    q_values, experiment_intensities, sigma = np.asarray(experiment, dtype=float)
+    _, intensities = saxs_single_bead.scattering_curve._ensemble_curves(
+        saxs_single_bead.bead_model.BeadModel(residue_codes, model),
+        residue_locations,
+        saxs_single_bead.scattering_curve._q_grid(None, None, None, q_values),
+        "debye",
+        None,
+        None,
+        block_size,
+        max_memory,
+        options.get("n_workers"),
+        options.get("executor"),
+        dtype,
+        per_conformer=True,
+    )
+    return (
+        intensities,
+        select_subensemble(intensities, experiment_intensities, sigma, size, **options),
+    )
@@ -0,0 +1,265 @@
+# subsampling.py
+# randomized estimates of scattering curves from samples of bead pairs and conformers
+
+import time
+import numpy as np
+import saxs_single_bead.bead_model
+import saxs_single_bead.scattering_curve
+
+_round_samples = 2**15
+
+
+def _separation_strata(n_units, beads_per_unit):
+    """
+    Returns edges of strata of sequence separation `[0, 1), [1, 2), [2, 4), [4, 8), ...`,
+    the first stratum only exists for models with more than one bead per residue.
+    """
+    edges = [1]
+    while edges[-1] < n_units:
+        edges.append(min(2 * edges[-1], n_units))
+    if beads_per_unit > 1:
+        edges = [0] + edges
+    return list(zip(edges[:-1], edges[1:]))
+
+
+class _Stratum:
+    """
+    Bead pairs with sequence separation in `[low, high)` between residues (units) of `beads_per_unit`
+    consecutive beads.
+    """
+
+    def __init__(self, low, high, n_units, beads_per_unit):
+        self.n_units = n_units
+        self.beads_per_unit = beads_per_unit
+        self.separations = np.arange(low, high)
+        self.unit_pairs = n_units - self.separations
+        self.pairs_per_unit_pair = np.where(
+            self.separations == 0,
+            beads_per_unit * (beads_per_unit - 1) // 2,
+            beads_per_unit**2,
+        )
+        self.weights = self.unit_pairs * self.pairs_per_unit_pair
+        self.size = int(np.sum(self.weights))
+
+    def _beads(self, separations, units, rng):
+        k = self.beads_per_unit
+        offset_a = rng.integers(0, k, size=len(units))
+        offset_b = rng.integers(0, k, size=len(units))
+        same = separations == 0
+        if np.any(same):
+            # pairs within one residue, only distinct beads
+            offset_a[same] = 0
+            offset_b[same] = rng.integers(1, k, size=np.sum(same))
+        return (units * k + offset_a, (units + separations) * k + offset_b)
+
+    def sample(self, n_samples, rng):
+        """
+        Returns bead indices of `n_samples` pairs drawn uniformly from the stratum.
+        """
+        cumulative = np.cumsum(self.weights)
+        separations = self.separations[
+            np.searchsorted(
+                cumulative, rng.integers(0, self.size, size=n_samples), side="right"
+            )
+        ]
+        units = (rng.random(n_samples) * (self.n_units - separations)).astype(int)
+        return self._beads(separations, units, rng)
+
+    def enumerate(self):
+        """
+        Returns bead indices of all pairs of the stratum.
+        """
+        k = self.beads_per_unit
+        first, second = (list(), list())
+        for separation in self.separations:
+            units = np.arange(self.n_units - separation)
+            for offset_a in range(k):
+                for offset_b in range(k):
+                    if separation == 0 and offset_b <= offset_a:
+                        continue
+                    first.append(units * k + offset_a)
+                    second.append((units + separation) * k + offset_b)
+        return (np.concatenate(first), np.concatenate(second))
+
+
+def _pair_terms(locations, form_factor_matrix, q_values, conformers, first, second):
+    """
+    Returns `f_i(q) f_j(q) sinc(q r_ij)` for pairs `(first, second)` in `conformers`, shape `n` by `Q`.
+    """
+    distances = np.sqrt(
+        np.sum(
+            (locations[conformers, first] - locations[conformers, second]) ** 2, axis=-1
+        )
+    )
+    return (
+        form_factor_matrix[first]
+        * form_factor_matrix[second]
+        * np.sinc(distances[:, np.newaxis] * q_values[np.newaxis, :] / np.pi)
+    )
+
+
+def scattering_curve_estimate(
+    residue_codes,
+    residue_locations,
+    minimal_q=0.0,
+    maximal_q=0.5,
+    points=20,
+    q_values=None,
+    model=1,
+    samples=10**6,
+    time_budget=None,
+    seed=None,
+):
+    """
+    Estimates average scattering curve from random samples of bead pairs and conformers.
+
+    Pairs are stratified by sequence separation `[1, 2), [2, 4), [4, 8), ...` (and pairs of beads of one
+    residue for the two bead model). After a pilot round samples are allocated to strata proportionally
+    to their size times their standard deviation. Strata whose all pairs in all conformers fit in
+    the budget are summed exactly, so the estimate becomes the exact Debye sum as `samples` grows.
+
+    Parameters
+    ----------
+    residue_codes: list(string)
+        List of residues of length `N`. Can be 3 letter codes (such as "GLY") or single letter codes (such as "G") or "BB"
+        for two bead backbone locations (blend model only).
+    residue_locations: np.array(float)
+        Array with shape `M` by `N` by `3` (`M` by `N` by `2` by `3` for the two bead model) of locations of conformers,
+        the leading axis can be omitted for a single structure.
+    minimal_q: float, optional
+        Minimal scattering vector, default `0.0`, units: Angstrom^(-1)
+    maximal_q: float, optional
+        Maximal scattering vector, default `0.5`, units: Angstrom^(-1)
+    points: int, optional
+        Number of points int the plot, default `20.`
+    q_values: np.array(float) or list(np.array(float)), optional
+        Values of `q` to evaluate instead of `points` equally spaced values from `minimal_q` to `maximal_q`,
+        a list of arrays is evaluated in one pass, units: Angstrom^(-1)
+    model: int or list(int), optional
+        `1` for single bead, `2` for two bead or a list of length `N` with model type of each residue, default `1`.
+    samples: int, optional
+        Largest number of evaluated pairs, including pairs of strata summed exactly, at least 2 per sampled
+        stratum, default `10 ** 6`
+    time_budget: float, optional
+        Stop sampling rounds after `time_budget` seconds, by default only `samples` limits the estimate, units: seconds
+    seed: int, optional
+        Seed of the random number generator.
+
+    Returns
+    -------
+    (np.array(float),np.array(float),np.array(float))
+        A tuple of numpy arrays containing values of `q`, `I(q)` and standard error of `I(q)` respectively,
+        a list of such tuples if `q_values` is a list of arrays.
+    """
+    start_time = time.perf_counter()
+    rng = np.random.default_rng(seed)
+
+    q_values, q_layout = saxs_single_bead.scattering_curve._q_grid(
+        minimal_q, maximal_q, points, q_values
+    )
+    beads = saxs_single_bead.bead_model.BeadModel(residue_codes, model)
+    form_factor_matrix = beads.form_factor_matrix(q_values)
+    locations = beads.locations(residue_locations).reshape((-1, beads.n_beads, 3))
+    n_conformers = len(locations)
+
+    beads_per_unit = 2 if beads.two_bead else 1
+    n_units = beads.n_beads // beads_per_unit
+    strata = [
+        _Stratum(low, high, n_units, beads_per_unit)
+        for (low, high) in _separation_strata(n_units, beads_per_unit)
+    ]
+    strata = [stratum for stratum in strata if stratum.size > 0]
+
+    I_values = np.sum(form_factor_matrix**2, axis=0)
+    variance = np.zeros_like(q_values)
+
+    # strata small enough are summed exactly over all pairs and conformers
+    budget = samples
+    remaining = sorted(strata, key=lambda stratum: stratum.size)
+    strata = list()
+    while len(remaining) > 0:
+        stratum = remaining.pop(0)
+        undetermined = stratum.size + sum(s.size for s in remaining + strata)
+        population = stratum.size * n_conformers
+        if population > budget * stratum.size / undetermined:
+            strata.append(stratum)
+            continue
+
+        first, second = stratum.enumerate()
+        for conformer in range(n_conformers):
+            for start in range(0, len(first), _round_samples):
+                chunk = slice(start, start + _round_samples)
+                I_values += (2.0 / n_conformers) * np.sum(
+                    _pair_terms(
+                        locations,
+                        form_factor_matrix,
+                        q_values,
+                        conformer,
+                        first[chunk],
+                        second[chunk],
+                    ),
+                    axis=0,
+                )
+        budget -= population
+
+    counts = np.zeros(len(strata))
+    sums = np.zeros((len(strata), len(q_values)))
+    squares = np.zeros((len(strata), len(q_values)))
+    sizes = np.array([stratum.size for stratum in strata], dtype=float)
+    if budget < 2 * len(strata):
+        raise ValueError(
+            f"`samples` leaves {budget} samples for {len(strata)} sampled strata, at least 2 per stratum are needed"
+        )
+
+    while budget > 0 and len(strata) > 0:
+        out_of_time = (
+            time_budget is not None and time.perf_counter() - start_time > time_budget
+        )
+        if out_of_time and np.all(counts >= 2):
+            break
+
+        round_samples = min(budget, _round_samples)
+        if np.all(counts >= 2):
+            deviations = np.sqrt(
+                np.maximum(
+                    squares / counts[:, np.newaxis]
+                    - (sums / counts[:, np.newaxis]) ** 2,
+                    0.0,
+                )
+            )
+            allocation = sizes * (np.max(deviations, axis=1) + 1e-12)
+        else:
+            allocation = sizes
+        # each stratum needs 2 samples for its variance, the rest of the round is shared out
+        # and samples lost by rounding go to the largest remainders, so rounds never exceed the budget
+        missing = np.maximum(2 - counts, 0).astype(int)
+        shares = (round_samples - np.sum(missing)) * allocation / np.sum(allocation)
+        allocation = missing + np.floor(shares).astype(int)
+        leftover = round_samples - np.sum(allocation)
+        allocation[np.argsort(np.floor(shares) - shares)[:leftover]] += 1
+
+        for h, stratum in enumerate(strata):
+            first, second = stratum.sample(allocation[h], rng)
+            conformers = rng.integers(0, n_conformers, size=allocation[h])
+            terms = _pair_terms(
+                locations, form_factor_matrix, q_values, conformers, first, second
+            )
+            counts[h] += allocation[h]
+            sums[h] += np.sum(terms, axis=0)
+            squares[h] += np.sum(terms**2, axis=0)
+        budget -= int(np.sum(allocation))
+
+    if len(strata) > 0:
+        means = sums / counts[:, np.newaxis]
+        variances = (
+            np.maximum(squares / counts[:, np.newaxis] - means**2, 0.0)
+            * (counts / np.maximum(counts - 1, 1))[:, np.newaxis]
+        )
+        I_values += 2.0 * np.sum(sizes[:, np.newaxis] * means, axis=0)
+        variance += 4.0 * np.sum(
+            sizes[:, np.newaxis] ** 2 * variances / counts[:, np.newaxis], axis=0
+        )
+
+    return saxs_single_bead.scattering_curve._arrange_curves(
+        q_layout, q_values, I_values, np.sqrt(variance)
+    )
@@ -16,5 +16,9 @@ setup(name='saxs_single_bead',
           'Source': 'https://github.com/RadostW/saxs_single_bead/'
       },
       license='MIT',
+      python_requires='>=3.8',
       packages=['saxs_single_bead'],
+      package_data={'saxs_single_bead': ['data/*.npy']},
+      extras_require={'numba': ['numba']},
+      entry_points={'console_scripts': ['saxs-single-bead=saxs_single_bead.cli:main']},
       zip_safe=False)
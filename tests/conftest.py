@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+_ubiquitin = (
+    "MQIFVKTLTGKTITLEVEPSDTIENVKAKIQDKEGIPPDQQRLIFAGKQLEDGRTLSDYNIQKESTLHLVLRLRGG"
+)
+
+
+def _random_chain(n, m=None, seed=0, two_bead=False):
+    """
+    Returns a random walk of `n` residues with normally distributed steps of 2.2 Angstrom along each axis,
+    shape `n` by `3` (`n` by `2` by `3` with `two_bead`) or `m` by ... for `m` conformers. `seed` can also
+    be a `np.random.Generator`, which is used as it is.
+    """
+    rng = np.random.default_rng(seed)
+    shape = (n, 2, 3) if two_bead else (n, 3)
+    if m is not None:
+        shape = (m,) + shape
+    return np.cumsum(rng.normal(scale=2.2, size=shape), axis=0 if m is None else 1)
+
+
+@pytest.fixture
+def ubiquitin():
+    """
+    Sequence of ubiquitin, tests take its first residues.
+    """
+    return _ubiquitin
+
+
+@pytest.fixture
+def random_chain():
+    """
+    Function returning random walks of residues, see `_random_chain`.
+    """
+    return _random_chain
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from saxs_single_bead.bead_model import BeadModel
+from saxs_single_bead.scattering_curve import scattering_curve
+from saxs_single_bead.scattering_curve import scattering_curve_ensemble
+from saxs_single_bead.scattering_curve import scattering_curve_two_bead
+from saxs_single_bead.scattering_curve import scattering_curve_two_bead_ensemble
+from saxs_single_bead.scattering_curve import scattering_curve_one_two_blend
+from saxs_single_bead.scattering_curve import scattering_curve_one_two_blend_ensemble
+
+
+def test_two_bead_locations_are_views():
+    rng = np.random.default_rng(61)
+    ensemble = rng.normal(size=(4, 5, 2, 3))
+    beads = BeadModel("MQIFV", model=2)
+
+    locations = beads.locations(ensemble)
+
+    assert beads.codes[:4] == ["BB", "M", "BB", "Q"]
+    assert locations.shape == (4, 10, 3)
+    assert np.shares_memory(locations, ensemble)
+    np.testing.assert_array_equal(locations[:, beads.bead_indices([3])], ensemble[:, 3])
+    with pytest.raises(ValueError):
+        beads.locations(ensemble[:, :4])
+
+
+def test_public_functions_share_one_core(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    ensemble = random_chain(len(sequence), 3, seed=62, two_bead=True)
+    q_values = np.linspace(0.0, 0.5, 11)
+
+    two_bead = scattering_curve_two_bead_ensemble(
+        sequence, ensemble, q_values=q_values
+    )[1]
+    single = scattering_curve_ensemble(sequence, ensemble[:, :, 0], q_values=q_values)[
+        1
+    ]
+    np.testing.assert_allclose(
+        np.mean(
+            [
+                scattering_curve_two_bead(sequence, conformer, q_values=q_values)[1]
+                for conformer in ensemble
+            ],
+            axis=0,
+        ),
+        two_bead,
+        rtol=1e-12,
+    )
+    np.testing.assert_allclose(
+        scattering_curve(sequence, ensemble[0, :, 0], q_values=q_values)[1],
+        scattering_curve_ensemble(sequence, ensemble[:1, :, 0], q_values=q_values)[1],
+        rtol=1e-12,
+    )
+    np.testing.assert_allclose(
+        scattering_curve_one_two_blend_ensemble(
+            sequence, [1] * len(sequence), ensemble[:, :, 0], q_values=q_values
+        )[1],
+        single,
+        rtol=1e-12,
+    )
+    np.testing.assert_allclose(
+        scattering_curve_one_two_blend(
+            sequence, [1] * len(sequence), ensemble[0, :, 0], q_values=q_values
+        )[1],
+        scattering_curve(sequence, ensemble[0, :, 0], q_values=q_values)[1],
+        rtol=1e-12,
+    )
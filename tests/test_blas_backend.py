@@ -0,0 +1,52 @@
+import numpy as np
+from saxs_single_bead.debye_kernel import debye_intensity
+from saxs_single_bead.form_factors import form_factor_matrix
+from saxs_single_bead.scattering_curve import scattering_curve
+from saxs_single_bead.scattering_curve import scattering_curve_ensemble
+
+
+def test_blas_backend_matches_numpy_backend_over_tiles(random_chain):
+    rng = np.random.default_rng(51)
+    sequence = "".join(rng.choice(list("ACDEFGHIKLMNPQRSTVWY"), size=300))
+    locations = random_chain(len(sequence), seed=rng)
+    locations += 500.0  # far from the origin, the Gram formula has to stay accurate
+    q_values = np.linspace(0.0, 0.5, 11)
+    form_factors = form_factor_matrix(sequence, q_values)
+
+    expected = debye_intensity(locations, form_factors, q_values, 300)
+    for block_size in (300, 70):
+        np.testing.assert_allclose(
+            debye_intensity(
+                locations, form_factors, q_values, block_size, backend="blas"
+            ),
+            expected,
+            rtol=1e-10,
+        )
+    np.testing.assert_allclose(
+        debye_intensity(
+            locations,
+            form_factors,
+            q_values,
+            300,
+            dtype=np.float32,
+            backend="blas",
+        ),
+        expected,
+        rtol=1e-4,
+    )
+
+
+def test_blas_backend_of_public_functions(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    ensemble = random_chain(len(sequence), 3, seed=52)
+
+    np.testing.assert_allclose(
+        scattering_curve_ensemble(sequence, ensemble, backend="blas")[1],
+        scattering_curve_ensemble(sequence, ensemble)[1],
+        rtol=1e-12,
+    )
+    np.testing.assert_allclose(
+        scattering_curve(sequence, ensemble[0], backend="blas")[1],
+        scattering_curve(sequence, ensemble[0])[1],
+        rtol=1e-12,
+    )
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from saxs_single_bead.form_factors import form_factor_matrix
+from saxs_single_bead.scattering_curve import scattering_curve
+from saxs_single_bead.scattering_curve import scattering_curve_two_bead
+from saxs_single_bead.scattering_curve import scattering_curve_one_two_blend
+
+
+def test_blocked_kernel_matches_single_block(random_chain, ubiquitin):
+    sequence = ubiquitin[:43]
+    locations = random_chain(len(sequence), seed=1)
+
+    np.testing.assert_allclose(
+        scattering_curve(sequence, locations, block_size=7),
+        scattering_curve(sequence, locations),
+        rtol=1e-12,
+    )
+    np.testing.assert_allclose(
+        scattering_curve(sequence, locations, max_memory=100_000),
+        scattering_curve(sequence, locations),
+        rtol=1e-12,
+    )
+
+    two_bead = np.stack([locations, locations + 1.5], axis=1)
+    np.testing.assert_allclose(
+        scattering_curve_two_bead(list(sequence), two_bead, block_size=10),
+        scattering_curve_two_bead(list(sequence), two_bead),
+        rtol=1e-12,
+    )
+
+    codes = list(sequence) + ["BB"] * 5
+    model = [1] * len(sequence) + [2] * 5
+    blend_locations = np.vstack([locations, locations[:5] + 1.0])
+    np.testing.assert_allclose(
+        scattering_curve_one_two_blend(codes, model, blend_locations, block_size=9),
+        scattering_curve_one_two_blend(codes, model, blend_locations),
+        rtol=1e-12,
+    )
+
+
+def test_upper_triangle_matches_full_double_sum(random_chain, ubiquitin):
+    sequence = ubiquitin[:21]
+    locations = random_chain(len(sequence), seed=3)
+
+    (q_values, curve) = scattering_curve(sequence, locations, block_size=6)
+
+    distances = np.linalg.norm(locations[:, np.newaxis] - locations[np.newaxis], axis=-1)
+    form_factors = form_factor_matrix(sequence, q_values)
+    expected = [
+        form_factors[:, i] @ np.sinc(distances * q / np.pi) @ form_factors[:, i]
+        for i, q in enumerate(q_values)
+    ]
+
+    np.testing.assert_allclose(curve, expected, rtol=1e-12)
+
+
+def test_single_precision_close_to_double(random_chain, ubiquitin):
+    sequence = ubiquitin[:35]
+    locations = 100.0 + random_chain(len(sequence), seed=4)
+
+    (_, double) = scattering_curve(sequence, locations)
+    (_, single) = scattering_curve(sequence, locations, dtype=np.float32, block_size=8)
+    np.testing.assert_allclose(single, double, rtol=1e-5)
+
+    with pytest.raises(ValueError):
+        scattering_curve(sequence, locations, dtype=np.int32)
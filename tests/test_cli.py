@@ -0,0 +1,132 @@
+import csv
+import os
+import numpy as np
+import pytest
+from saxs_single_bead.cli import main, read_output_header
+from saxs_single_bead.read_pdb import read_c_alpha_pdb, read_sequence_pdb
+from saxs_single_bead.scattering_curve import (
+    scattering_curve,
+    scattering_curve_ensemble,
+)
+
+
+def _write_pdb(path, sequence, locations, chains=None):
+    names = {"G": "GLY", "W": "TRP", "K": "LYS", "A": "ALA", "L": "LEU"}
+    chains = "A" * len(sequence) if chains is None else chains
+    with open(path, "w", encoding="utf-8") as f:
+        for i, (code, chain, (x, y, z)) in enumerate(zip(sequence, chains, locations)):
+            # residues are numbered from 1 in each chain
+            number = chains[: i + 1].count(chain)
+            f.write(
+                f"ATOM  {i + 1:5d}  CA  {names[code]} {chain}{number:4d}    {x:8.3f}{y:8.3f}{z:8.3f}  1.00  0.00           C\n"
+            )
+        f.write("END\n")
+
+
+def test_directory_of_pdb_files_and_ensembles(tmp_path):
+    rng = np.random.default_rng(51)
+    inputs = tmp_path / "inputs"
+    os.makedirs(inputs / "nested")
+    for name, sequence in (("first", "GWKAL"), ("nested/second", "LLAGK")):
+        _write_pdb(
+            inputs / (name + ".pdb"), sequence, rng.normal(scale=6.0, size=(5, 3))
+        )
+    ensemble = rng.normal(scale=6.0, size=(3, 4, 3))
+    np.save(inputs / "ensemble.npy", ensemble)
+    output = tmp_path / "output"
+
+    arguments = [str(inputs), "-o", str(output), "--points", "6", "--sequence", "GWKA"]
+    assert main(arguments + ["-j", "2"]) == 0
+
+    first = str(inputs / "first.pdb")
+    assert read_sequence_pdb(first) == ["GLY", "TRP", "LYS", "ALA", "LEU"]
+    q_values, expected = scattering_curve(
+        read_sequence_pdb(first), read_c_alpha_pdb(first), points=6
+    )
+    np.testing.assert_allclose(
+        np.loadtxt(output / "first.dat"), np.stack([q_values, expected], axis=1)
+    )
+    _, expected = scattering_curve_ensemble(list("GWKA"), ensemble, points=6)
+    np.testing.assert_allclose(np.loadtxt(output / "ensemble.dat")[:, 1], expected)
+    assert read_output_header(output / "ensemble.dat")["conformers"] == "3"
+
+    summary = np.loadtxt(output / "summary.tsv", dtype=str, delimiter="\t", ndmin=2)
+    assert list(summary[1:, 0]) == ["ensemble", "first", "second"]
+    assert set(summary[1:, 2]) == {"done"}
+
+    # completed jobs are skipped, a removed output is recomputed
+    modified = os.path.getmtime(output / "first.dat")
+    os.remove(output / "second.dat")
+    assert main(arguments) == 0
+    assert os.path.getmtime(output / "first.dat") == modified
+    assert os.path.exists(output / "second.dat")
+    assert not [name for name in os.listdir(output) if name.endswith(".tmp")]
+
+
+def test_failed_jobs_are_reported(tmp_path):
+    np.save(tmp_path / "ensemble.npy", np.zeros((2, 4, 3)))
+
+    assert main([str(tmp_path / "*.npy"), "-o", str(tmp_path / "output")]) == 1
+    summary = np.loadtxt(
+        tmp_path / "output" / "summary.tsv", dtype=str, delimiter="\t", ndmin=2
+    )
+    assert summary[1, 2] == "failed"
+    assert not os.path.exists(tmp_path / "output" / "ensemble.dat")
+
+
+def test_outputs_with_other_settings_are_not_reused(tmp_path):
+    rng = np.random.default_rng(52)
+    _write_pdb(tmp_path / "first.pdb", "GWKAL", rng.normal(scale=6.0, size=(5, 3)))
+    arguments = [str(tmp_path / "first.pdb"), "-o", str(tmp_path / "output")]
+    assert main(arguments) == 0
+    single_bead = np.loadtxt(tmp_path / "output" / "first.dat")
+    header = read_output_header(tmp_path / "output" / "first.dat")
+    assert (header["model"], header["engine"], header["dtype"]) == (
+        "1",
+        "debye",
+        "float64",
+    )
+
+    for changed in (["--model", "2"], ["--points", "7"], ["--dtype", "float32"]):
+        with pytest.raises(SystemExit):
+            main(arguments + changed)
+    np.testing.assert_array_equal(
+        np.loadtxt(tmp_path / "output" / "first.dat"), single_bead
+    )
+
+    assert main(arguments + ["--model", "2", "--overwrite"]) == 0
+    assert read_output_header(tmp_path / "output" / "first.dat")["model"] == "2"
+    assert main(arguments + ["--model", "2"]) == 0
+
+
+def test_chains_are_separate_residues(tmp_path):
+    rng = np.random.default_rng(53)
+    sequence, chains = "GWKALLAG", "AAAABBBB"
+    locations = rng.normal(scale=6.0, size=(len(sequence), 3))
+    path = tmp_path / "dimer.pdb"
+    _write_pdb(path, sequence, locations, chains)
+    with open(path, encoding="utf-8") as f:
+        lines = f.readlines()
+    # an alternate location of the last residue of chain A is not another residue
+    lines.insert(4, lines[3][:16] + "B" + lines[3][17:])
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+
+    assert len(read_sequence_pdb(str(path))) == len(sequence)
+    assert main([str(path), "-o", str(tmp_path / "output"), "--points", "6"]) == 0
+    _, expected = scattering_curve(
+        read_sequence_pdb(str(path)), read_c_alpha_pdb(str(path)), points=6
+    )
+    np.testing.assert_allclose(
+        np.loadtxt(tmp_path / "output" / "dimer.dat")[:, 1], expected
+    )
+
+
+def test_summary_fields_with_tabs_are_quoted(tmp_path):
+    np.save(tmp_path / "tab\tname.npy", np.zeros((2, 4, 3)))
+
+    assert main([str(tmp_path / "*.npy"), "-o", str(tmp_path / "output")]) == 1
+    with open(tmp_path / "output" / "summary.tsv", encoding="utf-8") as f:
+        rows = list(csv.reader(f, delimiter="\t"))
+    assert [len(row) for row in rows] == [len(rows[0])] * 2
+    assert rows[1][:3] == ["tab\tname", str(tmp_path / "tab\tname.npy"), "failed"]
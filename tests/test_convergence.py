@@ -0,0 +1,62 @@
+import itertools
+import numpy as np
+from saxs_single_bead.ensemble import EnsembleAccumulator
+from saxs_single_bead.scattering_curve import scattering_curve
+from saxs_single_bead.scattering_curve import scattering_curve_ensemble
+from saxs_single_bead.scattering_curve import scattering_curve_ensemble_converged
+
+
+def _chains(random_chain, sequence, rng):
+    while True:
+        yield random_chain(len(sequence), seed=rng)
+
+
+def test_standard_error_matches_spread_of_conformers(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    rng = np.random.default_rng(31)
+    ensemble = np.array(
+        list(itertools.islice(_chains(random_chain, sequence, rng), 45))
+    )
+    q_values = np.linspace(0.0, 0.5, 6)
+
+    accumulator = EnsembleAccumulator(sequence, q_values, max_memory=2**16)
+    accumulator.add(ensemble[:20]).add(ensemble[20:])
+
+    curves = np.array(
+        [scattering_curve(sequence, chain, q_values=q_values)[1] for chain in ensemble]
+    )
+    np.testing.assert_allclose(
+        accumulator.standard_error(),
+        np.std(curves, axis=0, ddof=1) / np.sqrt(len(curves)),
+        rtol=1e-10,
+        atol=1e-12 * np.max(curves),
+    )
+
+
+def test_generator_is_consumed_until_converged(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    tolerance = 0.02
+    consumed = list()
+    chains = _chains(random_chain, sequence, np.random.default_rng(32))
+
+    def recorded():
+        for chain in chains:
+            consumed.append(chain)
+            yield chain
+
+    q_values, curve, error, count = scattering_curve_ensemble_converged(
+        sequence, recorded(), points=6, tolerance=tolerance
+    )
+
+    assert count == len(consumed) < 10000
+    assert np.all(error <= tolerance * curve)
+    np.testing.assert_allclose(
+        curve,
+        scattering_curve_ensemble(sequence, np.array(consumed), q_values=q_values)[1],
+        rtol=1e-12,
+    )
+
+    _, _, _, limited = scattering_curve_ensemble_converged(
+        sequence, chains, points=6, tolerance=1e-9, max_conformers=15
+    )
+    assert limited == 15
@@ -0,0 +1,38 @@
+import numpy as np
+from saxs_single_bead.scattering_curve import scattering_curve
+from saxs_single_bead.scattering_curve import scattering_curve_ensemble
+from saxs_single_bead.scattering_curve import scattering_curve_two_bead
+from saxs_single_bead.distance_histogram import PairDistanceHistogram
+from saxs_single_bead.form_factors import residue_type_indices
+
+
+def test_histogram_within_error_bound(random_chain, ubiquitin):
+    sequence = ubiquitin[:35]
+    locations = random_chain(len(sequence))
+
+    (q_values, exact) = scattering_curve(sequence, locations)
+    (_, binned) = scattering_curve(sequence, locations, engine="histogram")
+
+    histogram = PairDistanceHistogram(residue_type_indices(sequence))
+    histogram.add(locations)
+
+    assert np.all(np.abs(binned - exact) <= histogram.error_bound(q_values) + 1e-9)
+    np.testing.assert_allclose(binned, exact, rtol=1e-2)
+
+
+def test_histogram_ensemble_and_two_bead(random_chain):
+    sequence = "GKTITLEVEPSDTIENV"
+    ensemble = random_chain(len(sequence), 3)
+
+    np.testing.assert_allclose(
+        scattering_curve_ensemble(sequence, ensemble, engine="histogram", bin_width=0.01),
+        scattering_curve_ensemble(sequence, ensemble),
+        rtol=1e-3,
+    )
+
+    two_bead = np.stack([ensemble[0], ensemble[0] + 1.5], axis=1)
+    np.testing.assert_allclose(
+        scattering_curve_two_bead(list(sequence), two_bead, engine="histogram", bin_width=0.01),
+        scattering_curve_two_bead(list(sequence), two_bead),
+        rtol=1e-3,
+    )
@@ -0,0 +1,66 @@
+import numpy as np
+from saxs_single_bead.distance_histogram import distribution_intensity
+from saxs_single_bead.form_factors import form_factor_matrix
+from saxs_single_bead.problem import ScatteringProblem
+from saxs_single_bead.scattering_curve import pair_distance_distribution
+
+
+def test_sine_transform_matches_debye_sum_with_constant_weights(
+    random_chain, ubiquitin
+):
+    sequence = ubiquitin[:17]
+    ensemble = random_chain(len(sequence), 4, seed=31)
+    distribution = pair_distance_distribution(sequence, ensemble, bin_width=0.01)
+
+    weights = form_factor_matrix(sequence, [0.0])[:, 0]
+    q_values = np.linspace(0.0, 0.5, 11)
+    distances = np.sqrt(
+        np.sum((ensemble[:, :, np.newaxis] - ensemble[:, np.newaxis]) ** 2, axis=-1)
+    )
+    expected = np.mean(
+        np.einsum(
+            "i,mijq,j->mq",
+            weights,
+            np.sinc(distances[..., np.newaxis] * q_values / np.pi),
+            weights,
+        ),
+        axis=0,
+    )
+
+    np.testing.assert_allclose(
+        distribution.self_term + np.sum(distribution.distribution) * 0.01,
+        np.sum(weights) ** 2,
+        rtol=1e-12,
+    )
+    np.testing.assert_allclose(
+        distribution_intensity(distribution, q_values), expected, rtol=1e-3
+    )
+
+
+def test_electron_weights_of_two_bead_model_add_up_to_residues():
+    sequence = "GWK"
+    rng = np.random.default_rng(32)
+    locations = rng.normal(scale=5.0, size=(len(sequence), 2, 3))
+    distribution = pair_distance_distribution(
+        sequence, locations, model=2, weights="electrons", bin_width=0.05
+    )
+
+    np.testing.assert_allclose(
+        distribution_intensity(distribution, [0.0]), (30.0 + 98.0 + 70.0) ** 2
+    )
+
+
+def test_problem_distribution_matches_function(ubiquitin):
+    sequence = ubiquitin[:17]
+    rng = np.random.default_rng(33)
+    ensemble = rng.normal(scale=8.0, size=(3, len(sequence), 2, 3))
+    r_values = np.linspace(0.0, 40.0, 81)
+    problem = ScatteringProblem(sequence, ensemble, model=2, engine="histogram")
+
+    distribution = problem.distribution(weights="electrons", r_values=r_values)
+    expected = pair_distance_distribution(
+        sequence, ensemble, model=2, weights="electrons", r_values=r_values
+    )
+
+    np.testing.assert_allclose(distribution.distribution, expected.distribution)
+    assert problem._histogram is not None
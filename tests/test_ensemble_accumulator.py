@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from saxs_single_bead.scattering_curve import scattering_curve
+from saxs_single_bead.scattering_curve import scattering_curve_two_bead_ensemble
+from saxs_single_bead.ensemble import EnsembleAccumulator
+
+
+def test_accumulator_generator_batches_and_merge(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    ensemble = random_chain(len(sequence), 7)
+    q_values, _ = scattering_curve(sequence, ensemble[0])
+    expected = np.mean(
+        [scattering_curve(sequence, conformer)[1] for conformer in ensemble], axis=0
+    )
+
+    from_generator = EnsembleAccumulator(sequence, q_values, max_memory=50_000)
+    from_generator.add(conformer for conformer in ensemble)
+    np.testing.assert_allclose(from_generator.result()[1], expected, rtol=1e-12)
+
+    first = EnsembleAccumulator(sequence, q_values).add(ensemble[:3])
+    second = EnsembleAccumulator(sequence, q_values).add(ensemble[3])
+    second.add(ensemble[4:])
+    first.merge(second)
+    assert first.count == 7
+    np.testing.assert_allclose(first.result()[1], expected, rtol=1e-12)
+
+
+def test_two_bead_ensemble_matches_accumulator(random_chain):
+    sequence = list("GKTITLEVEPS")
+    ensemble = random_chain(len(sequence), 4, two_bead=True)
+
+    q_values, curve = scattering_curve_two_bead_ensemble(sequence, ensemble)
+    accumulator = EnsembleAccumulator(sequence, q_values, model=2, block_size=5)
+    accumulator.add(list(ensemble))
+
+    np.testing.assert_allclose(accumulator.result()[1], curve, rtol=1e-12)
+
+
+def test_merge_rejects_other_residues_and_models(random_chain):
+    q_values = np.linspace(0.0, 0.5, 5)
+    conformer = random_chain(4)
+    accumulator = EnsembleAccumulator("GWKE", q_values).add(conformer)
+
+    with pytest.raises(ValueError):
+        accumulator.merge(EnsembleAccumulator("GWKA", q_values).add(conformer))
+    with pytest.raises(ValueError):
+        accumulator.merge(
+            EnsembleAccumulator(list("GWKE"), q_values, model=[1, 1, 1, 2]).add(
+                conformer
+            )
+        )
+    accumulator.merge(
+        EnsembleAccumulator(["GLY", "TRP", "LYS", "GLU"], q_values).add(conformer)
+    )
+    assert accumulator.count == 2
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from saxs_single_bead.fitting import fit_curves
+from saxs_single_bead.fitting import interpolation_matrix
+
+
+def test_interpolation_matches_numpy():
+    model_q = np.linspace(0.0, 0.5, 26)
+    q_values = np.array([0.0, 0.013, 0.25, 0.4999, 0.5])
+    curve = np.exp(-model_q * 7.0)
+
+    np.testing.assert_allclose(
+        curve @ interpolation_matrix(model_q, q_values).T,
+        np.interp(q_values, model_q, curve),
+        rtol=1e-14,
+    )
+    with pytest.raises(ValueError):
+        interpolation_matrix(model_q, [0.6])
+
+
+def test_fit_curves_matches_least_squares():
+    rng = np.random.default_rng(61)
+    model_q = np.linspace(0.0, 0.5, 51)
+    curves = np.exp(-np.outer(rng.uniform(10.0, 500.0, size=6), model_q**2))
+    experiments = list()
+    for size in (30, 17):
+        experiment_q = np.sort(rng.uniform(0.01, 0.45, size=size))
+        intensities = 4.0 * np.exp(-150.0 * experiment_q**2) + 0.1
+        experiments.append(
+            np.array([experiment_q, intensities, 0.05 + 0.01 * intensities])
+        )
+
+    result = fit_curves(model_q, curves, experiments, background=True)
+
+    assert result.chi2.shape == (6, 2)
+    for k, curve in enumerate(curves):
+        for d, (experiment_q, intensities, sigma) in enumerate(experiments):
+            columns = np.transpose(
+                [np.interp(experiment_q, model_q, curve), np.ones_like(sigma)]
+            )
+            scale, offset = np.linalg.lstsq(
+                columns / sigma[:, np.newaxis], intensities / sigma, rcond=None
+            )[0]
+            np.testing.assert_allclose(result.scale[k, d], scale, rtol=1e-8)
+            np.testing.assert_allclose(result.background[k, d], offset, atol=1e-8)
+
+    single = fit_curves(model_q, curves, experiments[1])
+    assert single.chi2.shape == (6,)
+    assert np.all(single.background == 0.0)
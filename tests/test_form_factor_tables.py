@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+import saxs_single_bead.form_factors as form_factors
+from saxs_single_bead.form_factors import form_factor_matrix
+from saxs_single_bead.scattering_curve import scattering_curve_two_bead
+
+
+def test_registered_table_replaces_lookups():
+    table_q, table, _ = form_factors._load_table()
+    q_values = np.linspace(0.0, 0.5, 7)
+    expected = form_factor_matrix("MQIFV", q_values)
+
+    form_factors.register_table("doubled", np.vstack([table_q, 2.0 * table[:41]]))
+    try:
+        form_factors.use_table("doubled")
+        np.testing.assert_allclose(
+            form_factor_matrix("MQIFV", q_values), 2.0 * expected, rtol=1e-12
+        )
+    finally:
+        form_factors.use_table("tong2016")
+    np.testing.assert_allclose(form_factor_matrix("MQIFV", q_values), expected)
+
+    assert "doubled" in form_factors.table_names()
+    with pytest.raises(ValueError):
+        form_factors.use_table("missing")
+    with pytest.raises(ValueError):
+        form_factors.register_table("short", table_q[np.newaxis])
+
+
+def test_custom_residue():
+    q_values = np.linspace(0.0, 0.5, 11)
+    serine = form_factor_matrix(["SER"], q_values)[0]
+    serine_side_chain = form_factor_matrix(["SER"], q_values, model=2)[0]
+    form_factors.register_residue(
+        "SEP", q_values, serine + 5.0, serine_side_chain + 5.0, electrons=94
+    )
+    form_factors.register_residue("MSE", q_values, serine)
+    try:
+        np.testing.assert_allclose(
+            form_factor_matrix(["SEP", "S"], q_values, model=[1, 1]),
+            [serine + 5.0, serine],
+            rtol=1e-12,
+        )
+        np.testing.assert_allclose(
+            form_factor_matrix(["SEP"], q_values, model=2)[0],
+            serine_side_chain + 5.0,
+            rtol=1e-12,
+        )
+        assert form_factors._type_electrons(
+            form_factors.residue_type_indices(["SEP", "BB", "SEP"], [1, 2, 2])
+        ).tolist() == [94.0, 29.0, 65.0]
+
+        locations = np.random.default_rng(71).normal(scale=5.0, size=(2, 2, 3))
+        scattering_curve_two_bead(["SEP", "G"], locations)
+        with pytest.raises(ValueError):
+            scattering_curve_two_bead(["MSE", "G"], locations)
+        with pytest.raises(ValueError):
+            form_factors.register_residue("SER", q_values, serine)
+    finally:
+        form_factors._custom_residues.clear()
+        form_factors._loaded = None
+
+
+def test_lookups_identical_to_numpy_interpolation():
+    table_q, table, _ = form_factors._load_table()
+    rng = np.random.default_rng(3)
+    q_values = np.concatenate(
+        [rng.uniform(-0.1, table_q[-1] + 0.1, 1000), table_q, table_q + 1e-12]
+    )
+    # uniform grid of the shipped table and a non uniform grid
+    stretched = table_q[-1] * (table_q / table_q[-1]) ** 2
+    form_factors.register_table("stretched", np.vstack([stretched, table[:41]]))
+    try:
+        for grid, name in ((table_q, "tong2016"), (stretched, "stretched")):
+            form_factors.use_table(name)
+            expected = [np.interp(q_values, grid, row) for row in table[:41]]
+            assert np.array_equal(
+                form_factors._interpolate_table(np.arange(41), q_values), expected
+            )
+    finally:
+        form_factors.use_table("tong2016")
@@ -1,7 +1,24 @@
+import numpy as np
 import pytest
 from saxs_single_bead.form_factors import form_factor
+from saxs_single_bead.form_factors import form_factor_matrix, form_factor_two_bead
 
 def test_form_factor_values_from_paper():
     assert form_factor('ALA',0.25) == pytest.approx(8.239,rel=0.01)
     assert form_factor('GLU',0.25) == pytest.approx(18.694,rel=0.01)
     assert form_factor('LEU',0.25) == pytest.approx(3.893,rel=0.01)
+
+def test_form_factor_matrix_matches_scalar_lookup():
+    q_values = np.linspace(0.0, 0.6, 13)
+    codes = ['ALA', 'G', 'TRP', 'BB']
+    model = [1, 1, 2, 2]
+
+    matrix = form_factor_matrix(codes, q_values, model=model)
+    expected = np.array([
+        [form_factor('ALA', q) for q in q_values],
+        [form_factor('G', q) for q in q_values],
+        [form_factor_two_bead('TRP', q) for q in q_values],
+        [form_factor_two_bead('BB', q) for q in q_values],
+    ])
+
+    np.testing.assert_allclose(matrix, expected, rtol=1e-12)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from saxs_single_bead.incremental import IncrementalScattering
+from saxs_single_bead.scattering_curve import scattering_curve
+from saxs_single_bead.scattering_curve import scattering_curve_two_bead
+
+
+def test_accepted_moves_match_recompute(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    rng = np.random.default_rng(21)
+    locations = random_chain(len(sequence), seed=rng)
+    q_values = np.linspace(0.0, 0.5, 9)
+    state = IncrementalScattering(sequence, locations, q_values, check_every=7)
+
+    for step in range(20):
+        indices = rng.choice(len(sequence), size=2, replace=False)
+        trial = state.propose(
+            indices, state.locations[indices] + rng.normal(size=(2, 3))
+        )
+        if step % 3 == 0:
+            state.reject()
+        else:
+            np.testing.assert_allclose(state.accept(), trial, rtol=1e-12)
+
+    np.testing.assert_allclose(
+        state.intensity,
+        scattering_curve(sequence, state.locations, q_values=q_values)[1],
+        rtol=1e-12,
+    )
+    assert state.drift < 1e-12
+
+
+def test_two_bead_move_and_reject(ubiquitin):
+    sequence = list(ubiquitin[:17])
+    rng = np.random.default_rng(22)
+    locations = rng.normal(scale=8.0, size=(len(sequence), 2, 3))
+    q_values = np.linspace(0.0, 0.5, 9)
+    state = IncrementalScattering(sequence, locations, q_values, model=2)
+    initial = state.intensity
+
+    moved = locations.copy()
+    moved[4] += 3.0
+    trial = state.propose([4], moved[4])
+    np.testing.assert_allclose(
+        trial,
+        scattering_curve_two_bead(sequence, moved, q_values=q_values)[1],
+        rtol=1e-12,
+    )
+
+    np.testing.assert_array_equal(state.reject(), initial)
+    with pytest.raises(ValueError):
+        state.accept()
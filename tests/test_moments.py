@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from saxs_single_bead.form_factors import form_factor_matrix
+from saxs_single_bead.moments import moment_intensity, guinier_parameters
+from saxs_single_bead.debye_kernel import debye_intensity
+from saxs_single_bead.scattering_curve import scattering_curve
+from saxs_single_bead.scattering_curve import scattering_curve_two_bead_ensemble
+
+
+def test_series_matches_debye_sum_within_accuracy(random_chain, ubiquitin):
+    sequence = ubiquitin
+    ensemble = random_chain(len(sequence), 3, seed=21)
+    q_values = np.linspace(0.0, 0.5, 51)
+    form_factors = form_factor_matrix(sequence, q_values)
+    exact = np.mean(debye_intensity(ensemble, form_factors, q_values, 64), axis=0)
+    bound = np.sum(np.abs(form_factors), axis=0) ** 2
+
+    for accuracy in (1e-4, 1e-6, 1e-9):
+        series = moment_intensity(ensemble, form_factors, q_values, accuracy=accuracy)
+        assert np.all(np.abs(series - exact) <= accuracy * bound)
+
+
+def test_guinier_parameters(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    locations = random_chain(len(sequence), seed=22)
+    I_zero, radius = guinier_parameters(sequence, locations)
+
+    q_values, I_values = scattering_curve(sequence, locations, q_values=[0.0, 1e-3])
+    np.testing.assert_allclose(I_zero, I_values[0], rtol=1e-12)
+    weights = form_factor_matrix(sequence, [0.0])[:, 0]
+    squared = np.sum((locations[:, np.newaxis] - locations[np.newaxis]) ** 2, axis=-1)
+    np.testing.assert_allclose(
+        radius**2, weights @ squared @ weights / (2.0 * I_zero), rtol=1e-12
+    )
+
+
+def test_moments_engine_matches_debye(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    ensemble = random_chain(len(sequence), 2, seed=23, two_bead=True)
+    kwargs = dict(q_values=np.linspace(0.0, 0.5, 26))
+    _, expected = scattering_curve_two_bead_ensemble(sequence, ensemble, **kwargs)
+    _, I_values = scattering_curve_two_bead_ensemble(
+        sequence, ensemble, engine="moments", accuracy=1e-9, **kwargs
+    )
+    np.testing.assert_allclose(I_values, expected, rtol=1e-6)
+
+
+def test_moments_engine_uses_settings_of_debye_kernel(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    locations = random_chain(len(sequence), seed=24)
+    kwargs = dict(q_values=np.linspace(0.0, 0.5, 26), accuracy=1e-9)
+    _, expected = scattering_curve(sequence, locations, **kwargs)
+    _, I_values = scattering_curve(
+        sequence,
+        locations,
+        engine="moments",
+        dtype=np.float32,
+        backend="blas",
+        block_size=5,
+        **kwargs,
+    )
+    np.testing.assert_allclose(I_values, expected, rtol=1e-5)
+
+    with pytest.raises(ValueError):
+        scattering_curve(
+            sequence, locations, engine="moments", dtype=np.int32, **kwargs
+        )
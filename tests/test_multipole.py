@@ -0,0 +1,52 @@
+import numpy as np
+from saxs_single_bead.multipole import spherical_bessel
+from saxs_single_bead.multipole import real_spherical_harmonics
+from saxs_single_bead.scattering_curve import scattering_curve_ensemble
+from saxs_single_bead.scattering_curve import scattering_curve_one_two_blend
+
+
+def test_spherical_bessel_closed_forms():
+    x = np.concatenate([np.logspace(-3, 0, 10), np.linspace(1.0, 200.0, 100)])
+    values = spherical_bessel(3, x)
+
+    np.testing.assert_allclose(values[0], np.sin(x) / x, atol=1e-14)
+    # closed form of j_2 loses precision for small arguments
+    large = x > 0.1
+    np.testing.assert_allclose(
+        values[2, large],
+        ((3 / x**2 - 1) * np.sin(x) / x - 3 * np.cos(x) / x**2)[large],
+        atol=1e-10,
+    )
+    np.testing.assert_allclose(spherical_bessel(2, [0.0])[:, 0], [1.0, 0.0, 0.0])
+
+
+def test_spherical_harmonics_addition_theorem():
+    rng = np.random.default_rng(5)
+    (a, b) = rng.normal(size=(2, 4, 3))
+    l = 9
+    columns = slice(l**2, (l + 1) ** 2)
+    cos_gamma = np.sum(a * b, axis=1) / np.linalg.norm(a, axis=1) / np.linalg.norm(b, axis=1)
+
+    np.testing.assert_allclose(
+        np.sum(real_spherical_harmonics(l, a)[:, columns] * real_spherical_harmonics(l, b)[:, columns], axis=1),
+        (2 * l + 1) / (4 * np.pi) * np.polynomial.legendre.legval(cos_gamma, [0] * l + [1]),
+        atol=1e-13,
+    )
+
+
+def test_multipole_engine_matches_debye(random_chain, ubiquitin):
+    sequence = ubiquitin[:27]
+    ensemble = random_chain(len(sequence), 2, seed=6)
+
+    (_, exact) = scattering_curve_ensemble(sequence, ensemble)
+    (_, expanded) = scattering_curve_ensemble(sequence, ensemble, engine="multipole", accuracy=1e-9)
+    np.testing.assert_allclose(expanded, exact, rtol=1e-7)
+
+    codes = list(sequence) + ["BB"] * 3
+    model = [1] * len(sequence) + [2] * 3
+    blend = np.vstack([ensemble[0], ensemble[0][:3] + 1.0])
+    np.testing.assert_allclose(
+        scattering_curve_one_two_blend(codes, model, blend, engine="multipole")[1],
+        scattering_curve_one_two_blend(codes, model, blend)[1],
+        rtol=1e-4,
+    )
@@ -0,0 +1,80 @@
+import warnings
+import numpy as np
+import pytest
+import saxs_single_bead.numba_kernel
+from saxs_single_bead.debye_kernel import debye_intensity
+from saxs_single_bead.form_factors import form_factor_matrix
+from saxs_single_bead.scattering_curve import scattering_curve
+from saxs_single_bead.scattering_curve import scattering_curve_ensemble
+from saxs_single_bead.scattering_curve import scattering_curve_two_bead_ensemble
+
+
+def test_fused_loop_matches_blocked_kernel(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    ensemble = random_chain(len(sequence), 2, seed=41)
+    q_values = np.linspace(0.0, 0.5, 9)
+    form_factors = form_factor_matrix(sequence, q_values)
+
+    # plain Python run of the loop that numba compiles
+    I_values = np.zeros((2, len(q_values))) + np.sum(form_factors**2, axis=0)
+    saxs_single_bead.numba_kernel._pair_sums(ensemble, form_factors, q_values, I_values)
+
+    np.testing.assert_allclose(
+        I_values, debye_intensity(ensemble, form_factors, q_values, 5), rtol=1e-12
+    )
+
+
+def test_numba_backend_matches_numpy_backend(ubiquitin):
+    sequence = ubiquitin[:17]
+    rng = np.random.default_rng(42)
+    ensemble = rng.normal(scale=8.0, size=(3, len(sequence), 2, 3))
+    expected = scattering_curve_two_bead_ensemble(sequence, ensemble)[1]
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        I_values = scattering_curve_two_bead_ensemble(
+            sequence, ensemble, backend="numba"
+        )[1]
+
+    np.testing.assert_allclose(I_values, expected, rtol=1e-10)
+    assert len(caught) == (0 if saxs_single_bead.numba_kernel.available else 1)
+
+
+def test_invalid_backend():
+    with pytest.raises(ValueError):
+        scattering_curve("GG", np.zeros((2, 3)), backend="fortran")
+
+
+def test_compiled_kernel_matches_numpy_backend(random_chain, ubiquitin):
+    pytest.importorskip("numba")
+    sequence = ubiquitin
+    ensemble = random_chain(len(sequence), 2, seed=43)
+    q_values = np.linspace(0.0, 0.5, 9)
+    form_factors = form_factor_matrix(sequence, q_values)
+    expected = debye_intensity(ensemble, form_factors, q_values, 16)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        I_values = debye_intensity(
+            ensemble, form_factors, q_values, 16, backend="numba"
+        )
+        I_single = debye_intensity(
+            ensemble[0], form_factors, q_values, 16, dtype=np.float32, backend="numba"
+        )
+
+    np.testing.assert_allclose(I_values, expected, rtol=1e-12)
+    np.testing.assert_allclose(I_single, expected[0], rtol=1e-5)
+
+
+def test_process_pool_after_compiled_kernel(random_chain, ubiquitin):
+    pytest.importorskip("numba")
+    sequence = ubiquitin[:17]
+    ensemble = random_chain(len(sequence), 6, seed=44)
+
+    # threads of the compiled kernel must not be inherited by forked workers
+    expected = scattering_curve_ensemble(sequence, ensemble, backend="numba")[1]
+    np.testing.assert_allclose(
+        scattering_curve_ensemble(sequence, ensemble, n_workers=2)[1],
+        expected,
+        rtol=1e-12,
+    )
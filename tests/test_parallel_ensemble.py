@@ -0,0 +1,24 @@
+import concurrent.futures
+import numpy as np
+from saxs_single_bead.scattering_curve import scattering_curve_ensemble
+from saxs_single_bead.scattering_curve import scattering_curve_one_two_blend_ensemble
+
+
+def test_parallel_ensemble_identical_to_serial(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    ensemble = random_chain(len(sequence), 70, seed=2)
+
+    serial = scattering_curve_ensemble(sequence, ensemble)
+    parallel = scattering_curve_ensemble(sequence, ensemble, n_workers=2)
+    np.testing.assert_array_equal(serial[1], parallel[1])
+
+    codes = list(sequence) + ["BB"]
+    model = [1] * len(sequence) + [2]
+    blend = np.concatenate([ensemble, ensemble[:, :1] + 1.0], axis=1)
+    with concurrent.futures.ThreadPoolExecutor(3) as executor:
+        np.testing.assert_array_equal(
+            scattering_curve_one_two_blend_ensemble(codes, model, blend)[1],
+            scattering_curve_one_two_blend_ensemble(
+                codes, model, blend, executor=executor
+            )[1],
+        )
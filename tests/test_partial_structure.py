@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+import saxs_single_bead.form_factors as form_factors
+from saxs_single_bead.bead_model import BeadModel
+from saxs_single_bead.distance_histogram import PairDistanceHistogram
+from saxs_single_bead.partial_structure import contract, partial_structure_factors
+from saxs_single_bead.scattering_curve import (
+    scattering_curve_ensemble,
+    scattering_curve_two_bead_ensemble,
+)
+
+
+def test_contraction_matches_ensemble_curve(random_chain, ubiquitin):
+    sequence = ubiquitin
+    ensemble = random_chain(len(sequence), 3, seed=41)
+    q_values = np.linspace(0.0, 0.5, 11)
+
+    partials = partial_structure_factors(sequence, ensemble, q_values, block_size=17)
+    _, expected = scattering_curve_ensemble(sequence, ensemble, q_values=q_values)
+
+    np.testing.assert_allclose(partials.values, np.swapaxes(partials.values, 0, 1))
+    np.testing.assert_allclose(contract(partials), expected, rtol=1e-10)
+
+
+def test_new_table_and_contrasts_without_geometry():
+    sequence = "GWKEAL"
+    rng = np.random.default_rng(42)
+    ensemble = rng.normal(scale=6.0, size=(4, len(sequence), 2, 3))
+    q_values = np.linspace(0.0, 0.4, 9)
+    partials = partial_structure_factors(sequence, ensemble, q_values, model=2)
+    assert len(partials.types) == len(sequence) + 1
+
+    table_q, table, _ = form_factors._load_table()
+    form_factors.register_table("halved", np.vstack([table_q, 0.5 * table[:41]]))
+    try:
+        form_factors.use_table("halved")
+        _, expected = scattering_curve_two_bead_ensemble(
+            sequence, ensemble, q_values=q_values
+        )
+        np.testing.assert_allclose(contract(partials), expected, rtol=1e-10)
+    finally:
+        form_factors.use_table("tong2016")
+
+    # constant unit contrasts count bead pairs at q = 0
+    np.testing.assert_allclose(
+        contract(partials, np.ones(len(partials.types)))[0], (2 * len(sequence)) ** 2
+    )
+    with pytest.raises(ValueError):
+        contract(partials, np.ones((len(partials.types), 2)))
+
+
+def test_histogram_partials_match_intensity(ubiquitin):
+    sequence = ubiquitin[:17]
+    rng = np.random.default_rng(43)
+    ensemble = rng.normal(scale=8.0, size=(3, len(sequence), 3))
+    q_values = np.linspace(0.0, 0.5, 11)
+
+    histogram = PairDistanceHistogram(BeadModel(sequence).type_indices)
+    histogram.add(ensemble)
+    partials = histogram.partial_structure_factors(q_values)
+
+    np.testing.assert_allclose(
+        contract(partials), histogram.intensity(q_values), rtol=1e-12
+    )
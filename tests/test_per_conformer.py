@@ -0,0 +1,47 @@
+import concurrent.futures
+import numpy as np
+from saxs_single_bead.scattering_curve import scattering_curve
+from saxs_single_bead.scattering_curve import scattering_curve_ensemble
+from saxs_single_bead.scattering_curve import scattering_curve_two_bead_ensemble
+
+
+def test_per_conformer_rows_match_single_curves(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    ensemble = random_chain(len(sequence), 5, seed=41)
+    q_values = np.array([0.3, 0.0, 0.12, 0.3])
+
+    grid, intensities = scattering_curve_ensemble(
+        sequence, ensemble, q_values=q_values, per_conformer=True, max_memory=2**14
+    )
+
+    np.testing.assert_array_equal(grid, q_values)
+    assert intensities.shape == (5, 4)
+    for conformer, row in zip(ensemble, intensities):
+        np.testing.assert_allclose(
+            row, scattering_curve(sequence, conformer, q_values=q_values)[1], rtol=1e-12
+        )
+
+
+def test_per_conformer_written_to_npy_file(tmp_path, ubiquitin):
+    sequence = list(ubiquitin[:17])
+    rng = np.random.default_rng(42)
+    ensemble = rng.normal(scale=8.0, size=(6, len(sequence), 2, 3))
+    path = str(tmp_path / "intensities.npy")
+
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        q_values, intensities = scattering_curve_two_bead_ensemble(
+            sequence,
+            ensemble,
+            points=7,
+            per_conformer=True,
+            out=path,
+            executor=executor,
+        )
+    intensities.flush()
+
+    stored = np.load(path)
+    np.testing.assert_allclose(
+        np.mean(stored, axis=0),
+        scattering_curve_two_bead_ensemble(sequence, ensemble, points=7)[1],
+        rtol=1e-12,
+    )
@@ -0,0 +1,59 @@
+import pickle
+import numpy as np
+from saxs_single_bead.problem import ScatteringProblem
+from saxs_single_bead.scattering_curve import scattering_curve
+from saxs_single_bead.scattering_curve import scattering_curve_ensemble
+from saxs_single_bead.scattering_curve import scattering_curve_two_bead_ensemble
+
+
+def test_problem_matches_scattering_curve_on_repeated_calls(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    locations = random_chain(len(sequence), seed=11)
+    problem = ScatteringProblem(sequence, locations)
+
+    for q_values in (np.linspace(0.0, 0.5, 11), np.array([0.3, 0.05])):
+        np.testing.assert_allclose(
+            problem.intensity(q_values),
+            scattering_curve(sequence, locations, q_values=q_values)[1],
+            rtol=1e-12,
+        )
+
+
+def test_problem_pickles_without_caches(ubiquitin):
+    sequence = ubiquitin[:17]
+    rng = np.random.default_rng(12)
+    ensemble = rng.normal(scale=8.0, size=(3, len(sequence), 2, 3))
+    q_values = np.linspace(0.0, 0.5, 7)
+    problem = ScatteringProblem(sequence, ensemble, model=2)
+    expected = problem.intensity(q_values)
+
+    copy = pickle.loads(pickle.dumps(problem))
+
+    assert copy._distances is None
+    np.testing.assert_allclose(copy.intensity(q_values), expected, rtol=1e-12)
+    np.testing.assert_allclose(
+        expected,
+        scattering_curve_two_bead_ensemble(sequence, ensemble, q_values=q_values)[1],
+        rtol=1e-12,
+    )
+
+
+def test_distances_cached_within_memory_and_other_backends(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    ensemble = random_chain(len(sequence), 4, seed=13)
+    q_values = np.linspace(0.0, 0.5, 7)
+    expected = scattering_curve_ensemble(sequence, ensemble, q_values=q_values)[1]
+
+    # distances of all conformers and one type pair index per pair fit exactly
+    n_pairs = len(sequence) * (len(sequence) - 1) // 2
+    max_memory = len(ensemble) * n_pairs * 8 + n_pairs * 4
+    problem = ScatteringProblem(sequence, ensemble, max_memory=max_memory)
+    np.testing.assert_allclose(problem.intensity(q_values), expected, rtol=1e-12)
+    assert problem._distances is not None
+
+    for engine in ("debye", "moments"):
+        problem = ScatteringProblem(
+            sequence, ensemble, engine=engine, accuracy=1e-9, backend="blas"
+        )
+        np.testing.assert_allclose(problem.intensity(q_values), expected, rtol=1e-9)
+        assert problem._distances is None
@@ -0,0 +1,32 @@
+import numpy as np
+from saxs_single_bead.scattering_curve import scattering_curve
+from saxs_single_bead.scattering_curve import scattering_curve_ensemble
+
+
+def test_explicit_q_values_match_linspace(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    locations = random_chain(len(sequence), seed=7)
+
+    (q_values, curve) = scattering_curve(sequence, locations, 0.0, 0.5, 11)
+    (explicit_q, explicit_curve) = scattering_curve(
+        sequence, locations, q_values=q_values[::-1]
+    )
+
+    np.testing.assert_array_equal(explicit_q, q_values[::-1])
+    np.testing.assert_allclose(explicit_curve, curve[::-1], rtol=1e-12)
+
+
+def test_several_datasets_in_one_pass(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    ensemble = random_chain(len(sequence), 3, seed=8)
+    grids = [np.array([0.01, 0.2, 0.37]), np.array([0.2, 0.05])]
+
+    curves = scattering_curve_ensemble(sequence, ensemble, q_values=grids)
+
+    assert len(curves) == 2
+    for (grid, (q_values, curve)) in zip(grids, curves):
+        np.testing.assert_array_equal(q_values, grid)
+        np.testing.assert_allclose(
+            curve, scattering_curve_ensemble(sequence, ensemble, q_values=grid)[1]
+        )
+    assert curves[0][1][1] == curves[1][1][0]
@@ -0,0 +1,74 @@
+import warnings
+import numpy as np
+import pytest
+from saxs_single_bead.reweighting import reweight
+from saxs_single_bead.reweighting import reweight_ensemble
+from saxs_single_bead.scattering_curve import scattering_curve_ensemble
+
+
+def _curves(rng, n_conformers, q_values):
+    radii = rng.uniform(10.0, 40.0, size=n_conformers)
+    return 1e4 * np.exp(-((q_values * radii[:, np.newaxis]) ** 2) / 3.0)
+
+
+def test_nnls_recovers_sparse_weights():
+    rng = np.random.default_rng(51)
+    q_values = np.linspace(0.01, 0.3, 40)
+    intensities = _curves(rng, 200, q_values)
+    weights = np.zeros(200)
+    weights[[3, 70, 150]] = [0.2, 0.5, 0.3]
+    experiment = 2.5 * (weights @ intensities) + 7.0
+    sigma = 0.01 * experiment
+
+    result = reweight(intensities, experiment, sigma)
+
+    assert result.chi2 < 1e-12
+    np.testing.assert_allclose(result.curve, experiment, rtol=1e-8)
+    np.testing.assert_allclose(result.scale, 2.5, rtol=1e-6)
+    np.testing.assert_allclose(result.background, 7.0, rtol=1e-4)
+    assert result.effective_size <= 40
+
+
+def test_maxent_between_prior_and_best_fit():
+    rng = np.random.default_rng(52)
+    q_values = np.linspace(0.01, 0.3, 40)
+    intensities = _curves(rng, 300, q_values)
+    experiment = 1e4 * np.exp(-((q_values * 15.0) ** 2) / 3.0)
+    sigma = 0.02 * experiment
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        tight = reweight(intensities, experiment, sigma, method="maxent", theta=1e8)
+        loose = reweight(intensities, experiment, sigma, method="maxent", theta=0.1)
+
+    np.testing.assert_allclose(np.sum(loose.weights), 1.0)
+    np.testing.assert_allclose(tight.weights, 1.0 / 300, rtol=0.05)
+    assert loose.chi2 < tight.chi2
+    assert loose.effective_size < tight.effective_size
+
+    with pytest.warns(RuntimeWarning):
+        stopped = reweight(
+            intensities,
+            experiment,
+            sigma,
+            method="maxent",
+            theta=0.1,
+            max_iterations=2,
+        )
+    np.testing.assert_allclose(np.sum(stopped.weights), 1.0)
+
+
+def test_reweight_ensemble_uses_per_conformer_curves(random_chain, ubiquitin):
+    sequence = ubiquitin[:17]
+    ensemble = random_chain(len(sequence), 8, seed=53)
+    q_values = np.linspace(0.02, 0.4, 12)
+    _, curve = scattering_curve_ensemble(sequence, ensemble[:4], q_values=q_values)
+    experiment = np.array([q_values, 3.0 * curve, 0.01 * curve])
+
+    intensities, result = reweight_ensemble(
+        sequence, ensemble, experiment, background=False
+    )
+
+    assert intensities.shape == (8, 12)
+    assert result.chi2 < 1e-8
+    np.testing.assert_allclose(result.scale, 3.0, rtol=1e-6)
@@ -0,0 +1,58 @@
+import concurrent.futures
+import numpy as np
+from saxs_single_bead.fitting import fit_curves
+from saxs_single_bead.selection import select_subensemble
+
+
+def _pool(rng, n_conformers, q_values):
+    radii = rng.uniform(10.0, 40.0, size=n_conformers)
+    return 1e4 * np.exp(-((q_values * radii[:, np.newaxis]) ** 2) / 3.0)
+
+
+def test_greedy_finds_planted_subset_quality():
+    rng = np.random.default_rng(71)
+    q_values = np.linspace(0.01, 0.3, 40)
+    intensities = _pool(rng, 300, q_values)
+    planted = rng.choice(300, size=4, replace=False)
+    experiment = 2.0 * np.mean(intensities[planted], axis=0)
+    sigma = 0.01 * experiment
+
+    result = select_subensemble(
+        intensities, experiment, sigma, 4, repeats=False, n_runs=3, seed=1
+    )
+
+    assert len(np.unique(result.indices)) == 4
+    random_subset = fit_curves(
+        q_values,
+        np.mean(intensities[:4], axis=0),
+        np.array([q_values, experiment, sigma]),
+    )
+    assert result.chi2 < 0.01 * random_subset.chi2[0]
+    assert result.chi2 == np.min(result.run_chi2)
+    np.testing.assert_allclose(
+        result.chi2,
+        fit_curves(
+            q_values,
+            np.mean(intensities[result.indices], axis=0),
+            np.array([q_values, experiment, sigma]),
+        ).chi2[0],
+        rtol=1e-10,
+    )
+
+
+def test_parallel_runs_match_serial():
+    rng = np.random.default_rng(72)
+    q_values = np.linspace(0.01, 0.3, 20)
+    intensities = _pool(rng, 100, q_values)
+    experiment = 1e4 * np.exp(-((q_values * 18.0) ** 2) / 3.0) + 50.0
+    sigma = 0.02 * experiment
+    options = dict(method="genetic", background=True, n_runs=3, seed=5, generations=20)
+
+    serial = select_subensemble(intensities, experiment, sigma, 6, **options)
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        parallel = select_subensemble(
+            intensities, experiment, sigma, 6, executor=executor, **options
+        )
+
+    np.testing.assert_array_equal(serial.indices, parallel.indices)
+    np.testing.assert_array_equal(serial.run_chi2, parallel.run_chi2)
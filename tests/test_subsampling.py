@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+import saxs_single_bead.subsampling
+from saxs_single_bead.scattering_curve import scattering_curve_ensemble
+from saxs_single_bead.scattering_curve import scattering_curve_two_bead
+from saxs_single_bead.subsampling import scattering_curve_estimate
+
+
+def test_estimate_within_error_bars(random_chain, ubiquitin):
+    sequence = ubiquitin[:49]
+    ensemble = random_chain(len(sequence), 20)
+
+    (_, exact) = scattering_curve_ensemble(sequence, ensemble)
+    (_, estimate, error) = scattering_curve_estimate(sequence, ensemble, samples=20_000, seed=0)
+
+    assert np.all(error > 0)
+    assert np.all(np.abs(estimate - exact) < 5 * error)
+
+
+def test_estimate_exact_for_large_budget(random_chain, ubiquitin):
+    sequence = list(ubiquitin[:17])
+    structure = random_chain(len(sequence), two_bead=True)
+
+    (_, exact) = scattering_curve_two_bead(sequence, structure)
+    (_, estimate, error) = scattering_curve_estimate(sequence, structure, model=2, samples=10**6)
+
+    np.testing.assert_allclose(estimate, exact, rtol=1e-12)
+    np.testing.assert_array_equal(error, 0.0)
+
+
+def test_samples_bound_pairs_and_shapes_are_checked(random_chain, ubiquitin, monkeypatch):
+    sequence = ubiquitin[:49]
+    ensemble = random_chain(len(sequence), 20)
+    pair_terms = saxs_single_bead.subsampling._pair_terms
+    evaluated = list()
+
+    def counted(locations, form_factor_matrix, q_values, conformers, first, second):
+        evaluated.append(len(first))
+        return pair_terms(locations, form_factor_matrix, q_values, conformers, first, second)
+
+    monkeypatch.setattr(saxs_single_bead.subsampling, "_pair_terms", counted)
+    for samples in (30, 1001, 50_000):
+        evaluated.clear()
+        scattering_curve_estimate(sequence, ensemble, samples=samples, seed=1)
+        assert 0 < sum(evaluated) <= samples
+
+    with pytest.raises(ValueError):
+        scattering_curve_estimate(sequence, ensemble, samples=5)
+    with pytest.raises(ValueError):
+        scattering_curve_estimate(sequence, ensemble[:, :-1], samples=1000)